@@ -0,0 +1,157 @@
+import time
+
+
+class BrowserPool:
+    """批次级浏览器池
+
+    在整个批次内复用已启动的Chromium，避免每个URL、每个阶段都冷启动浏览器：
+    - 带用户配置文件的持久化上下文（GSC、GA共用，保持登录状态）
+    - 无痕浏览器（SERP、SEMrush使用，每次分配一个新的上下文）
+    两者在分配的页面/上下文数量达到上限后自动回收重启，防止长时间运行导致内存膨胀。
+    """
+
+    def __init__(self, playwright, launch_persistent, launch_incognito, log_message_callback, max_pages_per_browser=50):
+        """
+        Args:
+            playwright: sync_playwright() 返回的Playwright实例
+            launch_persistent: 启动持久化上下文的函数，参数为playwright
+            launch_incognito: 启动无痕浏览器的函数，参数为playwright，返回 (浏览器, 启动时使用的用户代理)
+            log_message_callback: 用于记录日志的回调函数
+            max_pages_per_browser: 每个浏览器分配多少个页面/上下文后回收重启
+        """
+        self.playwright = playwright
+        self._launch_persistent = launch_persistent
+        self._launch_incognito = launch_incognito
+        self.log_message_callback = log_message_callback
+        self.max_pages_per_browser = max(1, int(max_pages_per_browser))
+
+        self.persistent_context = None
+        self.persistent_pages = 0
+        self.incognito_browser = None
+        self.incognito_user_agent = None
+        self.incognito_contexts = 0
+
+        # 统计信息
+        self.launches = 0
+        self.launches_avoided = 0
+        self.launch_seconds = 0.0
+        self.contexts_created = 0
+        self.context_seconds = 0.0
+        self.stage_requests = {}
+
+    def _count_stage(self, stage):
+        self.stage_requests[stage] = self.stage_requests.get(stage, 0) + 1
+
+    def _is_connected(self, browser):
+        try:
+            return browser.is_connected()
+        except Exception:
+            return False
+
+    def get_persistent_context(self, stage):
+        """获取带用户配置文件的持久化上下文，必要时启动或回收重启"""
+        self._count_stage(stage)
+
+        if self.persistent_context is not None and self.persistent_pages >= self.max_pages_per_browser:
+            self.log_message_callback(f"持久化浏览器已分配 {self.persistent_pages} 个页面，回收重启...")
+            self.close_persistent()
+
+        if self.persistent_context is not None:
+            self.launches_avoided += 1
+            self.log_message_callback(f"[{stage}] 复用已启动的持久化浏览器")
+            return self.persistent_context
+
+        start = time.time()
+        self.persistent_context = self._launch_persistent(self.playwright)
+        self.launch_seconds += time.time() - start
+        self.launches += 1
+        self.persistent_pages = 0
+        return self.persistent_context
+
+    def new_persistent_page(self, stage):
+        """在持久化上下文中为指定阶段创建一个新页面，使用完毕后由调用方关闭"""
+        context = self.get_persistent_context(stage)
+        page = context.new_page()
+        self.persistent_pages += 1
+        return page
+
+    def get_incognito_browser(self, stage):
+        """获取共享的无痕浏览器，必要时启动或回收重启"""
+        self._count_stage(stage)
+
+        if self.incognito_browser is not None and not self._is_connected(self.incognito_browser):
+            self.log_message_callback("无痕浏览器已断开，将重新启动")
+            self.incognito_browser = None
+
+        if self.incognito_browser is not None and self.incognito_contexts >= self.max_pages_per_browser:
+            self.log_message_callback(f"无痕浏览器已分配 {self.incognito_contexts} 个上下文，回收重启...")
+            self.close_incognito()
+
+        if self.incognito_browser is not None:
+            self.launches_avoided += 1
+            self.log_message_callback(f"[{stage}] 复用已启动的无痕浏览器")
+            return self.incognito_browser
+
+        start = time.time()
+        self.incognito_browser, self.incognito_user_agent = self._launch_incognito(self.playwright)
+        self.launch_seconds += time.time() - start
+        self.launches += 1
+        self.incognito_contexts = 0
+        return self.incognito_browser
+
+    def new_incognito_context(self, stage, init_script=None, **context_options):
+        """为指定阶段创建一个独立的无痕上下文（相当于一个新的无痕窗口），使用完毕后由调用方关闭
+
+        未指定user_agent时使用浏览器启动时的用户代理，保证请求头与启动参数一致。
+        init_script在创建任何页面之前注册到上下文，对其中的所有页面生效。
+        """
+        browser = self.get_incognito_browser(stage)
+        if self.incognito_user_agent:
+            context_options.setdefault("user_agent", self.incognito_user_agent)
+        start = time.time()
+        context = browser.new_context(**context_options)
+        if init_script:
+            context.add_init_script(init_script)
+        self.context_seconds += time.time() - start
+        self.contexts_created += 1
+        self.incognito_contexts += 1
+        return context
+
+    def close_persistent(self):
+        if self.persistent_context is not None:
+            try:
+                self.persistent_context.close()
+            except Exception as e:
+                self.log_message_callback(f"关闭持久化浏览器时出错: {str(e)}")
+            self.persistent_context = None
+            self.persistent_pages = 0
+
+    def close_incognito(self):
+        if self.incognito_browser is not None:
+            try:
+                self.incognito_browser.close()
+            except Exception as e:
+                self.log_message_callback(f"关闭无痕浏览器时出错: {str(e)}")
+            self.incognito_browser = None
+            self.incognito_contexts = 0
+
+    def close(self):
+        """关闭池中所有浏览器"""
+        self.close_persistent()
+        self.close_incognito()
+
+    def report(self):
+        """输出浏览器池的统计信息"""
+        self.log_message_callback(
+            f"浏览器池统计: 启动 {self.launches} 次，复用避免启动 {self.launches_avoided} 次，"
+            f"启动耗时共 {self.launch_seconds:.1f} 秒"
+        )
+        if self.launches and self.contexts_created:
+            self.log_message_callback(
+                f"平均每次启动浏览器 {self.launch_seconds / self.launches:.2f} 秒，"
+                f"平均每次创建无痕上下文 {self.context_seconds / self.contexts_created:.3f} 秒"
+                f"（共 {self.contexts_created} 个上下文）"
+            )
+        if self.stage_requests:
+            stages = ", ".join(f"{stage}: {count}" for stage, count in self.stage_requests.items())
+            self.log_message_callback(f"各阶段浏览器请求次数: {stages}")
@@ -0,0 +1,76 @@
+import threading
+import time
+
+# Playwright的单次等待最长多久，之后检查一次是否已中止
+WAIT_SLICE_SECONDS = 0.25
+
+
+class CancelledError(BaseException):
+    """任务已被中止
+
+    与asyncio.CancelledError一样继承BaseException，各阶段中 except Exception 的错误处理不会吞掉它，
+    中止可以直接穿过重试循环和提取步骤。
+    """
+
+
+def _is_timeout(error):
+    # Playwright的TimeoutError，不引入playwright依赖，按类名判断
+    return type(error).__name__ == "TimeoutError"
+
+
+class CancelToken:
+    """批次的取消令牌，所有工作线程共享
+
+    流水线中的休眠、页面等待和重试都通过它进行：
+    - sleep 在中止时立即返回并抛出CancelledError
+    - wait / goto 把Playwright的长等待切分为短等待，每段之间检查是否已中止
+    这样按下停止后，正在等待的线程在一秒内退出，而不是等到超时。
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.cancelled_at = None
+
+    def cancel(self):
+        if not self._event.is_set():
+            self.cancelled_at = time.time()
+            self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise CancelledError("任务已被中止")
+
+    def sleep(self, seconds):
+        """可被中止的休眠"""
+        if self._event.wait(max(0.0, seconds)):
+            raise CancelledError("任务已被中止")
+
+    def wait(self, func, *args, timeout=30000, **kwargs):
+        """分段调用Playwright的等待函数（wait_for_selector、wait_for_url等）
+
+        每段最长WAIT_SLICE_SECONDS，超时后检查中止标志再继续，直到总时间达到timeout（毫秒）。
+        """
+        deadline = time.monotonic() + timeout / 1000.0
+        while True:
+            self.raise_if_cancelled()
+            remaining = deadline - time.monotonic()
+            slice_ms = max(1, int(min(remaining, WAIT_SLICE_SECONDS) * 1000))
+            try:
+                return func(*args, timeout=slice_ms, **kwargs)
+            except Exception as e:
+                if not _is_timeout(e) or time.monotonic() >= deadline:
+                    raise
+
+    def goto(self, page, url, timeout=30000, wait_until="load", **kwargs):
+        """导航到url：先等待导航提交，再分段等待加载状态"""
+        start = time.monotonic()
+        self.raise_if_cancelled()
+        response = page.goto(url, timeout=timeout, wait_until="commit", **kwargs)
+        if wait_until != "commit":
+            remaining = max(1, int(timeout - (time.monotonic() - start) * 1000))
+            self.wait(page.wait_for_load_state, wait_until, timeout=remaining)
+        return response
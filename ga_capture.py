@@ -0,0 +1,140 @@
+import json
+
+from readiness import GA_DATA_PATTERNS
+
+# 不同版本的GA4接口对行、维度值和指标值使用的字段名
+ROW_KEYS = ("rows", "responseRows")
+DIMENSION_VALUE_KEYS = ("dimensionValues", "dimensionCompoundValues")
+METRIC_VALUE_KEYS = ("metricValues", "metricCompoundValues")
+
+
+class GaResponseCapture:
+    """捕获GA4探索报表的数据响应
+
+    必须在page.goto之前创建。事件回调中只保存响应对象，
+    响应内容在数据解析时再读取，避免在事件回调中发起阻塞调用。
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self.responses = []
+        self._on_response = self._handle_response
+        page.on("response", self._on_response)
+
+    def _handle_response(self, response):
+        if any(pattern in response.url for pattern in GA_DATA_PATTERNS):
+            self.responses.append(response)
+
+    def detach(self):
+        try:
+            self.page.remove_listener("response", self._on_response)
+        except Exception:
+            pass
+
+    def extract_report(self, log_message_callback):
+        """从已捕获的响应中解析报表，返回行数最多的那张表
+
+        Returns:
+            tuple: (表头列表, 数据行列表)，未解析到数据时为 ([], [])
+        """
+        best_headers, best_rows = [], []
+        for response in self.responses:
+            try:
+                body = response.text()
+            except Exception as e:
+                log_message_callback(f"读取GA4响应内容时出错: {str(e)}")
+                continue
+            data = parse_json_body(body)
+            if data is None:
+                continue
+            for headers, rows in find_reports(data):
+                if len(rows) > len(best_rows):
+                    best_headers, best_rows = headers, rows
+        log_message_callback(f"从 {len(self.responses)} 个GA4数据响应中解析出 {len(best_rows)} 行报表数据")
+        return best_headers, best_rows
+
+
+def parse_json_body(body):
+    """解析JSON响应，兼容Google接口的 )]}' 防劫持前缀"""
+    body = body.lstrip()
+    if body.startswith(")]}'"):
+        body = body[4:]
+    try:
+        return json.loads(body)
+    except ValueError:
+        return None
+
+
+def _header_names(report, key, prefix, count):
+    headers = report.get(key) or []
+    names = []
+    for i in range(count):
+        header = headers[i] if i < len(headers) else None
+        name = None
+        if isinstance(header, dict):
+            name = header.get("name") or header.get("displayName") or header.get("fieldName")
+        elif isinstance(header, str):
+            name = header
+        names.append(name or f"{prefix}{i + 1}")
+    return names
+
+
+def _cell_value(cell):
+    if isinstance(cell, dict):
+        for key in ("value", "displayValue", "oneValue"):
+            if key in cell and cell[key] is not None:
+                return str(cell[key])
+        return ""
+    return "" if cell is None else str(cell)
+
+
+def _first_present(mapping, keys):
+    for key in keys:
+        value = mapping.get(key)
+        if isinstance(value, list):
+            return value
+    return None
+
+
+def _parse_report(report):
+    rows = _first_present(report, ROW_KEYS)
+    if not rows or not isinstance(rows[0], dict):
+        return None
+
+    sample = rows[0]
+    dimension_count = len(_first_present(sample, DIMENSION_VALUE_KEYS) or [])
+    metric_count = len(_first_present(sample, METRIC_VALUE_KEYS) or [])
+    if dimension_count == 0 and metric_count == 0:
+        return None
+
+    headers = (_header_names(report, "dimensionHeaders", "dimension", dimension_count) +
+               _header_names(report, "metricHeaders", "metric", metric_count))
+
+    table = []
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        dimensions = _first_present(row, DIMENSION_VALUE_KEYS) or []
+        metrics = _first_present(row, METRIC_VALUE_KEYS) or []
+        values = [_cell_value(cell) for cell in dimensions[:dimension_count]]
+        values += [""] * (dimension_count - len(values))
+        metric_values = [_cell_value(cell) for cell in metrics[:metric_count]]
+        metric_values += [""] * (metric_count - len(metric_values))
+        table.append(values + metric_values)
+    return headers, table
+
+
+def find_reports(data):
+    """在响应JSON中查找所有报表（包含行数据及维度/指标值的对象）"""
+    reports = []
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            parsed = _parse_report(node)
+            if parsed:
+                reports.append(parsed)
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return reports
@@ -0,0 +1,139 @@
+import threading
+import time
+import urllib.parse
+from html.parser import HTMLParser
+
+# Google封锁页（“异常流量”/人机验证）的特征
+SORRY_PATH_PREFIXES = ("/sorry/",)
+# 人机验证表单；只有同时缺少搜索结果容器时才算封锁页
+CAPTCHA_FORM_ID = "captcha-form"
+RESULT_CONTAINER_IDS = ("search", "rso")
+
+
+class _IdCollector(HTMLParser):
+    """收集页面中出现的元素id"""
+
+    def __init__(self):
+        super().__init__()
+        self.ids = set()
+
+    def handle_starttag(self, tag, attrs):
+        for name, value in attrs:
+            if name == "id" and value:
+                self.ids.add(value)
+
+
+def _element_ids(html):
+    parser = _IdCollector()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:
+        pass
+    return parser.ids
+
+
+class GoogleBlockedError(Exception):
+    """Google返回了封锁页，当前关键词需要稍后重试"""
+
+    def __init__(self, reason, url=""):
+        super().__init__(f"Google封锁页（{reason}）: {url}")
+        self.reason = reason
+        self.url = url
+
+
+def detect_google_block(url, html=""):
+    """判断页面是否为Google的 /sorry/ 封锁页或人机验证页
+
+    只按页面结构判断，不在整页HTML中搜索文字：正常结果页的摘要或脚本中也可能出现
+    “unusual traffic”、recaptcha等字样。
+
+    Args:
+        url: 页面当前URL
+        html: 页面HTML，可为空（只按URL判断）
+
+    Returns:
+        str: 封锁原因（"sorry_url"、"captcha"），未被封锁时返回None
+    """
+    parsed = urllib.parse.urlparse(url or "")
+    if "google." in parsed.netloc.lower() and parsed.path.startswith(SORRY_PATH_PREFIXES):
+        return "sorry_url"
+    if not html:
+        return None
+    ids = _element_ids(html)
+    if CAPTCHA_FORM_ID in ids and not any(result_id in ids for result_id in RESULT_CONTAINER_IDS):
+        return "captcha"
+    return None
+
+
+class BlockGuard:
+    """Google封锁后的全批次冷却，所有工作线程共享
+
+    每次检测到封锁，冷却时间按 base_cooldown * 2^(连续封锁次数-1) 指数增长，最长max_cooldown；
+    成功的搜索将连续次数清零。同时按小时统计搜索次数和封锁次数，用于调整并发数。
+    """
+
+    def __init__(self, base_cooldown=60, max_cooldown=1800, log_message_callback=None):
+        self.base_cooldown = max(1.0, float(base_cooldown))
+        self.max_cooldown = max(self.base_cooldown, float(max_cooldown))
+        self.log_message_callback = log_message_callback
+        self.lock = threading.Lock()
+        self.cooldown_until = 0.0
+        self.consecutive = 0
+        # {"YYYY-MM-DD HH:00": [搜索次数, 封锁次数]}
+        self.hourly = {}
+
+    @staticmethod
+    def hour_key(timestamp=None):
+        return time.strftime("%Y-%m-%d %H:00", time.localtime(timestamp))
+
+    def _count(self, blocked):
+        counts = self.hourly.setdefault(self.hour_key(), [0, 0])
+        counts[0] += 1
+        if blocked:
+            counts[1] += 1
+
+    def record_success(self):
+        with self.lock:
+            self._count(False)
+            self.consecutive = 0
+
+    def record_block(self, reason):
+        """记录一次封锁并开始（或延长）冷却，返回本次冷却秒数"""
+        with self.lock:
+            self._count(True)
+            self.consecutive += 1
+            cooldown = min(self.base_cooldown * 2 ** (self.consecutive - 1), self.max_cooldown)
+            self.cooldown_until = max(self.cooldown_until, time.monotonic() + cooldown)
+            consecutive = self.consecutive
+        if self.log_message_callback:
+            self.log_message_callback(
+                f"[封锁] Google返回封锁页（{reason}），连续第 {consecutive} 次，所有线程暂停Google请求 {cooldown:.0f} 秒"
+            )
+        return cooldown
+
+    def remaining(self):
+        with self.lock:
+            return max(0.0, self.cooldown_until - time.monotonic())
+
+    def wait(self, should_abort=None):
+        """冷却期间阻塞，分段等待以便及时响应中止，返回等待的秒数"""
+        start = time.monotonic()
+        while True:
+            remaining = self.remaining()
+            if remaining <= 0 or (should_abort and should_abort()):
+                break
+            time.sleep(min(remaining, 0.5))
+        return time.monotonic() - start
+
+    def snapshot(self):
+        """返回按小时排序的 (小时, 搜索次数, 封锁次数)"""
+        with self.lock:
+            return [(hour, counts[0], counts[1]) for hour, counts in sorted(self.hourly.items())]
+
+    def report(self, log_message_callback):
+        for hour, requests, blocks in self.snapshot():
+            if requests:
+                log_message_callback(
+                    f"Google封锁统计 {hour}: {requests} 次搜索，{blocks} 次封锁（{blocks / requests:.0%}）"
+                )
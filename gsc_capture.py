@@ -0,0 +1,180 @@
+import json
+import re
+
+# Search Console前端通过batchexecute RPC获取报表数据
+GSC_RPC_PATTERN = "/data/batchexecute"
+
+DATE_KEY_RE = re.compile(r"^\d{4}-?\d{2}-?\d{2}$|^\d{8,}$")
+NUMBER_RE = re.compile(r"^-?\d+(\.\d+)?([eE]-?\d+)?$")
+
+
+class GscResponseCapture:
+    """捕获Search Console效果报告页面的数据响应
+
+    必须在page.goto之前创建。事件回调中只保存响应对象，
+    响应内容在数据解析时再读取，避免在事件回调中发起阻塞调用。
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self.responses = []
+        self._on_response = self._handle_response
+        page.on("response", self._on_response)
+
+    def _handle_response(self, response):
+        if GSC_RPC_PATTERN in response.url:
+            self.responses.append(response)
+
+    def detach(self):
+        try:
+            self.page.remove_listener("response", self._on_response)
+        except Exception:
+            pass
+
+    def extract_rows(self, log_message_callback):
+        """从已捕获的响应中解析出查询数据，返回行数最多的那张表"""
+        best_rows = []
+        for response in self.responses:
+            try:
+                body = response.text()
+            except Exception as e:
+                log_message_callback(f"读取GSC响应内容时出错: {str(e)}")
+                continue
+            for payload in parse_batchexecute(body):
+                rows = extract_query_rows(payload)
+                if len(rows) >= len(best_rows):
+                    best_rows = rows
+        log_message_callback(f"从 {len(self.responses)} 个GSC数据响应中解析出 {len(best_rows)} 行查询数据")
+        return best_rows
+
+
+def parse_batchexecute(body):
+    """解析batchexecute响应，返回每个RPC结果解码后的JSON数据
+
+    响应格式为 )]}' 前缀加若干个以长度行分隔的JSON数组，每个数组中
+    ["wrb.fr", rpcid, "<JSON字符串>", ...] 条目的第三项才是真正的数据。
+    """
+    if body.startswith(")]}'"):
+        body = body[4:]
+
+    decoder = json.JSONDecoder()
+    payloads = []
+    index = 0
+    length = len(body)
+    while index < length:
+        char = body[index]
+        if char != "[":
+            # 跳过空白和分块长度行
+            index += 1
+            continue
+        try:
+            chunk, index = decoder.raw_decode(body, index)
+        except ValueError:
+            index += 1
+            continue
+        for entry in chunk if isinstance(chunk, list) else []:
+            if isinstance(entry, list) and len(entry) >= 3 and entry[0] == "wrb.fr" and isinstance(entry[2], str):
+                try:
+                    payloads.append(json.loads(entry[2]))
+                except ValueError:
+                    continue
+    return payloads
+
+
+def _to_number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str) and NUMBER_RE.match(value.strip()):
+        number = float(value)
+        return int(number) if number.is_integer() and "." not in value else number
+    return None
+
+
+def _row_key(row):
+    """行的第一个元素（或嵌套在单元素列表中的第一个元素）为查询文本"""
+    key = row[0]
+    while isinstance(key, list) and len(key) >= 1:
+        key = key[0]
+    if not isinstance(key, str):
+        return None
+    key = key.strip()
+    if not key or DATE_KEY_RE.match(key) or key.startswith("http"):
+        return None
+    return key
+
+
+def _row_metrics(row):
+    """按出现顺序收集行中的指标（展开一层嵌套），null保留为None以免后面的指标错位"""
+    metrics = []
+    for value in row[1:]:
+        values = value if isinstance(value, list) else [value]
+        for item in values:
+            if item is None:
+                metrics.append(None)
+                continue
+            number = _to_number(item)
+            if number is not None:
+                metrics.append(number)
+    while metrics and metrics[-1] is None:
+        metrics.pop()
+    return metrics
+
+
+def _parse_row(row):
+    """解析一行查询数据：[查询, 点击, 展示, CTR, 排名]
+
+    batchexecute中的CTR始终是0~1之间的小数。后面的指标可能缺失（或为null）：
+    缺少CTR时按点击/展示计算，缺少排名时为None；至少需要点击和展示两个指标。
+    """
+    if not isinstance(row, list) or len(row) < 2:
+        return None
+    query = _row_key(row)
+    if query is None:
+        return None
+    metrics = _row_metrics(row)
+    if len(metrics) < 2:
+        return None
+    clicks, impressions, ctr, position = (metrics + [None, None])[:4]
+    if impressions is None:
+        return None
+    clicks = clicks or 0
+    if ctr is None:
+        ctr = clicks / impressions if impressions else 0.0
+    # 基本的合理性校验，排除恰好长得像数据行的其他结构
+    if clicks < 0 or impressions < clicks or not 0 <= ctr <= 1 or (position is not None and position < 1):
+        return None
+    return {
+        'query': query,
+        'clicks': int(clicks),
+        'impressions': int(impressions),
+        'ctr': float(ctr),
+        'position': float(position) if position is not None else None
+    }
+
+
+def extract_query_rows(payload):
+    """在解码后的RPC数据中查找查询表：包含最多有效数据行的那个列表"""
+    best_rows = []
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, list):
+            continue
+        rows = [parsed for parsed in (_parse_row(child) for child in node) if parsed]
+        if len(rows) > len(best_rows):
+            best_rows = rows
+        stack.extend(child for child in node if isinstance(child, list))
+    return best_rows
+
+
+def format_gsc_row(row):
+    """把数据行格式化为Markdown表格的一行"""
+    return [
+        row['query'],
+        str(row['clicks']),
+        str(row['impressions']),
+        f"{row['ctr'] * 100:.1f}%",
+        f"{row['position']:.1f}" if row['position'] is not None else "-"
+    ]
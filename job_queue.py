@@ -0,0 +1,219 @@
+import hashlib
+import sqlite3
+import threading
+import time
+
+DEFAULT_JOB_DB_PATH = "jobs.db"
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch_key TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_batches_key ON batches (batch_key, finished_at);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch_id INTEGER NOT NULL REFERENCES batches (id),
+    position INTEGER NOT NULL,
+    item TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (batch_id, state, attempts, position);
+CREATE TABLE IF NOT EXISTS stages (
+    job_id INTEGER NOT NULL REFERENCES jobs (id),
+    stage TEXT NOT NULL,
+    state TEXT NOT NULL,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, stage)
+);
+CREATE TABLE IF NOT EXISTS serp_hourly (
+    hour TEXT NOT NULL,
+    concurrency INTEGER NOT NULL,
+    searches INTEGER NOT NULL DEFAULT 0,
+    blocks INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (hour, concurrency)
+);
+"""
+
+
+class JobQueue:
+    """持久化的批次任务队列（SQLite）
+
+    每个URL/关键词是一个任务，任务下的每个阶段（GSC/GA、SERP、SEMrush）单独记录状态。
+    同样的输入列表在上次未完成时会恢复原批次：已完成的任务和阶段直接跳过，
+    中断时正在运行的任务重新排队。失败的任务排在所有未尝试的任务之后重试。
+    """
+
+    def __init__(self, db_path=DEFAULT_JOB_DB_PATH, max_attempts=2):
+        self.db_path = db_path
+        self.max_attempts = max(1, int(max_attempts))
+        self._local = threading.local()
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # 手动管理事务，领取任务时使用 BEGIN IMMEDIATE 防止多个线程领取同一任务
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def batch_key(items, mode):
+        digest = hashlib.sha1(mode.encode("utf-8"))
+        for item in items:
+            digest.update(b"\n" + item.encode("utf-8"))
+        return digest.hexdigest()
+
+    def open_batch(self, items, mode):
+        """打开批次：存在相同输入且未完成的批次时恢复它，否则新建
+
+        Returns:
+            tuple: (批次ID, 是否为恢复的批次)
+        """
+        key = self.batch_key(items, mode)
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id FROM batches WHERE batch_key = ? AND finished_at IS NULL ORDER BY id DESC LIMIT 1",
+                (key,)
+            ).fetchone()
+            if row is not None:
+                batch_id = row[0]
+                # 上次中断时正在运行或已失败的任务重新排队，失败次数保留以便排在后面
+                conn.execute(
+                    "UPDATE jobs SET state = ?, updated_at = ? WHERE batch_id = ? AND state IN (?, ?)",
+                    (PENDING, now, batch_id, RUNNING, FAILED)
+                )
+                conn.execute(
+                    "UPDATE stages SET state = ?, updated_at = ? WHERE state = ? AND job_id IN "
+                    "(SELECT id FROM jobs WHERE batch_id = ?)",
+                    (PENDING, now, RUNNING, batch_id)
+                )
+                conn.execute("COMMIT")
+                return batch_id, True
+
+            cursor = conn.execute(
+                "INSERT INTO batches (batch_key, mode, created_at) VALUES (?, ?, ?)", (key, mode, now)
+            )
+            batch_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO jobs (batch_id, position, item, state, updated_at) VALUES (?, ?, ?, ?, ?)",
+                [(batch_id, i, item, PENDING, now) for i, item in enumerate(items)]
+            )
+            conn.execute("COMMIT")
+            return batch_id, False
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def claim_next(self, batch_id):
+        """领取下一个待处理任务：未尝试过的优先，失败重试的排在最后
+
+        Returns:
+            tuple: (任务ID, 在输入列表中的位置, URL或关键词)，没有剩余任务时返回None
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id, position, item FROM jobs WHERE batch_id = ? AND state = ? "
+                "ORDER BY attempts, position LIMIT 1",
+                (batch_id, PENDING)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET state = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    (RUNNING, time.time(), row[0])
+                )
+            conn.execute("COMMIT")
+            return row
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def finish_job(self, job_id, success, error=None):
+        """记录任务结果；失败且未达到最大尝试次数时重新排队"""
+        conn = self._connection()
+        if success:
+            conn.execute("UPDATE jobs SET state = ?, error = NULL, updated_at = ? WHERE id = ?",
+                         (DONE, time.time(), job_id))
+            return
+        conn.execute(
+            "UPDATE jobs SET state = CASE WHEN attempts < ? THEN ? ELSE ? END, error = ?, updated_at = ? WHERE id = ?",
+            (self.max_attempts, PENDING, FAILED, error, time.time(), job_id)
+        )
+
+    def release_job(self, job_id):
+        """任务被中止时放回队列，且不计入尝试次数"""
+        self._connection().execute(
+            "UPDATE jobs SET state = ?, attempts = MAX(attempts - 1, 0), updated_at = ? WHERE id = ?",
+            (PENDING, time.time(), job_id)
+        )
+
+    def stage_done(self, job_id, stage):
+        row = self._connection().execute(
+            "SELECT state FROM stages WHERE job_id = ? AND stage = ?", (job_id, stage)
+        ).fetchone()
+        return row is not None and row[0] == DONE
+
+    def mark_stage(self, job_id, stage, state, error=None):
+        self._connection().execute(
+            "INSERT INTO stages (job_id, stage, state, error, updated_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (job_id, stage) DO UPDATE SET state = excluded.state, error = excluded.error, "
+            "updated_at = excluded.updated_at",
+            (job_id, stage, state, error, time.time())
+        )
+
+    def summary(self, batch_id):
+        """返回批次中各状态的任务数量"""
+        counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        for state, count in self._connection().execute(
+            "SELECT state, COUNT(*) FROM jobs WHERE batch_id = ? GROUP BY state", (batch_id,)
+        ):
+            counts[state] = count
+        return counts
+
+    def finish_batch(self, batch_id):
+        """批次中没有待处理或运行中的任务时标记为完成，之后同样的输入将新建批次"""
+        counts = self.summary(batch_id)
+        if counts[PENDING] or counts[RUNNING]:
+            return False
+        self._connection().execute("UPDATE batches SET finished_at = ? WHERE id = ?", (time.time(), batch_id))
+        return True
+
+    def record_serp_result(self, hour, concurrency, blocked):
+        """按小时和并发数累计Google搜索次数与封锁次数"""
+        self._connection().execute(
+            "INSERT INTO serp_hourly (hour, concurrency, searches, blocks) VALUES (?, ?, 1, ?) "
+            "ON CONFLICT (hour, concurrency) DO UPDATE SET searches = searches + 1, blocks = blocks + excluded.blocks",
+            (hour, concurrency, 1 if blocked else 0)
+        )
+
+    def serp_block_rates(self, limit=24):
+        """返回最近limit个小时的 (小时, 并发数, 搜索次数, 封锁次数)"""
+        return self._connection().execute(
+            "SELECT hour, concurrency, searches, blocks FROM serp_hourly ORDER BY hour DESC, concurrency LIMIT ?",
+            (limit,)
+        ).fetchall()
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
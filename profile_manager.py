@@ -0,0 +1,148 @@
+import hashlib
+import os
+import shutil
+import threading
+import time
+
+DEFAULT_PROFILE_DIR = "chrome_profile"
+DEFAULT_CLONE_ROOT = "chrome_profile_clones"
+
+# 克隆时跳过的缓存和锁文件，登录状态不依赖它们
+TRIM_NAMES = {
+    "Cache", "Code Cache", "GPUCache", "ShaderCache", "GrShaderCache", "DawnCache", "DawnGraphiteCache",
+    "Service Worker", "Crashpad", "BrowserMetrics", "Safe Browsing", "component_crx_cache",
+    "optimization_guide_model_store", "OptimizationHints", "Crash Reports",
+    "SingletonLock", "SingletonCookie", "SingletonSocket", "lockfile",
+}
+
+# 登录状态所在的Cookie数据库（新版Chromium在Network子目录中）
+COOKIE_FILES = (
+    os.path.join("Default", "Network", "Cookies"),
+    os.path.join("Default", "Network", "Cookies-journal"),
+    os.path.join("Default", "Cookies"),
+    os.path.join("Default", "Cookies-journal"),
+)
+
+
+def _trim(directory, names):
+    return [name for name in names if name in TRIM_NAMES or name.endswith(".tmp")]
+
+
+def cookie_fingerprint(profile_dir):
+    """配置文件中Cookie数据库的内容哈希，用于判断登录状态是否变化"""
+    digest = hashlib.sha1()
+    for relative in COOKIE_FILES:
+        path = os.path.join(profile_dir, relative)
+        if not os.path.exists(path):
+            continue
+        digest.update(relative.encode("utf-8"))
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def copy_cookies(source_dir, target_dir):
+    """只复制Cookie数据库（同一来源克隆出的配置文件使用相同的加密密钥，可以直接互相复制）"""
+    for relative in COOKIE_FILES:
+        source = os.path.join(source_dir, relative)
+        target = os.path.join(target_dir, relative)
+        if os.path.exists(source):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy2(source, target)
+        elif os.path.exists(target):
+            os.remove(target)
+
+
+class ProfileLease:
+    """一个克隆配置文件的租约，fingerprint为租出（或上次同步）时的Cookie哈希"""
+
+    def __init__(self, index, path, fingerprint):
+        self.index = index
+        self.path = path
+        self.fingerprint = fingerprint
+
+
+class ProfileManager:
+    """把已登录的chrome_profile克隆为多个精简副本，以租约方式分配给工作线程
+
+    Chromium会锁定配置文件目录，同一目录同一时间只能被一个浏览器打开；
+    每个工作线程使用自己租到的副本，需要登录状态的阶段即可同时运行多个浏览器。
+    - 克隆时跳过缓存、崩溃报告和锁文件
+    - 租出或浏览器重启前，副本的Cookie与主配置文件不同时从主配置文件同步
+    - 归还时副本的Cookie有变化（例如在副本中重新登录）则写回主配置文件，其他副本下次使用时同步
+    """
+
+    def __init__(self, source_dir=DEFAULT_PROFILE_DIR, clone_root=DEFAULT_CLONE_ROOT, size=2,
+                 log_message_callback=None):
+        self.source_dir = os.path.abspath(source_dir)
+        self.clone_root = os.path.abspath(clone_root)
+        self.size = max(1, int(size))
+        self.log_message_callback = log_message_callback
+        self.condition = threading.Condition()
+        self.free = list(range(self.size))
+        # 主配置文件的读写（克隆、同步Cookie）需要串行
+        self.source_lock = threading.Lock()
+
+    def _log(self, message):
+        if self.log_message_callback:
+            self.log_message_callback(message)
+
+    def clone_path(self, index):
+        return os.path.join(self.clone_root, f"profile-{index}")
+
+    def _clone(self, path):
+        start = time.time()
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        if os.path.isdir(self.source_dir):
+            shutil.copytree(self.source_dir, path, ignore=_trim)
+        else:
+            os.makedirs(path)
+        self._log(f"已克隆浏览器配置文件到 {path}，耗时 {time.time() - start:.1f} 秒")
+
+    def refresh(self, lease):
+        """主配置文件的Cookie与副本不同时同步到副本，副本对应的浏览器必须已关闭"""
+        with self.source_lock:
+            if not os.path.isdir(lease.path):
+                self._clone(lease.path)
+            else:
+                source_fingerprint = cookie_fingerprint(self.source_dir)
+                if source_fingerprint != cookie_fingerprint(lease.path):
+                    copy_cookies(self.source_dir, lease.path)
+                    self._log(f"主配置文件的Cookie已变化，已同步到配置文件副本 {lease.index}")
+            lease.fingerprint = cookie_fingerprint(lease.path)
+
+    def acquire(self, should_abort=None):
+        """租用一个配置文件副本，全部被占用时等待；放弃等待时返回None"""
+        with self.condition:
+            while not self.free:
+                if should_abort and should_abort():
+                    return None
+                self.condition.wait(0.5)
+            index = self.free.pop(0)
+        lease = ProfileLease(index, self.clone_path(index), None)
+        try:
+            self.refresh(lease)
+        except Exception:
+            self._return(index)
+            raise
+        return lease
+
+    def release(self, lease):
+        """归还副本（对应的浏览器必须已关闭），副本中的Cookie有变化时写回主配置文件"""
+        try:
+            with self.source_lock:
+                if os.path.isdir(lease.path) and cookie_fingerprint(lease.path) != lease.fingerprint:
+                    os.makedirs(self.source_dir, exist_ok=True)
+                    copy_cookies(lease.path, self.source_dir)
+                    self._log(f"配置文件副本 {lease.index} 的Cookie已变化，已写回主配置文件")
+        except Exception as e:
+            self._log(f"写回配置文件副本的Cookie时出错: {str(e)}")
+        finally:
+            self._return(lease.index)
+
+    def _return(self, index):
+        with self.condition:
+            self.free.append(index)
+            self.condition.notify()
@@ -0,0 +1,132 @@
+import threading
+import time
+import urllib.parse
+
+# 各来源默认的请求速率（次/分钟）和允许的突发请求数
+DEFAULT_RATES = {
+    "google": (6, 2),
+    "semrush": (12, 3),
+}
+
+# 按域名把请求归入来源，未列出的域名不限速
+ORIGIN_GROUPS = {
+    "www.google.com": "google",
+    "google.com": "google",
+    "tool.seotools8.com": "semrush",
+    "tool-sem.seotools8.com": "semrush",
+}
+
+
+def origin_group(url):
+    """返回URL所属的限速来源，不需要限速时返回None"""
+    host = urllib.parse.urlparse(url).netloc.lower() if "://" in url else url.lower()
+    return ORIGIN_GROUPS.get(host)
+
+
+class TokenBucket:
+    """令牌桶：按固定速率补充令牌，最多累积capacity个，每次请求消耗一个"""
+
+    def __init__(self, per_minute, capacity=1):
+        self.rate = max(per_minute, 0.001) / 60.0
+        self.capacity = max(1, int(capacity))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.condition = threading.Condition()
+        # 统计信息
+        self.waiting = 0
+        self.requests = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, should_abort=None):
+        """获取一个令牌，必要时阻塞等待
+
+        Args:
+            should_abort: 可选的回调，返回True时放弃等待
+
+        Returns:
+            tuple: (等待秒数, 开始等待时排在前面的请求数)，放弃等待时等待秒数为None
+        """
+        start = time.monotonic()
+        with self.condition:
+            queued = self.waiting
+            self.waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        break
+                    if should_abort and should_abort():
+                        return None, queued
+                    # 分段等待，以便及时响应中止
+                    self.condition.wait(min((1 - self.tokens) / self.rate, 0.5))
+            finally:
+                self.waiting -= 1
+            waited = time.monotonic() - start
+            self.requests += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            return waited, queued
+
+
+class RateLimiter:
+    """按来源（Google、SEMrush）限制整个批次的请求速率，所有工作线程共享
+
+    各阶段在页面导航前调用acquire，超过速率的请求排队等待令牌。
+    """
+
+    def __init__(self, rates=None, log_message_callback=None):
+        self.log_message_callback = log_message_callback
+        self.buckets = {}
+        for group, (per_minute, burst) in dict(DEFAULT_RATES, **(rates or {})).items():
+            if per_minute and per_minute > 0:
+                self.buckets[group] = TokenBucket(per_minute, burst)
+
+    def paces(self, group):
+        """该来源的每个请求是否都由令牌间隔开
+
+        没有令牌桶（速率为0）时不限速；允许突发时前几个请求可以连续发出，
+        两种情况下调用方的重试都需要自己退避。
+        """
+        bucket = self.buckets.get(group)
+        return bucket is not None and bucket.capacity == 1
+
+    def acquire(self, url, should_abort=None):
+        """导航到url前获取令牌，返回等待的秒数"""
+        group = origin_group(url)
+        bucket = self.buckets.get(group)
+        if bucket is None:
+            return 0.0
+        waited, queued = bucket.acquire(should_abort)
+        if waited is None:
+            return 0.0
+        if waited >= 0.5 and self.log_message_callback:
+            self.log_message_callback(f"[限速] {group} 等待 {waited:.1f} 秒（前面排队 {queued} 个请求）")
+        return waited
+
+    def snapshot(self):
+        """返回各来源当前的排队数和等待时间统计，批次运行期间可随时调用"""
+        stats = {}
+        for group, bucket in self.buckets.items():
+            with bucket.condition:
+                stats[group] = {
+                    "waiting": bucket.waiting,
+                    "requests": bucket.requests,
+                    "avg_wait": bucket.total_wait / bucket.requests if bucket.requests else 0.0,
+                    "max_wait": bucket.max_wait,
+                }
+        return stats
+
+    def report(self, log_message_callback):
+        for group, stats in self.snapshot().items():
+            if stats["requests"]:
+                log_message_callback(
+                    f"限速统计 {group}: {stats['requests']} 次请求，平均等待 {stats['avg_wait']:.1f} 秒，"
+                    f"最长等待 {stats['max_wait']:.1f} 秒"
+                )
@@ -0,0 +1,141 @@
+import time
+
+# GSC报表数据通过batchexecute RPC返回
+GSC_DATA_PATTERNS = ["/data/batchexecute"]
+# GA4探索报表数据通过runReport/batchRunReports接口返回
+GA_DATA_PATTERNS = ["runReport", "batchRunReports", "/data/v2/"]
+
+# 连续两帧比较元素位置和尺寸，判断元素是否已经渲染稳定
+ELEMENT_STABLE_JS = """
+(selector) => new Promise(resolve => {
+    const measure = () => {
+        const el = document.querySelector(selector);
+        if (!el) return null;
+        const rect = el.getBoundingClientRect();
+        if (rect.width === 0 || rect.height === 0) return null;
+        return [rect.x, rect.y, rect.width, rect.height].join(',');
+    };
+    const first = measure();
+    if (!first) { resolve(false); return; }
+    requestAnimationFrame(() => requestAnimationFrame(() => {
+        resolve(measure() === first);
+    }));
+})
+"""
+
+
+class ResponseWatcher:
+    """监听页面中报表数据请求，记录数据响应何时到达
+
+    必须在page.goto之前创建，才能捕获页面加载过程中发出的数据请求。
+    """
+
+    def __init__(self, page, url_patterns):
+        self.page = page
+        self.url_patterns = url_patterns
+        self.start_time = time.time()
+        self.pending = set()
+        self.finished = 0
+        self.failed = 0
+        self.first_response_time = None
+        self.last_activity_time = None
+
+        self._on_request = self._handle_request
+        self._on_finished = self._handle_finished
+        self._on_failed = self._handle_failed
+        page.on("request", self._on_request)
+        page.on("requestfinished", self._on_finished)
+        page.on("requestfailed", self._on_failed)
+
+    def matches(self, url):
+        return any(pattern in url for pattern in self.url_patterns)
+
+    def _handle_request(self, request):
+        if self.matches(request.url):
+            self.pending.add(request)
+            self.last_activity_time = time.time()
+
+    def _handle_finished(self, request):
+        if request in self.pending:
+            self.pending.discard(request)
+            self.finished += 1
+            self.last_activity_time = time.time()
+            if self.first_response_time is None:
+                self.first_response_time = self.last_activity_time
+
+    def _handle_failed(self, request):
+        if request in self.pending:
+            self.pending.discard(request)
+            self.failed += 1
+            self.last_activity_time = time.time()
+
+    def data_settled(self, quiet_seconds):
+        """已收到至少一个数据响应，没有进行中的数据请求，且安静了quiet_seconds秒"""
+        if self.finished == 0 or self.pending:
+            return False
+        return time.time() - self.last_activity_time >= quiet_seconds
+
+    def detach(self):
+        for event, handler in (("request", self._on_request),
+                               ("requestfinished", self._on_finished),
+                               ("requestfailed", self._on_failed)):
+            try:
+                self.page.remove_listener(event, handler)
+            except Exception:
+                pass
+
+
+def element_is_stable(page, selector):
+    """元素存在、尺寸非零且在连续两帧之间没有移动或改变大小"""
+    try:
+        return bool(page.evaluate(ELEMENT_STABLE_JS, selector))
+    except Exception:
+        return False
+
+
+def wait_for_report_ready(log_message_callback, page, watcher, selector, ceiling_seconds,
+                          label="报表", quiet_seconds=0.5, poll_ms=100, cancel_token=None):
+    """等待报表就绪：数据响应已到达且目标元素渲染稳定后立即返回
+
+    只有在事件始终没有发生时才会一直等到ceiling_seconds上限。
+
+    Args:
+        log_message_callback: 用于记录日志的回调函数
+        page: Playwright页面对象
+        watcher: 在导航前创建的ResponseWatcher
+        selector: 需要稳定的目标元素选择器，为None时只等待数据响应
+        ceiling_seconds: 最长等待时间（秒）
+        label: 日志中显示的报表名称
+        cancel_token: CancelToken实例，提供时每次轮询前检查是否已中止
+
+    Returns:
+        bool: 是否在上限之前检测到就绪
+    """
+    wait_start = time.time()
+    deadline = wait_start + ceiling_seconds
+    data_logged = False
+
+    while time.time() < deadline:
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        # 在同步API中，wait_for_timeout期间会处理页面事件，watcher才能收到请求通知
+        page.wait_for_timeout(poll_ms)
+
+        if watcher.first_response_time and not data_logged:
+            log_message_callback(
+                f"{label}数据响应已到达 (导航后 {watcher.first_response_time - watcher.start_time:.1f} 秒)")
+            data_logged = True
+
+        if not watcher.data_settled(quiet_seconds):
+            continue
+
+        if selector is None or element_is_stable(page, selector):
+            log_message_callback(
+                f"{label}已就绪: 等待 {time.time() - wait_start:.1f} 秒，"
+                f"收到 {watcher.finished} 个数据响应 (导航后共 {time.time() - watcher.start_time:.1f} 秒)")
+            return True
+
+    log_message_callback(
+        f"{label}在 {ceiling_seconds} 秒内未检测到就绪事件 (数据响应 {watcher.finished} 个，"
+        f"进行中 {len(watcher.pending)} 个，失败 {watcher.failed} 个)，继续后续步骤")
+    return False
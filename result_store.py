@@ -0,0 +1,348 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+DEFAULT_DB_PATH = "results.db"
+
+# 数据来源及其在Markdown中对应的部分，按渲染顺序排列
+SECTIONS = [
+    ("dropdown", "Google 搜索下拉框"),
+    ("related_searches", "相关搜索"),
+    ("gsc_queries", "GSC热门查询"),
+    ("paa", "相关问题"),
+    ("organic", "Google 自然排名前10"),
+    ("ga_landing", "GA落地页数据"),
+    ("semrush", "SEMrush"),
+]
+SOURCE_BY_SECTION = {section: source for source, section in SECTIONS}
+SEMRUSH_SOURCES = ("semrush_sidebar", "semrush_keywords", "semrush_stats")
+
+# 各抓取阶段写入的数据来源，以及缓存的默认有效期（天）
+STAGE_SOURCES = {
+    "serp": ("dropdown", "related_searches", "paa", "organic"),
+    "gsc": ("gsc_queries",),
+    "ga": ("ga_landing",),
+    "semrush": SEMRUSH_SOURCES,
+}
+CACHE_TTL_DAYS = {"serp": 1, "gsc": 1, "ga": 1, "semrush": 30}
+
+# 进程的umask只能通过设置来读取，在导入时（尚未启动工作线程）读取一次
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    page_name TEXT NOT NULL,
+    source TEXT NOT NULL,
+    run_at REAL NOT NULL,
+    headers TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_page_source ON runs (page_name, source, run_at);
+CREATE INDEX IF NOT EXISTS idx_runs_source ON runs (source, run_at);
+CREATE TABLE IF NOT EXISTS stage_cache (
+    stage TEXT NOT NULL,
+    cache_key TEXT NOT NULL,
+    locale TEXT NOT NULL,
+    page_name TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (stage, cache_key, locale)
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (run_id, position)
+);
+"""
+
+
+class ResultStore:
+    """所有数据来源的结构化结果存储（SQLite）
+
+    每次抓取按 (页面, 来源, 运行时间) 记录为一次运行，行数据以JSON保存。
+    Markdown文件由存储中每个来源最新一次运行的数据渲染生成。
+    每个线程使用独立的连接，写入在一个事务中完成。
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def save(self, page_name, source, rows, headers=None):
+        """保存一个来源的一次运行结果"""
+        self.save_many(page_name, {source: (rows, headers)})
+
+    def save_many(self, page_name, results):
+        """在一个事务中保存多个来源的结果
+
+        Args:
+            results: {来源: (行数据列表, 表头或None)}
+        """
+        run_at = time.time()
+        conn = self._connection()
+        with conn:
+            for source, (rows, headers) in results.items():
+                cursor = conn.execute(
+                    "INSERT INTO runs (page_name, source, run_at, headers) VALUES (?, ?, ?, ?)",
+                    (page_name, source, run_at, json.dumps(headers, ensure_ascii=False) if headers else None)
+                )
+                conn.executemany(
+                    "INSERT INTO results (run_id, position, data) VALUES (?, ?, ?)",
+                    [(cursor.lastrowid, i, json.dumps(row, ensure_ascii=False)) for i, row in enumerate(rows)]
+                )
+
+    def latest(self, page_name, source):
+        """返回某页面某来源最新一次运行的 (行数据列表, 表头)，没有记录时为 (None, None)"""
+        conn = self._connection()
+        run = conn.execute(
+            "SELECT id, headers FROM runs WHERE page_name = ? AND source = ? ORDER BY run_at DESC, id DESC LIMIT 1",
+            (page_name, source)
+        ).fetchone()
+        if run is None:
+            return None, None
+        rows = [json.loads(data) for (data,) in conn.execute(
+            "SELECT data FROM results WHERE run_id = ? ORDER BY position", (run[0],)
+        )]
+        return rows, json.loads(run[1]) if run[1] else None
+
+    def pages(self):
+        """返回存储中的所有页面名称"""
+        return [name for (name,) in self._connection().execute(
+            "SELECT DISTINCT page_name FROM runs ORDER BY page_name"
+        )]
+
+    def latest_by_source(self, source):
+        """按页面返回某来源最新一次运行的行数据，便于跨页面查询而无需解析Markdown
+
+        Yields:
+            tuple: (页面名称, 运行时间, 行数据列表)
+        """
+        conn = self._connection()
+        runs = conn.execute(
+            "SELECT r.id, r.page_name, r.run_at FROM runs r "
+            "WHERE r.source = ? AND r.id = (SELECT id FROM runs WHERE page_name = r.page_name AND source = r.source "
+            "ORDER BY run_at DESC, id DESC LIMIT 1) ORDER BY r.page_name",
+            (source,)
+        ).fetchall()
+        for run_id, page_name, run_at in runs:
+            rows = [json.loads(data) for (data,) in conn.execute(
+                "SELECT data FROM results WHERE run_id = ? ORDER BY position", (run_id,)
+            )]
+            yield page_name, run_at, rows
+
+    def has_run_since(self, page_name, sources, since):
+        """某页面在给定时间之后是否保存过这些来源中任意一个的数据"""
+        placeholders = ", ".join("?" for _ in sources)
+        row = self._connection().execute(
+            f"SELECT 1 FROM runs WHERE page_name = ? AND source IN ({placeholders}) AND run_at >= ? LIMIT 1",
+            (page_name, *sources, since)
+        ).fetchone()
+        return row is not None
+
+    def mark_fresh(self, stage, key, locale, page_name, fetched_at=None):
+        """记录某阶段对 (关键词或URL, 地区/数据库) 的抓取时间"""
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO stage_cache (stage, cache_key, locale, page_name, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (stage, normalize_cache_key(key), locale or "", page_name, fetched_at or time.time())
+            )
+
+    def fresh_since(self, stage, key, locale, ttl_seconds):
+        """缓存仍在有效期内且对应页面的数据仍在存储中时返回抓取时间，否则返回None"""
+        row = self._connection().execute(
+            "SELECT page_name, fetched_at FROM stage_cache WHERE stage = ? AND cache_key = ? AND locale = ?",
+            (stage, normalize_cache_key(key), locale or "")
+        ).fetchone()
+        if row is None or time.time() - row[1] > ttl_seconds:
+            return None
+        if not self.has_run_since(row[0], STAGE_SOURCES.get(stage, (stage,)), 0):
+            return None
+        return row[1]
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def normalize_cache_key(value):
+    """统一关键词或URL的写法：小写、合并空白、去掉URL末尾的斜杠和锚点"""
+    value = " ".join(str(value).strip().lower().split())
+    if value.startswith(("http://", "https://")):
+        value = value.split("#", 1)[0].rstrip("/")
+    return value
+
+
+def format_markdown_table(headers, rows):
+    """构建列宽对齐的Markdown表格"""
+    widths = [len(header) for header in headers]
+    for row in rows:
+        for i, cell in enumerate(row):
+            widths[i] = max(widths[i], len(str(cell)))
+
+    lines = ["| " + " | ".join(header.ljust(widths[i]) for i, header in enumerate(headers)) + " |",
+             "| " + " | ".join(':'.ljust(width, '-') for width in widths) + " |"]
+    for row in rows:
+        lines.append("| " + " | ".join(str(cell).ljust(widths[i]) for i, cell in enumerate(row)) + " |")
+    return "\n".join(lines) + "\n"
+
+
+def render_section(store, page_name, source):
+    """渲染一个部分的Markdown内容，存储中没有该来源的数据时返回None"""
+    if source == "semrush":
+        # 延迟导入，避免模块间循环依赖
+        import semrush_module
+        sidebar, _ = store.latest(page_name, "semrush_sidebar")
+        keywords, _ = store.latest(page_name, "semrush_keywords")
+        stats, _ = store.latest(page_name, "semrush_stats")
+        if sidebar is None and keywords is None and stats is None:
+            return None
+        return semrush_module.format_semrush_section(sidebar or [], keywords or [], stats[0] if stats else None)
+
+    rows, headers = store.latest(page_name, source)
+    if not rows:
+        return None
+    if headers:
+        return format_markdown_table(headers, rows)
+    return "".join(f"{i+1}. {item}\n" for i, item in enumerate(rows))
+
+
+def section_body(md_content, section_name):
+    """返回Markdown中某个部分当前的内容，不存在该部分时返回None"""
+    section_header = f"### {section_name}"
+    section_index = md_content.find(section_header)
+    if section_index == -1:
+        return None
+    body_start = section_index + len(section_header)
+    next_section_index = md_content.find("###", body_start)
+    end = next_section_index if next_section_index != -1 else len(md_content)
+    return md_content[body_start:end].strip("\n")
+
+
+def content_hash(text):
+    return hashlib.sha1(text.strip("\n").encode("utf-8")).hexdigest()
+
+
+def write_file_atomic(path, content):
+    """先写入同目录下的临时文件再重命名，中途崩溃不会留下写了一半的文件"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".md", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+        # mkstemp创建的文件权限为0600，改为与原文件一致（新文件按umask取默认权限）
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def splice_section(md_content, section_name, body):
+    """用新内容替换Markdown中某个部分（到下一个 ### 为止），不存在时在文件末尾添加"""
+    body = body.strip("\n")
+    section_header = f"### {section_name}"
+    section_index = md_content.find(section_header)
+    if section_index == -1:
+        return md_content.rstrip("\n") + f"\n\n{section_header}\n\n{body}\n"
+
+    body_start = section_index + len(section_header)
+    next_section_index = md_content.find("###", body_start)
+    if next_section_index != -1:
+        return md_content[:body_start] + "\n\n" + body + "\n\n" + md_content[next_section_index:]
+    return md_content[:body_start] + "\n\n" + body + "\n"
+
+
+def new_markdown_skeleton(page_name):
+    """新建MD文件的基本结构"""
+    # 获取显示名称（替换连字符为空格，首字母大写）
+    display_name = page_name.replace("-", " ").title()
+    return f"""
+# {display_name}
+
+## 关键词来源
+
+### Google 搜索下拉框
+
+### 相关搜索
+
+### GSC热门查询
+
+### 相关问题
+
+### SEMrush
+"""
+
+
+def render_markdown_file(store, page_name, log_message_callback):
+    """根据存储中各来源的最新数据渲染 {page_name}.md
+
+    只替换有数据且内容发生变化的部分（按内容哈希比较），文件中的其他内容保持不变。
+    所有部分都未变化时不写文件；需要写入时一次性原子替换。
+    """
+    md_file_path = f"{page_name}.md"
+    exists = os.path.exists(md_file_path)
+    if exists:
+        try:
+            with open(md_file_path, "r", encoding="utf-8") as file:
+                md_content = file.read()
+        except Exception as e:
+            log_message_callback(f"读取MD文件时出错: {str(e)}")
+            return False
+    else:
+        md_content = new_markdown_skeleton(page_name)
+
+    changed, unchanged = 0, 0
+    for source, section_name in SECTIONS:
+        body = render_section(store, page_name, source)
+        if body is None:
+            continue
+        current = section_body(md_content, section_name)
+        if current is not None and content_hash(current) == content_hash(body):
+            unchanged += 1
+            continue
+        md_content = splice_section(md_content, section_name, body)
+        changed += 1
+
+    if changed == 0:
+        if exists:
+            log_message_callback(f"{md_file_path} 内容未变化，跳过写入")
+        return True
+    if not exists:
+        log_message_callback(f"创建新的MD文件: {md_file_path}")
+
+    try:
+        write_file_atomic(md_file_path, md_content)
+    except Exception as e:
+        log_message_callback(f"保存MD文件时出错: {str(e)}")
+        return False
+    log_message_callback(f"已根据结果存储渲染 {md_file_path}（更新 {changed} 个部分，{unchanged} 个部分未变化）")
+    return True
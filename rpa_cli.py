@@ -0,0 +1,126 @@
+"""无界面命令行入口，不加载PyQt5，适合在没有显示服务器的机器上由cron定时运行
+
+用法:
+    python -m rpa_cli urls.txt --settings settings.json
+    python -m rpa_cli keywords.txt --keywords --concurrency 2
+
+每行输出一个JSON对象（日志、进度、任务结果、批次完成），便于其他程序解析。
+"""
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+import time
+
+from job_queue import DONE, FAILED
+from rpa_pipeline import RpaPipeline
+
+# 没有显示服务器时默认使用无头模式
+CLI_DEFAULTS = {
+    "headless_mode": "true",
+    "invisible_browser": "false",
+}
+
+
+class JsonSettings:
+    """从JSON文件读取设置，提供与QSettings相同的 value(key, default) 接口
+
+    布尔值转换为QSettings中使用的 "true"/"false" 字符串。
+    """
+
+    def __init__(self, path=None, overrides=None):
+        self.values = dict(CLI_DEFAULTS)
+        if path:
+            with open(path, "r", encoding="utf-8") as f:
+                self.values.update(json.load(f))
+        if overrides:
+            self.values.update(overrides)
+        # 与GUI一样，Google密码只保存在内存中，优先从环境变量读取
+        self.temp_password = os.environ.get("RPA_GOOGLE_PASSWORD", self.values.pop("google_password", ""))
+
+    def value(self, key, default=None):
+        value = self.values.get(key, default)
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        return value
+
+
+class JsonLinesEmitter:
+    """把流水线回调输出为JSON行，多个工作线程共用时加锁保证每行完整"""
+
+    def __init__(self, stream=sys.stdout):
+        self.stream = stream
+        self.lock = threading.Lock()
+
+    def emit(self, event, **fields):
+        record = {"event": event, "ts": round(time.time(), 3)}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False)
+        with self.lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+def read_items(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SEO RPA 无界面批处理")
+    parser.add_argument("input", help="URL或关键词列表文件，每行一个")
+    parser.add_argument("--settings", help="JSON格式的设置文件，键名与GUI保存的设置相同")
+    parser.add_argument("--keywords", action="store_true", help="原创文章模式：输入为关键词而非URL")
+    parser.add_argument("--concurrency", type=int, help="同时处理的URL/关键词数量")
+    args = parser.parse_args(argv)
+
+    overrides = {}
+    if args.keywords:
+        overrides["original_article_mode"] = "true"
+    if args.concurrency:
+        overrides["max_concurrency"] = str(args.concurrency)
+
+    settings = JsonSettings(args.settings, overrides)
+    items = read_items(args.input)
+    out = JsonLinesEmitter()
+    if not items:
+        out.emit("error", message="输入文件中没有URL或关键词")
+        return 2
+
+    pipeline = RpaPipeline(items, settings)
+
+    def on_task_completed(item, success):
+        # 每次尝试都会输出，失败的任务可能重新排队后成功，最终结果以任务队列为准
+        out.emit("task", item=item, success=success)
+
+    pipeline.log_message.connect(lambda message: out.emit("log", message=message))
+    pipeline.progress_updated.connect(lambda current, total: out.emit("progress", current=current, total=total))
+    pipeline.task_completed.connect(on_task_completed)
+    pipeline.queue_depth_updated.connect(lambda depths: out.emit("queues", depths=depths))
+    pipeline.rate_limit_updated.connect(lambda stats: out.emit("rate_limits", stats=stats))
+
+    # Ctrl+C / kill 时中止批次，未完成的任务留在任务队列中，下次运行时继续
+    def handle_signal(signum, frame):
+        out.emit("abort", signal=signum)
+        pipeline.abort()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    start = time.time()
+    out.emit("start", items=len(items), mode="keyword" if pipeline.is_original_mode else "url")
+    pipeline.run()
+    # 中止时附带从收到信号到所有工作线程退出的时间
+    stop_seconds = None
+    if pipeline.abort_flag:
+        stop_seconds = round(time.time() - pipeline.cancel_token.cancelled_at, 2)
+    counts = pipeline.job_queue.summary(pipeline.batch_id)
+    out.emit("done", ok=counts[DONE], failed=counts[FAILED], aborted=pipeline.abort_flag,
+             seconds=round(time.time() - start, 1), stop_seconds=stop_seconds)
+    return 1 if counts[FAILED] or pipeline.abort_flag else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
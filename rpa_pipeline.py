@@ -0,0 +1,2467 @@
+import os
+import time
+import random
+import re
+import urllib.parse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from playwright.sync_api import sync_playwright
+import semrush_module
+from browser_pool import BrowserPool
+from ga_capture import GaResponseCapture
+from gsc_capture import GscResponseCapture, format_gsc_row
+from suggest_client import SuggestClient, DEFAULT_SUGGEST_ENDPOINT, fill_and_capture_suggestions
+from readiness import ResponseWatcher, wait_for_report_ready, GSC_DATA_PATTERNS, GA_DATA_PATTERNS
+from rate_limiter import RateLimiter, origin_group
+from profile_manager import ProfileManager, DEFAULT_PROFILE_DIR, DEFAULT_CLONE_ROOT
+from virtual_display import VirtualDisplayPool, xvfb_available
+from google_block import BlockGuard, GoogleBlockedError, detect_google_block
+from cancellation import CancelToken, CancelledError
+from job_queue import JobQueue, DEFAULT_JOB_DB_PATH, RUNNING, DONE, FAILED
+from stage_runner import StagedRunner
+from result_store import (ResultStore, DEFAULT_DB_PATH, SOURCE_BY_SECTION, STAGE_SOURCES, CACHE_TTL_DAYS,
+                          render_markdown_file)
+
+# SERP使用的界面语言/地区，同时作为SERP缓存的地区键
+SERP_LOCALE = "zh-CN"
+# 直接打开搜索结果页时使用的地区（gl参数）
+SERP_COUNTRY = "cn"
+# 批次运行期间输出限速统计（排队数、等待时间）的间隔（秒）
+RATE_LIMIT_REPORT_SECONDS = 2.0
+
+# SERP无痕上下文的反检测脚本，每个上下文注册一次，在页面脚本之前执行
+SERP_STEALTH_JS = """
+    // 覆盖navigator.webdriver
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => false,
+    });
+    
+    // 覆盖window.navigator.chrome
+    window.navigator.chrome = {
+        runtime: {},
+        app: {
+            InstallState: {
+                DISABLED: 'disabled',
+                INSTALLED: 'installed',
+                NOT_INSTALLED: 'not_installed'
+            },
+            RunningState: {
+                CANNOT_RUN: 'cannot_run',
+                READY_TO_RUN: 'ready_to_run',
+                RUNNING: 'running'
+            },
+            isInstalled: true
+        }
+    };
+    
+    // 覆盖window.chrome
+    window.chrome = {
+        runtime: {},
+        app: {
+            isInstalled: true
+        }
+    };
+    
+    // 覆盖语言设置
+    Object.defineProperty(navigator, 'languages', {
+        get: () => ['zh-CN', 'zh', 'en-US', 'en'],
+    });
+    
+    // 模拟正常的硬件并发层级
+    Object.defineProperty(navigator, 'hardwareConcurrency', {
+        get: () => 8,
+    });
+    
+    // 模拟正常的设备内存
+    Object.defineProperty(navigator, 'deviceMemory', {
+        get: () => 8,
+    });
+    
+    // 修改屏幕尺寸信息
+    Object.defineProperty(window, 'screen', {
+        get: () => ({
+            availHeight: 1040,
+            availLeft: 0,
+            availTop: 0,
+            availWidth: 1920,
+            colorDepth: 24,
+            height: 1080,
+            width: 1920,
+            pixelDepth: 24
+        })
+    });
+    
+    // 修改连接信息为非慢速
+    Object.defineProperty(navigator, 'connection', {
+        get: () => ({
+            effectiveType: '4g',
+            rtt: 50,
+            downlink: 10.0,
+            saveData: false
+        })
+    });
+    
+    // Canvas指纹修改
+    const originalToDataURL = HTMLCanvasElement.prototype.toDataURL;
+    HTMLCanvasElement.prototype.toDataURL = function(type) {
+        if (this.width > 1 && this.height > 1) {
+            // 轻微修改Canvas数据来改变指纹
+            const context = this.getContext("2d");
+            const imageData = context.getImageData(0, 0, 1, 1);
+            // 随机改变一个像素
+            imageData.data[0] = imageData.data[0] < 255 ? imageData.data[0] + 1 : imageData.data[0] - 1;
+            context.putImageData(imageData, 0, 0);
+        }
+        return originalToDataURL.apply(this, arguments);
+    };
+"""
+
+# SERP各部分的提取函数，由extract_serp_page在一次page.evaluate中调用
+SERP_TEXT_JS = """
+function visibleText(element) {
+    // innerText只包含实际渲染的文本，无需逐个节点调用getComputedStyle
+    if (!element || !element.getClientRects().length) return '';
+    return (element.innerText || '').replace(/\\s+/g, ' ').trim();
+}
+"""
+
+SERP_PAA_JS = """
+function extractPaa() {
+    const questions = new Set();
+
+    // 按可能性排序的PAA选择器
+    const selectors = [
+        // 常见的PAA容器选择器
+        "div.related-question-pair",
+        ".g .related-question-pair",
+        ".related-questions-pair",
+        "div[jsname='N760b']",
+
+        // 直接选择问题文本元素
+        ".related-question-pair .JlqpRe",
+        ".related-question-pair .wQiwMc .JlqpRe",
+        "div[jsname='Cpkphb'] .JlqpRe",
+        "div[jsname='N760b'] .wQiwMc .JlqpRe",
+        "div[data-ved] .CSkcDe",
+
+        // 额外尝试其他可能的问题选择器
+        ".e24Kjd",
+        ".iDjcJe",
+        "[role='heading']"
+    ];
+
+    for (const selector of selectors) {
+        for (const element of document.querySelectorAll(selector)) {
+            // 优先使用专门的问题容器
+            const questionContainer = element.querySelector('.JlqpRe, .CSkcDe, [role="heading"], .wWOJcd, .e24Kjd, .iDjcJe');
+            const questionText = visibleText(questionContainer || element);
+            // 仅添加符合问题长度的合理文本（避免过短或过长）
+            if (questionText && questionText.length > 10 && questionText.length < 200) {
+                questions.add(questionText);
+            }
+        }
+        // 找到问题后不再尝试其他选择器
+        if (questions.size > 0) break;
+    }
+
+    // 备选方法：搜索页面中看起来像问题的标题元素
+    if (questions.size === 0) {
+        const questionWords = ['?', 'how', 'what', 'why', 'when', 'where', 'which', 'who', 'can', 'do'];
+        for (const heading of document.querySelectorAll('h3, h4, [role="heading"]')) {
+            const text = visibleText(heading);
+            if (text && questionWords.some(word => text.includes(word)) && text.length > 15 && text.length < 200) {
+                questions.add(text);
+            }
+        }
+    }
+
+    return Array.from(questions);
+}
+"""
+
+SERP_RELATED_JS = """
+function extractRelated() {
+    const excluded = /^(全部|视频|短视频|图片|购物|新闻|网页|图书|地图|航班)$/;
+    const searches = [];
+
+    function collect(elements) {
+        const results = [];
+        for (const element of elements) {
+            const text = element.textContent.trim();
+            if (text && !excluded.test(text)) results.push(text);
+        }
+        return results;
+    }
+
+    const selectorCombinations = [
+        "#bres > div.ULSxyf > div > div > div > div.y6Uyqe > div > div > div > div > div > a > div > div.wyccme > div > div > div > span",
+
+        // 更简化的选择器，捕获相关搜索文本区域
+        "div.y6Uyqe a div.wyccme span",
+        "div.y6Uyqe a div.dXS2h span",
+
+        // 使用文本容器类
+        "div.y6Uyqe a div.mtv5bd span.dg6jd",
+
+        // 使用父容器定位相关搜索部分
+        "#botstuff div.card-section a",
+        "div.brs_col a span",
+
+        // 通用相关内容选择器
+        "div[data-hveid] a"
+    ];
+
+    for (const selector of selectorCombinations) {
+        const results = collect(document.querySelectorAll(selector));
+        if (results.length > 0) {
+            searches.push(...results);
+            break;
+        }
+    }
+
+    // 备选方法：页面底部30%区域内的链接
+    if (searches.length === 0) {
+        const pageHeight = document.body.scrollHeight;
+        for (const link of document.querySelectorAll('a')) {
+            const linkTop = link.getBoundingClientRect().top + window.pageYOffset;
+            const text = link.textContent.trim();
+            if (linkTop > pageHeight * 0.7 && text && text.length > 3 && !excluded.test(text)) {
+                searches.push(text);
+            }
+        }
+    }
+
+    return [...new Set(searches)];
+}
+"""
+
+SERP_ORGANIC_JS = """
+function extractOrganic(limit) {
+    const maxResults = limit || 10;
+    const results = [];
+    const seen = new Set();
+    const root = document.querySelector('#rso') || document.querySelector('#search') || document;
+    for (const heading of root.querySelectorAll('a h3')) {
+        const link = heading.closest('a');
+        if (!link || !/^https?:/.test(link.href) || seen.has(link.href)) continue;
+        // 排除Google自身的链接（图片、视频、地图等）
+        if (/(^|\\.)google\\./.test(new URL(link.href).hostname)) continue;
+        const title = visibleText(heading);
+        if (!title) continue;
+        seen.add(link.href);
+        results.push({title: title, url: link.href});
+        if (results.length >= maxResults) break;
+    }
+    return results;
+}
+"""
+
+SERP_EXTRACT_JS = f"""
+() => {{
+    {SERP_TEXT_JS} {SERP_PAA_JS} {SERP_RELATED_JS} {SERP_ORGANIC_JS}
+    const timings = {{}};
+    function timed(name, fn) {{
+        const start = performance.now();
+        try {{
+            return fn();
+        }} catch (e) {{
+            return [];
+        }} finally {{
+            timings[name] = Math.round(performance.now() - start);
+        }}
+    }}
+    return {{
+        paa: timed('paa', extractPaa),
+        related: timed('related', extractRelated),
+        organic: timed('organic', () => extractOrganic(10)),
+        timings: timings
+    }};
+}}
+"""
+
+# 滚动到底部后，相关搜索区域出现即可提取，不再固定等待
+SERP_BOTTOM_READY_JS = "() => !!document.querySelector('#botstuff a, div.y6Uyqe a, div.brs_col a')"
+
+
+class Signal:
+    """与pyqtSignal用法相同的简单回调信号，使流水线不依赖Qt"""
+
+    def __init__(self):
+        self._callbacks = []
+
+    def connect(self, callback):
+        self._callbacks.append(callback)
+
+    def emit(self, *args):
+        for callback in list(self._callbacks):
+            callback(*args)
+
+
+class RpaPipeline:
+    """抓取流水线（GSC、GA、SERP、SEMrush），不依赖Qt
+
+    settings只需提供 value(key, default) 方法，QSettings和rpa_cli中的JsonSettings都可以使用。
+    进度、日志和任务结果通过 progress_updated / log_message / task_completed 信号回调输出，
+    分阶段模式下各阶段的队列长度通过 queue_depth_updated 输出，
+    各来源的限速排队数和等待时间通过 rate_limit_updated 定期输出。
+    """
+
+    def __init__(self, urls, settings):
+        self.progress_updated = Signal()
+        self.log_message = Signal()
+        self.task_completed = Signal()
+        # 分阶段流水线中各阶段队列的长度 {阶段: 排队任务数}
+        self.queue_depth_updated = Signal()
+        # 各来源的限速统计 {来源: {waiting, requests, avg_wait, max_wait}}
+        self.rate_limit_updated = Signal()
+        self.urls = urls
+        self.settings = settings
+        # 取消令牌：所有休眠、页面等待和重试都通过它，按下停止后各线程在一秒内退出
+        self.cancel_token = CancelToken()
+        self.is_original_mode = self.settings.value("original_article_mode", "false") == "true"
+        # 分阶段流水线：各来源使用独立的队列和工作线程，而不是每个任务依次执行所有阶段
+        self.staged = self.settings.value("staged_pipeline", "false") == "true"
+        # 同时处理的URL/关键词数量，每个并发工作线程拥有独立的Playwright实例和浏览器池
+        self.concurrency = max(1, self.setting_int("max_concurrency", 1))
+        self._local = threading.local()
+        # chrome_profile同一时间只能被一个浏览器打开，持久化上下文阶段需串行使用
+        self.persistent_lock = threading.Lock()
+        # 设置了配置文件副本数时，每个工作线程租用一个已登录配置文件的副本，持久化上下文阶段可以并行
+        profile_clones = self.setting_int("profile_clones", 0)
+        self.profile_manager = None
+        if profile_clones > 0:
+            self.profile_manager = ProfileManager(
+                os.path.join(os.getcwd(), DEFAULT_PROFILE_DIR),
+                self.settings.value("profile_clone_root", DEFAULT_CLONE_ROOT),
+                profile_clones, self.log_message.emit)
+        # 搜索建议接口客户端（每个线程复用一条HTTP长连接）
+        self.suggest_client = SuggestClient(self.settings.value("suggest_endpoint", DEFAULT_SUGGEST_ENDPOINT), hl=SERP_LOCALE)
+        # SEMrush登录状态，所有线程共享，首次登录后保存到文件供后续URL复用
+        self.semrush_session = semrush_module.SemrushSession(
+            self.settings.value("semrush_state_path", semrush_module.SEMRUSH_STATE_PATH))
+        # 结构化结果存储，Markdown文件由其中的数据渲染
+        self.result_store = ResultStore(self.settings.value("result_db_path", DEFAULT_DB_PATH))
+        # 持久化任务队列，批次中断后重新开始时从中断处继续
+        self.job_queue = JobQueue(self.settings.value("job_db_path", DEFAULT_JOB_DB_PATH),
+                                  max_attempts=self.setting_int("job_max_attempts", 2))
+        self.batch_id = None
+        # 按来源限制整个批次（所有工作线程）的请求速率
+        self.rate_limiter = RateLimiter({
+            "google": (self.setting_float("rate_google_per_minute", 6), self.setting_int("rate_google_burst", 2)),
+            "semrush": (self.setting_float("rate_semrush_per_minute", 12), self.setting_int("rate_semrush_burst", 3)),
+        }, self.log_message.emit)
+        # Linux上为每个工作线程分配独立的Xvfb虚拟显示器，在其上运行有头浏览器（无头模式下不使用）
+        self.display_pool = None
+        if (self.settings.value("virtual_display", "false") == "true"
+                and self.settings.value("headless_mode", "false") != "true"):
+            if xvfb_available():
+                self.display_pool = VirtualDisplayPool(self.setting_int("virtual_display_count", 8),
+                                                       log_message_callback=self.log_message.emit)
+            else:
+                self.log_message.emit("未找到Xvfb（仅支持Linux），不使用虚拟显示器")
+        # Google返回封锁页后整个批次指数退避，并按小时统计封锁率
+        self.block_guard = BlockGuard(self.setting_float("google_block_cooldown", 60),
+                                      self.setting_float("google_block_max_cooldown", 1800),
+                                      self.log_message.emit)
+        
+    def setting_float(self, key, default):
+        try:
+            return float(self.settings.value(key, default))
+        except (TypeError, ValueError):
+            return float(default)
+    
+    def setting_int(self, key, default):
+        try:
+            return int(self.settings.value(key, default))
+        except (TypeError, ValueError):
+            return int(default)
+    
+    def throttle(self, url):
+        """页面导航前按来源获取请求令牌，Google处于封锁冷却期时先等待冷却结束"""
+        waited = 0.0
+        if origin_group(url) == "google":
+            waited = self.block_guard.wait(lambda: self.abort_flag)
+        return waited + self.rate_limiter.acquire(url, lambda: self.abort_flag)
+    
+    def check_google_block(self, page):
+        """检查页面是否为Google封锁页，是则开始全批次冷却并抛出GoogleBlockedError"""
+        try:
+            url = page.url
+            reason = detect_google_block(url)
+            if reason is None:
+                reason = detect_google_block(url, page.content())
+        except GoogleBlockedError:
+            raise
+        except Exception as e:
+            self.log_message.emit(f"检查Google封锁页时出错: {str(e)}")
+            return
+        if reason is None:
+            return
+        self.block_guard.record_block(reason)
+        self.record_serp_result(True)
+        raise GoogleBlockedError(reason, url)
+    
+    def record_serp_result(self, blocked):
+        """把本次搜索是否被封锁计入按小时（和并发数）的统计"""
+        try:
+            self.job_queue.record_serp_result(BlockGuard.hour_key(), self.concurrency, blocked)
+        except Exception as e:
+            self.log_message.emit(f"记录封锁统计时出错: {str(e)}")
+    
+    @property
+    def browser_pool(self):
+        """当前工作线程的浏览器池"""
+        return getattr(self._local, "browser_pool", None)
+    
+    @property
+    def display(self):
+        """当前工作线程租用的虚拟显示器（如 ":99"），未启用时为None"""
+        return getattr(self._local, "display", None)
+    
+    def browser_env(self):
+        """启动浏览器时使用的环境变量，使用虚拟显示器时设置DISPLAY"""
+        return dict(os.environ, DISPLAY=self.display)
+    
+    @property
+    def profile_lease(self):
+        """当前工作线程租用的配置文件副本，未启用副本或尚未租用时为None"""
+        return getattr(self._local, "profile_lease", None)
+    
+    @property
+    def pending_markdown(self):
+        """当前工作线程中有新结果、等待渲染MD文件的页面"""
+        pending = getattr(self._local, "pending_markdown", None)
+        if pending is None:
+            pending = self._local.pending_markdown = set()
+        return pending
+    
+    def flush_markdown(self):
+        """URL处理结束时，根据结果存储一次性渲染并原子写入MD文件"""
+        pending = self.pending_markdown
+        while pending:
+            page_name = pending.pop()
+            try:
+                render_markdown_file(self.result_store, page_name, self.log_message.emit)
+            except Exception as e:
+                self.log_message.emit(f"渲染MD文件时出错: {str(e)}")
+    
+    def run(self):
+        mode = "keyword" if self.is_original_mode else "url"
+        self.batch_id, resumed = self.job_queue.open_batch(self.urls, mode)
+        if resumed:
+            counts = self.job_queue.summary(self.batch_id)
+            self.log_message.emit(
+                f"恢复未完成的批次: 已完成 {counts[DONE]}/{len(self.urls)}，"
+                f"剩余 {len(self.urls) - counts[DONE]} 个（失败的任务将在最后重试）"
+            )
+        
+        with self.rate_limit_monitor():
+            if self.staged:
+                StagedRunner(self).run()
+            elif self.concurrency > 1:
+                self.log_message.emit(f"并发模式: 同时处理 {self.concurrency} 个任务")
+                worker_count = min(self.concurrency, len(self.urls))
+                with ThreadPoolExecutor(max_workers=worker_count) as executor:
+                    futures = [executor.submit(self.run_worker_loop, n + 1) for n in range(worker_count)]
+                    for future in futures:
+                        try:
+                            future.result()
+                        except Exception as e:
+                            self.log_message.emit(f"并发工作线程出错: {str(e)}")
+            else:
+                self.run_worker_loop(0)
+        
+        self.rate_limiter.report(self.log_message.emit)
+        self.block_guard.report(self.log_message.emit)
+        if self.display_pool is not None:
+            self.display_pool.close()
+        
+        if self.abort_flag:
+            # 从按下停止到所有工作线程退出（浏览器已关闭）的时间
+            self.log_message.emit(f"已在 {time.time() - self.cancel_token.cancelled_at:.2f} 秒内停止")
+        else:
+            self.job_queue.finish_batch(self.batch_id)
+            counts = self.job_queue.summary(self.batch_id)
+            if counts[FAILED]:
+                self.log_message.emit(f"{counts[FAILED]} 个任务在重试后仍然失败")
+                
+        self.log_message.emit("所有任务完成!")
+        
+    @contextmanager
+    def rate_limit_monitor(self, interval=RATE_LIMIT_REPORT_SECONDS):
+        """批次运行期间每隔interval秒通过 rate_limit_updated 输出限速统计（有变化时），结束时再输出一次"""
+        stopped = threading.Event()
+        
+        def monitor():
+            last = None
+            while not stopped.wait(interval):
+                stats = self.rate_limiter.snapshot()
+                if stats != last:
+                    self.rate_limit_updated.emit(stats)
+                    last = stats
+        
+        thread = threading.Thread(target=monitor, name="rate-limit-monitor", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stopped.set()
+            thread.join()
+            self.rate_limit_updated.emit(self.rate_limiter.snapshot())
+    
+    def take_next_item(self):
+        """从任务队列中领取下一个待处理的URL或关键词，没有剩余时返回None
+
+        Returns:
+            tuple: (任务ID, 在输入列表中的位置, URL或关键词)
+        """
+        return self.job_queue.claim_next(self.batch_id)
+    
+    @property
+    def current_job_id(self):
+        """当前工作线程正在处理的任务ID"""
+        return getattr(self._local, "job_id", None)
+    
+    def skip_fresh(self, stage, key, locale, page_name):
+        """启用“跳过未过期数据”时，检查该阶段对此关键词/URL的缓存是否仍在有效期内"""
+        if self.settings.value("skip_fresh", "false") != "true":
+            return False
+        ttl_days = self.setting_float(f"cache_ttl_{stage}", CACHE_TTL_DAYS[stage])
+        fetched_at = self.result_store.fresh_since(stage, key, locale, ttl_days * 86400)
+        if fetched_at is None:
+            return False
+        hours = (time.time() - fetched_at) / 3600
+        self.log_message.emit(f"{stage} 数据已于 {hours:.1f} 小时前抓取（有效期 {ttl_days:g} 天），跳过")
+        # 仍根据存储中已有的数据渲染MD文件
+        self.pending_markdown.add(page_name)
+        return True
+    
+    def record_fresh(self, stage, key, locale, page_name, started):
+        """阶段在本次运行中确实保存了数据时，记录缓存时间"""
+        try:
+            if self.result_store.has_run_since(page_name, STAGE_SOURCES[stage], started):
+                self.result_store.mark_fresh(stage, key, locale, page_name)
+        except Exception as e:
+            self.log_message.emit(f"记录缓存时间时出错: {str(e)}")
+    
+    def run_checkpointed(self, stage, func, *args):
+        """执行一个处理阶段并记录其状态，恢复批次时跳过已完成的阶段
+
+        阶段函数返回False表示未成功（内部已处理的错误），记为失败并抛出异常，
+        任务稍后重试时重新执行该阶段，而不是把失败的阶段当作已完成跳过。
+        """
+        job_id = self.current_job_id
+        if job_id is None:
+            result = func(*args)
+            if result is False and not self.abort_flag:
+                raise Exception(f"阶段 {stage} 未成功完成")
+            return result
+        if self.job_queue.stage_done(job_id, stage):
+            self.log_message.emit(f"阶段 {stage} 已在之前的运行中完成，跳过")
+            return None
+        self.job_queue.mark_stage(job_id, stage, RUNNING)
+        try:
+            result = func(*args)
+        except Exception as e:
+            self.job_queue.mark_stage(job_id, stage, FAILED, str(e))
+            raise
+        if self.abort_flag:
+            return result
+        if result is False:
+            error = f"阶段 {stage} 未成功完成"
+            self.job_queue.mark_stage(job_id, stage, FAILED, error)
+            raise Exception(error)
+        self.job_queue.mark_stage(job_id, stage, DONE)
+        return result
+        
+    @contextmanager
+    def worker_browser_pool(self):
+        """为当前工作线程创建独立的Playwright实例和浏览器池（启用时还有虚拟显示器），退出时关闭"""
+        if self.display_pool is not None:
+            self._local.display = self.display_pool.acquire(lambda: self.abort_flag)
+        try:
+            with sync_playwright() as p:
+                # 整个批次共用一个浏览器池，避免每个URL、每个阶段重复冷启动Chromium
+                max_pages = self.setting_int("browser_recycle_pages", 50)
+                pool = BrowserPool(p, self.launch_browser, self.launch_incognito_browser,
+                                   self.log_message.emit, max_pages)
+                self._local.browser_pool = pool
+                try:
+                    yield pool
+                finally:
+                    pool.report()
+                    pool.close()
+                    self._local.browser_pool = None
+                    # 浏览器已关闭，归还配置文件副本（Cookie有变化时写回主配置文件）
+                    if self.profile_lease is not None:
+                        self.profile_manager.release(self.profile_lease)
+                        self._local.profile_lease = None
+        finally:
+            if self.display is not None:
+                self.display_pool.release(self.display)
+                self._local.display = None
+    
+    def run_worker_loop(self, worker_id):
+        """工作线程主循环：拥有独立的Playwright实例和浏览器池，不断领取任务直到批次完成"""
+        total_urls = len(self.urls)
+        prefix = f"[工作线程{worker_id}] " if worker_id else ""
+        with self.worker_browser_pool():
+            while True:
+                if self.abort_flag:
+                    self.log_message.emit("任务已中止")
+                    break
+                
+                item = self.take_next_item()
+                if item is None:
+                    break
+                job_id, i, url = item
+                self._local.job_id = job_id
+                    
+                if self.is_original_mode:
+                    self.log_message.emit(f"{prefix}处理关键词 {i+1}/{total_urls}: {url}")
+                else:
+                    self.log_message.emit(f"{prefix}处理URL {i+1}/{total_urls}: {url}")
+                self.progress_updated.emit(i, total_urls)
+                
+                try:
+                    self.process_url(url)
+                    if self.abort_flag:
+                        # 中止的任务放回队列，下次恢复批次时继续
+                        self.job_queue.release_job(job_id)
+                    else:
+                        self.job_queue.finish_job(job_id, True)
+                        self.task_completed.emit(url, True)
+                except CancelledError:
+                    # 在等待中被中止，任务放回队列，下次恢复批次时继续
+                    self.job_queue.release_job(job_id)
+                    self.log_message.emit("任务已中止")
+                    break
+                except Exception as e:
+                    if self.is_original_mode:
+                        self.log_message.emit(f"处理关键词 {url} 时出错: {str(e)}")
+                    else:
+                        self.log_message.emit(f"处理 {url} 时出错: {str(e)}")
+                    self.job_queue.finish_job(job_id, False, str(e))
+                    self.task_completed.emit(url, False)
+                finally:
+                    self._local.job_id = None
+        
+    @property
+    def abort_flag(self):
+        return self.cancel_token.cancelled
+    
+    def abort(self):
+        """请求中止：正在休眠或等待页面的线程在下一个等待分段（不超过WAIT_SLICE_SECONDS）内抛出CancelledError
+
+        Playwright同步API只能在创建它的线程中调用，不再从当前线程关闭浏览器，
+        各工作线程退出时自行关闭自己的浏览器池。
+        """
+        self.cancel_token.cancel()
+        self.log_message.emit("正在中止任务...")
+        
+    def prepare_item(self, page_url):
+        """计算URL或关键词对应的页面名称、截图路径和GSC/GA地址，各阶段共用"""
+        # 确保截图目录存在
+        screenshot_dir = self.settings.value("screenshot_dir", "screenshots")
+        os.makedirs(screenshot_dir, exist_ok=True)
+        
+        # 判断是否为原创文章模式
+        if self.is_original_mode:
+            # 在原创文章模式下，输入的是关键词而不是URL
+            keyword = page_url
+            page_name = keyword.strip().replace(" ", "-").lower()
+            
+            self.log_message.emit(f"原创文章模式: 处理关键词 \"{keyword}\"")
+            self.log_message.emit(f"使用的文件名: {page_name}")
+            return {"item": page_url, "page_name": page_name, "search_query": keyword,
+                    "screenshot_dir": screenshot_dir}
+        
+        # 获取页面名称
+        page_name = self.extract_page_name(page_url)
+        domain = self.extract_domain(page_url)
+        
+        self.log_message.emit(f"提取的页面名称: {page_name}")
+        self.log_message.emit(f"提取的域名: {domain}")
+        
+        # 构建GSC和GA URL
+        gsc_url, ga_url = self.build_urls(page_url, domain, page_name)
+        return {
+            "item": page_url,
+            "page_name": page_name,
+            "search_query": page_name.replace("-", " "),
+            "screenshot_dir": screenshot_dir,
+            "gsc_url": gsc_url,
+            "ga_url": ga_url,
+            # 构建截图路径
+            "first_screenshot_path": os.path.join(screenshot_dir, f"gsc-{page_name}-chart1.png"),
+            "second_screenshot_path": os.path.join(screenshot_dir, f"gsc-{page_name}-chart2.png"),
+            "ga_screenshot_path": os.path.join(screenshot_dir, f"ga-{page_name}.png"),
+        }
+    
+    def stage_gsc_ga(self, task):
+        """GSC/GA阶段（仅URL模式）：跳过有效期内的数据，记录阶段状态和缓存时间"""
+        page_url, page_name = task["item"], task["page_name"]
+        scrape_gsc = self.settings.value("scrape_gsc", "true") == "true"
+        scrape_ga = self.settings.value("scrape_ga", "true") == "true"
+        # 有效期内已抓取过的数据直接跳过
+        if scrape_gsc and self.skip_fresh("gsc", page_url, "", page_name):
+            scrape_gsc = False
+        if scrape_ga and self.skip_fresh("ga", page_url, "", page_name):
+            scrape_ga = False
+        
+        if (scrape_gsc or scrape_ga) and not self.abort_flag:
+            started = time.time()
+            self.run_checkpointed("gsc_ga", self.run_gsc_ga_stage,
+                                  scrape_gsc, scrape_ga, task["gsc_url"], task["ga_url"], page_name,
+                                  task["first_screenshot_path"], task["second_screenshot_path"],
+                                  task["ga_screenshot_path"], task["screenshot_dir"])
+            self.record_fresh("gsc", page_url, "", page_name, started)
+            self.record_fresh("ga", page_url, "", page_name, started)
+        else:
+            self.log_message.emit("已跳过GSC和GA数据抓取（根据设置、缓存或任务已中止）")
+    
+    def stage_serp(self, task):
+        """SERP阶段（无痕模式）：被Google封锁时抛出GoogleBlockedError"""
+        search_query, page_name = task["search_query"], task["page_name"]
+        if self.settings.value("scrape_serp", "true") == "true" and not self.abort_flag:
+            self.log_message.emit(f"开始处理Google搜索数据，搜索查询: {search_query}")
+            if not self.skip_fresh("serp", search_query, SERP_LOCALE, page_name):
+                started = time.time()
+                self.run_checkpointed("serp", self.process_google_search_incognito,
+                                      search_query, page_name, task["screenshot_dir"])
+                self.record_fresh("serp", search_query, SERP_LOCALE, page_name, started)
+        else:
+            self.log_message.emit("已跳过SERP数据抓取（根据设置或任务已中止）")
+    
+    def stage_semrush(self, task):
+        """SEMrush阶段"""
+        page_name = task["page_name"]
+        if self.settings.value("scrape_semrush", "true") == "true" and not self.abort_flag:
+            self.log_message.emit(f"开始处理SEMrush关键词数据")
+            semrush_key = page_name.replace("-", " ")
+            if not self.skip_fresh("semrush", semrush_key, semrush_module.SEMRUSH_DB, page_name):
+                started = time.time()
+                self.run_checkpointed("semrush", self.run_semrush_stage, page_name, task["screenshot_dir"])
+                self.record_fresh("semrush", semrush_key, semrush_module.SEMRUSH_DB, page_name, started)
+        else:
+            self.log_message.emit("已跳过SEMrush数据抓取（根据设置或任务已中止）")
+    
+    def process_url(self, page_url):
+        """依次执行单个URL或关键词的各个阶段（原创文章模式下只处理SERP和SEMrush）"""
+        # 检查中止标志
+        if self.abort_flag:
+            self.log_message.emit("任务已被中止")
+            return
+        
+        task = self.prepare_item(page_url)
+        # 某个阶段失败（包括被Google封锁）时继续处理后续阶段，任务结束时再标记失败，
+        # 已完成的阶段有检查点，重试时只重新执行失败的阶段
+        stage_error = None
+        try:
+            if not self.is_original_mode:
+                try:
+                    self.stage_gsc_ga(task)
+                except Exception as e:
+                    self.log_message.emit(f"GSC/GA阶段失败，继续处理后续阶段: {str(e)}")
+                    stage_error = e
+                
+                # 检查中止标志
+                if self.abort_flag:
+                    self.log_message.emit("任务已被中止")
+                    return
+            
+            try:
+                self.stage_serp(task)
+            except Exception as e:
+                self.log_message.emit(f"SERP阶段失败，继续处理后续阶段: {str(e)}")
+                stage_error = stage_error or e
+            
+            # 检查中止标志
+            if self.abort_flag:
+                self.log_message.emit("任务已被中止")
+                return
+            
+            self.stage_semrush(task)
+            
+            if stage_error is not None:
+                raise stage_error
+        except Exception as e:
+            self.log_message.emit(f"执行RPA时出错: {str(e)}")
+            raise e
+        finally:
+            self.flush_markdown()
+    
+    @contextmanager
+    def persistent_profile(self):
+        """独占使用chrome_profile
+
+        同一个配置文件同一时间只能被一个浏览器打开。并发模式下各工作线程轮流使用，
+        阶段结束后立即关闭持久化上下文，把配置文件让给其他线程。
+        启用配置文件副本时，当前线程租用一个副本并一直使用到线程结束，无需轮流。
+        """
+        if self.profile_manager is not None:
+            if self.profile_lease is None:
+                lease = self.profile_manager.acquire(lambda: self.abort_flag)
+                if lease is None:
+                    raise Exception("任务已中止，未能租用浏览器配置文件副本")
+                self._local.profile_lease = lease
+                self.log_message.emit(f"租用浏览器配置文件副本 {lease.index}")
+            yield self.browser_pool
+            return
+        
+        with self.persistent_lock:
+            try:
+                yield self.browser_pool
+            finally:
+                # 分阶段模式下只有GSC/GA阶段的一个工作线程使用配置文件，无需让出
+                if self.concurrency > 1 and not self.staged:
+                    self.browser_pool.close_persistent()
+    
+    def run_gsc_ga_stage(self, scrape_gsc, scrape_ga, gsc_url, ga_url, page_name,
+                         first_screenshot_path, second_screenshot_path, ga_screenshot_path, screenshot_dir):
+        """在浏览器池的持久化上下文中处理GSC和GA（需要登录状态）
+
+        两者都需要抓取时，GA在同一持久化上下文的第二个标签页中先开始加载，
+        GA报表在浏览器中渲染的同时处理GSC，GSC完成后GA页面通常已就绪。
+
+        Returns:
+            bool: 需要抓取的GSC和GA是否都成功
+        """
+        with self.persistent_profile() as pool:
+            page = pool.new_persistent_page("GSC/GA")
+            ga_page = None
+            ga_prepared = None
+            stage_start = time.time()
+            gsc_seconds = ga_seconds = 0.0
+            gsc_ok = ga_ok = True
+            try:
+                self.setup_page(page)
+                
+                if scrape_gsc and scrape_ga and self.settings.value("gsc_ga_parallel", "true") == "true":
+                    ga_page = pool.new_persistent_page("GA")
+                    self.setup_page(ga_page)
+                    ga_prepared = self.start_ga_navigation(ga_page, ga_url)
+                
+                # 处理GSC
+                if scrape_gsc and not self.abort_flag:
+                    gsc_start = time.time()
+                    gsc_ok = self.process_gsc(page, gsc_url, page_name, first_screenshot_path,
+                                              second_screenshot_path, screenshot_dir)
+                    gsc_seconds = time.time() - gsc_start
+                else:
+                    self.log_message.emit("已跳过GSC数据抓取（根据设置或任务已中止）")
+                
+                # 检查中止标志
+                if self.abort_flag:
+                    self.log_message.emit("任务已被中止")
+                    return False
+                
+                # 处理GA
+                if scrape_ga and not self.abort_flag:
+                    ga_start = time.time()
+                    ga_ok = self.process_ga(ga_page or page, ga_url, page_name, ga_screenshot_path, screenshot_dir,
+                                            prepared=ga_prepared)
+                    ga_seconds = time.time() - ga_start
+                else:
+                    self.log_message.emit("已跳过GA数据抓取（根据设置或任务已中止）")
+                
+                if ga_prepared is not None:
+                    ga_tab_seconds = time.time() - ga_prepared["started"]
+                    self.log_message.emit(
+                        f"GSC/GA并行: GSC标签页 {gsc_seconds:.1f} 秒，GA标签页 {ga_tab_seconds:.1f} 秒"
+                        f"（GSC完成后仅需 {ga_seconds:.1f} 秒），阶段总耗时 {time.time() - stage_start:.1f} 秒"
+                    )
+                else:
+                    self.log_message.emit(
+                        f"GSC/GA耗时: GSC {gsc_seconds:.1f} 秒，GA {ga_seconds:.1f} 秒，"
+                        f"阶段总耗时 {time.time() - stage_start:.1f} 秒"
+                    )
+                return gsc_ok and ga_ok
+            finally:
+                if ga_prepared is not None:
+                    ga_prepared["watcher"].detach()
+                    ga_prepared["capture"].detach()
+                # 关闭GSC/GA页面，浏览器保留给后续阶段和URL复用
+                for opened in (page, ga_page):
+                    if opened is None:
+                        continue
+                    try:
+                        opened.close()
+                    except Exception:
+                        pass
+    
+    def start_ga_navigation(self, page, ga_url):
+        """在GA标签页中开始导航（只等待导航提交），报表在后台继续加载
+
+        Returns:
+            dict: 导航前开始监听的 watcher、capture 和导航开始时间，传给process_ga的prepared参数
+        """
+        self.log_message.emit(f"在第二个标签页中预先加载GA4分析页面: {ga_url}")
+        prepared = {
+            "watcher": ResponseWatcher(page, GA_DATA_PATTERNS),
+            "capture": GaResponseCapture(page),
+            "started": time.time(),
+        }
+        try:
+            self.throttle(ga_url)
+            self.cancel_token.goto(page, ga_url, wait_until="commit", timeout=90000)
+        except CancelledError:
+            prepared["watcher"].detach()
+            prepared["capture"].detach()
+            raise
+        except Exception as e:
+            self.log_message.emit(f"预先加载GA4页面时出错，将在GSC完成后重新加载: {str(e)}")
+            prepared["watcher"].detach()
+            prepared["capture"].detach()
+            return None
+        return prepared
+    
+    def run_semrush_stage(self, page_name, screenshot_dir):
+        """在无痕浏览器的独立上下文中处理SEMrush，复用已保存的登录状态，返回是否获取到数据"""
+        context = self.browser_pool.new_incognito_context(
+            "SEMrush",
+            viewport={'width': 1920, 'height': 1080},
+            **self.semrush_session.context_options()
+        )
+        try:
+            page = context.new_page()
+            self.setup_page(page)
+            export_max_pages = self.setting_int("semrush_export_max_pages", 50)
+            success = semrush_module.process_semrush(
+                self.log_message.emit, page, page_name, screenshot_dir,
+                session=self.semrush_session,
+                rate_limiter=self.rate_limiter,
+                deep_export=self.settings.value("semrush_deep_export", "false") == "true",
+                export_format=self.settings.value("semrush_export_format", "csv"),
+                export_max_pages=export_max_pages,
+                store=self.result_store,
+                cancel_token=self.cancel_token
+            )
+            self.pending_markdown.add(page_name)
+            return success
+        finally:
+            try:
+                context.close()
+            except Exception:
+                pass
+    
+    def extract_page_name(self, url):
+        """从URL中提取页面名称"""
+        try:
+            parsed_url = urllib.parse.urlparse(url)
+            path = parsed_url.path
+            
+            if path.startswith('/'):
+                path = path[1:]
+            if path.endswith('.html'):
+                path = path[:-5]
+                
+            page_name = path.split('/')[-1]
+            return page_name
+        except Exception as e:
+            self.log_message.emit(f"URL解析错误: {str(e)}")
+            return "unknown-page"
+            
+    def extract_domain(self, url):
+        """从URL中提取域名"""
+        try:
+            parsed_url = urllib.parse.urlparse(url)
+            return parsed_url.netloc
+        except Exception as e:
+            self.log_message.emit(f"域名解析错误: {str(e)}")
+            return "example.com"
+            
+    def build_urls(self, page_url, domain, page_name):
+        """构建GSC和GA的URL"""
+        # 解析URL获取完整路径
+        parsed_url = urllib.parse.urlparse(page_url)
+        path = parsed_url.path
+        
+        # 构建GSC URL
+        encoded_domain = urllib.parse.quote(f"https://{domain}/")
+        encoded_page = urllib.parse.quote(page_url)
+        gsc_url = f"https://search.google.com/u/0/search-console/performance/search-analytics?resource_id={encoded_domain}&metrics=CLICKS%2CIMPRESSIONS%2CPOSITION&breakdown=query&pli=1&page=*{encoded_page}&num_of_months=3"
+        
+        # 构建GA URL
+        ga_url = f"https://analytics.google.com/analytics/web/?authuser=0#/p309178187/reports/explorer?params=_u..nav%3Dmaui%26_r.explorerCard..startRow%3D0%26_r.explorerCard..filterTerm%3D{page_name}%26_u.dateOption%3Dlast90Days%26_u.comparisonOption%3Ddisabled%26_r.explorerCard..columnFilters%3D%7B%22conversionEvent%22:%22wclick_download%22%7D&r=5958195737&ruid=landing-page,life-cycle,engagement&collectionId=5958209258"
+        
+        self.log_message.emit(f"构建的GSC URL: {gsc_url}")
+        self.log_message.emit(f"构建的GA URL: {ga_url}")
+        
+        return gsc_url, ga_url
+    
+    def launch_browser(self, playwright):
+        """启动浏览器"""
+        self.log_message.emit("启动浏览器...")
+        
+        # 使用当前目录下的chrome_profile文件夹作为用户数据目录；租用了副本时使用副本，
+        # 并在启动前同步主配置文件中更新的Cookie
+        lease = self.profile_lease
+        if lease is not None:
+            self.profile_manager.refresh(lease)
+            user_data_dir = lease.path
+        else:
+            user_data_dir = os.path.join(os.getcwd(), DEFAULT_PROFILE_DIR)
+        
+        # 随机选择用户代理
+        user_agents = [
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36 Edg/121.0.0.0"
+        ]
+        user_agent = random.choice(user_agents)
+        
+        # 获取模式设置
+        headless = self.settings.value("headless_mode", "false") == "true"
+        invisible_browser = self.settings.value("invisible_browser", "true") == "true"
+        
+        # 增强反检测浏览器参数
+        browser_args = [
+            '--profile-directory=Default',
+            '--disable-blink-features=AutomationControlled',
+            '--no-sandbox',
+            '--disable-extensions',
+            '--disable-default-apps',
+            '--disable-popup-blocking',
+            '--start-maximized',
+            f'--user-agent={user_agent}',
+            # 增加以下参数来绕过检测
+            '--disable-web-security',
+            '--disable-features=IsolateOrigins,site-per-process',
+            '--disable-site-isolation-trials',
+            '--disable-blink-features',
+            '--disable-device-orientation',
+            '--disable-features=Translate',
+            '--disable-infobars',
+            '--ignore-certifcate-errors',
+            '--ignore-certifcate-errors-spki-list',
+            '--allow-running-insecure-content',
+            '--disable-gpu',
+            # GSC和GA在两个标签页中同时加载，避免后台标签页被降低计时器和渲染优先级
+            '--disable-background-timer-throttling',
+            '--disable-backgrounding-occluded-windows',
+            '--disable-renderer-backgrounding'
+        ]
+        
+        # 根据设置选择启动模式
+        if self.display is not None:
+            # 虚拟显示器模式 - 有头浏览器运行在独立的Xvfb上，无需移动窗口
+            self.log_message.emit(f"在虚拟显示器 {self.display} 上使用有头模式")
+            browser = playwright.chromium.launch_persistent_context(
+                user_data_dir=user_data_dir,
+                headless=False,
+                viewport={'width': 1920, 'height': 1080},
+                args=browser_args + ['--window-size=1920,1080'],
+                env=self.browser_env()
+            )
+        elif headless:
+            # 完全无头模式 - 可能被检测
+            self.log_message.emit("使用完全无头模式 (可能被检测为机器人)")
+            browser = playwright.chromium.launch_persistent_context(
+                user_data_dir=user_data_dir,
+                headless=True,
+                viewport={'width': 1920, 'height': 1080},
+                args=browser_args
+            )
+        elif invisible_browser:
+            # 隐形浏览器模式 - 使用兼容方法实现
+            self.log_message.emit("使用隐形浏览器模式 (有浏览器但不可见，降低被检测概率)")
+            # 确保窗口被正确放置在屏幕外，通过JavaScript而不仅仅是启动参数
+            invisible_args = browser_args + [
+                '--window-size=1920,1080'
+                # 移除 '--window-position' 启动参数，改为用JavaScript控制
+            ]
+            
+            try:
+                # 尝试使用带is_visible参数的方法（新版本Playwright）
+                browser = playwright.chromium.launch_persistent_context(
+                    user_data_dir=user_data_dir,
+                    headless=False,
+                    is_visible=False,  # 可能不被支持
+                    reduce_motion="reduce",
+                    viewport={'width': 1920, 'height': 1080},
+                    args=invisible_args
+                )
+            except TypeError:
+                # 如果is_visible不被支持，使用不带该参数的方法
+                self.log_message.emit("当前Playwright版本不支持is_visible参数，使用备选方法")
+                browser = playwright.chromium.launch_persistent_context(
+                    user_data_dir=user_data_dir,
+                    headless=False,
+                    viewport={'width': 1920, 'height': 1080},
+                    args=invisible_args
+                )
+            
+            # 确保窗口在屏幕外（即使没有is_visible参数也能工作）
+            try:
+                # 等待一个页面加载
+                self.cancel_token.sleep(1)
+                # 安全处理页面访问
+                pages = browser.pages
+                if callable(pages):
+                    pages = pages()
+                
+                if pages and len(pages) > 0:
+                    # 使用JavaScript将窗口移动到屏幕外，但确保位置值有效
+                    first_page = pages[0]
+                    if hasattr(first_page, 'evaluate') and callable(first_page.evaluate):
+                        first_page.evaluate("""
+                            try {
+                                // 尝试将窗口移到屏幕外
+                                window.moveTo(-10000, -10000);
+                                // 如果不成功，尝试另一种方法
+                                if (window.screenX > -5000) {
+                                    window.moveTo(-2000, -2000);
+                                }
+                                window.resizeTo(1920, 1080);
+                            } catch (e) {
+                                console.error("无法移动窗口", e);
+                            }
+                        """)
+            except Exception as e:
+                self.log_message.emit(f"移动窗口时出错: {str(e)}")
+        else:
+            # 常规有头模式
+            self.log_message.emit("使用正常有头模式")
+            browser = playwright.chromium.launch_persistent_context(
+                user_data_dir=user_data_dir,
+                headless=False,
+                viewport={'width': 1920, 'height': 1080},
+                args=browser_args
+            )
+        
+        return browser
+    
+    def setup_page(self, page):
+        """设置页面参数和反检测措施"""
+        # 执行窗口最大化
+        page.evaluate("""
+            window.moveTo(0, 0);
+            window.resizeTo(screen.width, screen.height);
+        """)
+        
+        # 添加CDP会话进一步修改浏览器指纹
+        client = page.context.new_cdp_session(page)
+        
+        # 通过CDP会话执行更多反检测
+        self.log_message.emit("应用反检测措施...")
+        
+        # 修改WebRTC行为
+        client.send("Page.addScriptToEvaluateOnNewDocument", {
+            "source": """
+                // 阻止WebRTC泄露真实IP
+                const originalGetUserMedia = navigator.mediaDevices?.getUserMedia;
+                if (originalGetUserMedia) {
+                    navigator.mediaDevices.getUserMedia = function() {
+                        return new Promise((resolve, reject) => {
+                            reject(new DOMException('Permission denied', 'NotAllowedError'));
+                        });
+                    };
+                }
+                
+                // 阻止WebRTC API
+                if (RTCPeerConnection) {
+                    RTCPeerConnection = function() {
+                        throw new Error("WebRTC is disabled");
+                    };
+                    RTCPeerConnection.prototype = {};
+                }
+            """
+        })
+        
+        # 模拟正常的Canvas指纹
+        client.send("Page.addScriptToEvaluateOnNewDocument", {
+            "source": """
+                // 修改Canvas指纹
+                const originalToDataURL = HTMLCanvasElement.prototype.toDataURL;
+                const originalGetImageData = CanvasRenderingContext2D.prototype.getImageData;
+                
+                HTMLCanvasElement.prototype.toDataURL = function(type) {
+                    if (this.width > 1 && this.height > 1) {
+                        // 轻微修改Canvas数据来改变指纹
+                        const context = this.getContext("2d");
+                        const imageData = context.getImageData(0, 0, 1, 1);
+                        // 随机改变一个像素
+                        imageData.data[0] = imageData.data[0] < 255 ? imageData.data[0] + 1 : imageData.data[0] - 1;
+                        context.putImageData(imageData, 0, 0);
+                    }
+                    return originalToDataURL.apply(this, arguments);
+                };
+                
+                CanvasRenderingContext2D.prototype.getImageData = function() {
+                    const imageData = originalGetImageData.apply(this, arguments);
+                    // 略微修改ImageData
+                    if (imageData && imageData.data && imageData.data.length > 10) {
+                        const offset = Math.floor(Math.random() * (imageData.data.length - 10));
+                        imageData.data[offset] = (imageData.data[offset] + 1) % 256;
+                    }
+                    return imageData;
+                };
+            """
+        })
+        
+        # 应用一般反检测措施
+        client.send('Page.addScriptToEvaluateOnNewDocument', {
+            'source': '''
+                // 覆盖navigator.webdriver
+                Object.defineProperty(navigator, 'webdriver', {
+                    get: () => false,
+                });
+                
+                // 覆盖window.navigator.chrome
+                window.navigator.chrome = {
+                    runtime: {},
+                    app: {
+                        InstallState: {
+                            DISABLED: 'disabled',
+                            INSTALLED: 'installed',
+                            NOT_INSTALLED: 'not_installed'
+                        },
+                        RunningState: {
+                            CANNOT_RUN: 'cannot_run',
+                            READY_TO_RUN: 'ready_to_run',
+                            RUNNING: 'running'
+                        },
+                        getDetails: function() {},
+                        getIsInstalled: function() {},
+                        installState: function() { 
+                            return 'installed';
+                        },
+                        isInstalled: true,
+                        runningState: function() {
+                            return 'running';
+                        }
+                    }
+                };
+                
+                // 覆盖window.chrome
+                window.chrome = {
+                    runtime: {
+                        OnInstalledReason: {
+                            CHROME_UPDATE: 'chrome_update',
+                            INSTALL: 'install',
+                            SHARED_MODULE_UPDATE: 'shared_module_update',
+                            UPDATE: 'update'
+                        },
+                        OnRestartRequiredReason: {
+                            APP_UPDATE: 'app_update',
+                            OS_UPDATE: 'os_update',
+                            PERIODIC: 'periodic'
+                        },
+                        PlatformArch: {
+                            ARM: 'arm',
+                            ARM64: 'arm64',
+                            MIPS: 'mips',
+                            MIPS64: 'mips64',
+                            X86_32: 'x86-32',
+                            X86_64: 'x86-64'
+                        },
+                        PlatformNaclArch: {
+                            ARM: 'arm',
+                            MIPS: 'mips',
+                            MIPS64: 'mips64',
+                            X86_32: 'x86-32',
+                            X86_64: 'x86-64'
+                        },
+                        PlatformOs: {
+                            ANDROID: 'android',
+                            CROS: 'cros',
+                            LINUX: 'linux',
+                            MAC: 'mac',
+                            OPENBSD: 'openbsd',
+                            WIN: 'win'
+                        },
+                        RequestUpdateCheckStatus: {
+                            NO_UPDATE: 'no_update',
+                            THROTTLED: 'throttled',
+                            UPDATE_AVAILABLE: 'update_available'
+                        }
+                    },
+                    app: {
+                        isInstalled: true
+                    }
+                };
+                
+                // 修改navigator.plugins
+                const makePluginArray = () => {
+                    const plugins = [
+                        { name: 'Chrome PDF Plugin', filename: 'internal-pdf-viewer', description: 'Portable Document Format' },
+                        { name: 'Chrome PDF Viewer', filename: 'mhjfbmdgcfjbbpaeojofohoefgiehjai', description: 'Portable Document Format' },
+                        { name: 'Native Client', filename: 'internal-nacl-plugin', description: '' }
+                    ];
+                    
+                    const pluginArray = plugins.map(plugin => {
+                        const pluginObj = {};
+                        Object.defineProperty(pluginObj, 'name', { value: plugin.name });
+                        Object.defineProperty(pluginObj, 'filename', { value: plugin.filename });
+                        Object.defineProperty(pluginObj, 'description', { value: plugin.description });
+                        return pluginObj;
+                    });
+                    
+                    return Object.create(PluginArray.prototype, {
+                        length: { value: plugins.length },
+                        item: { value: index => pluginArray[index] },
+                        namedItem: { value: name => pluginArray.find(plugin => plugin.name === name) },
+                        ...pluginArray.reduce((acc, plugin, index) => {
+                            acc[index] = { value: plugin };
+                            return acc;
+                        }, {})
+                    });
+                };
+                
+                // 应用插件覆盖
+                Object.defineProperty(navigator, 'plugins', {
+                    get: () => makePluginArray(),
+                });
+                
+                // 覆盖语言设置
+                Object.defineProperty(navigator, 'languages', {
+                    get: () => ['zh-CN', 'zh', 'en-US', 'en'],
+                });
+                
+                // 模拟正常的硬件并发层级
+                Object.defineProperty(navigator, 'hardwareConcurrency', {
+                    get: () => 8,
+                });
+                
+                // 模拟正常的设备内存
+                Object.defineProperty(navigator, 'deviceMemory', {
+                    get: () => 8,
+                });
+                
+                // 修改连接信息
+                Object.defineProperty(navigator, 'connection', {
+                    get: () => ({
+                        effectiveType: '4g',
+                        rtt: 50,
+                        downlink: 10.0,
+                        saveData: false
+                    }),
+                });
+                
+                // 模拟Notification API
+                Object.defineProperty(window, 'Notification', {
+                    get: () => function(title, options) {
+                        this.title = title;
+                        this.options = options;
+                        this.permission = 'granted';
+                    }
+                });
+                
+                // 修改屏幕尺寸信息
+                Object.defineProperty(window, 'screen', {
+                    get: () => ({
+                        availHeight: 1040,
+                        availLeft: 0,
+                        availTop: 0,
+                        availWidth: 1920,
+                        colorDepth: 24,
+                        height: 1080,
+                        width: 1920,
+                        pixelDepth: 24
+                    })
+                });
+                
+                // WebGL指纹修改
+                const getParameter = WebGLRenderingContext.prototype.getParameter;
+                WebGLRenderingContext.prototype.getParameter = function(parameter) {
+                    // UNMASKED_VENDOR_WEBGL
+                    if (parameter === 37445) {
+                        return 'Google Inc. (NVIDIA)';
+                    }
+                    // UNMASKED_RENDERER_WEBGL
+                    if (parameter === 37446) {
+                        return 'ANGLE (NVIDIA, NVIDIA GeForce GTX 1070 Direct3D11 vs_5_0 ps_5_0, D3D11)';
+                    }
+                    return getParameter.apply(this, arguments);
+                };
+                
+                // 封锁Automation检测
+                const newProto = navigator.__proto__;
+                delete newProto.webdriver;
+                navigator.__proto__ = newProto;
+                
+                // 阻止特征检测的特定属性
+                Object.defineProperty(navigator, 'permissions', {
+                    get: () => {
+                        return {
+                            query: function() { 
+                                return Promise.resolve({state: 'prompt'});
+                            }
+                        }
+                    }
+                });
+            '''
+        })
+        
+        # 修复CSS和布局问题
+        page.evaluate("""
+            // 强制重新计算布局
+            document.body.style.width = '100vw';
+            document.body.style.height = '100vh';
+            document.body.style.overflow = 'auto';
+            
+            // 触发窗口大小调整事件
+            window.dispatchEvent(new Event('resize'));
+        """)
+    
+    def report_ready_ceiling(self):
+        """GSC/GA报表就绪检测的最长等待时间（秒）"""
+        return self.setting_float("report_ready_ceiling", 10)
+    
+    def process_gsc(self, page, gsc_url, page_name, first_screenshot_path, second_screenshot_path, screenshot_dir):
+        """处理GSC相关的任务，返回是否提取到查询数据（截图失败时改用整页截图，不算失败）"""
+        self.log_message.emit("导航到Google Search Console...")
+        # 在导航前开始监听报表数据请求
+        watcher = ResponseWatcher(page, GSC_DATA_PATTERNS)
+        capture = None
+        if self.settings.value("gsc_capture_mode", "true") == "true":
+            capture = GscResponseCapture(page)
+        self.throttle(gsc_url)
+        self.cancel_token.goto(page, gsc_url, timeout=60000)
+        
+        # 检查是否需要登录
+        if page.url.startswith("https://accounts.google.com/"):
+            self.log_message.emit("检测到需要登录，开始自动登录流程...")
+            # 从设置中获取账号密码
+            google_account = self.settings.value("google_account", "")
+            google_password = self.settings.temp_password if hasattr(self.settings, "temp_password") else ""
+            
+            if not google_account or not google_password:
+                self.log_message.emit("错误: 未设置谷歌账号或密码，无法自动登录")
+                raise Exception("未设置谷歌账号或密码，请在设置中填写")
+                
+            self.handle_google_login(page, google_account, google_password)
+            self.log_message.emit("登录完成，继续执行...")
+        
+        # 添加随机滚动
+        for _ in range(random.randint(2, 4)):
+            page.mouse.wheel(0, random.randint(100, 300))
+            self.cancel_token.sleep(random.uniform(0.5, 1.5))
+        
+        # 截取第一个图表
+        try:
+            selector = "#yDmH0d > c-wiz.zQTmif.SSPGKf.eejsDc > c-wiz > div > div.OoO4Vb > div > div > div.VfPpkd-WsjYwc.VfPpkd-WsjYwc-OWXEXe-INsAgc.KC1dQ.Usd1Ac.AaN0Dd.YJ1SEc.pTyMIf > c-wiz"
+            
+            # 等待报表数据到达且图表渲染稳定，而不是固定等待10秒
+            self.log_message.emit("等待GSC报表数据加载...")
+            try:
+                wait_for_report_ready(self.log_message.emit, page, watcher, selector,
+                                      self.report_ready_ceiling(), label="GSC报表",
+                                      cancel_token=self.cancel_token)
+            finally:
+                watcher.detach()
+            
+            self.log_message.emit("定位第一个目标元素...")
+            element = self.cancel_token.wait(page.wait_for_selector, selector, timeout=90000)
+            
+            if element:
+                self.log_message.emit("找到元素，正在截图...")
+                element.screenshot(path=first_screenshot_path)
+                self.log_message.emit(f"第一个截图已保存为: {first_screenshot_path}")
+            else:
+                raise Exception("未找到目标元素")
+        except Exception as e:
+            self.log_message.emit(f"定位元素时出错: {str(e)}")
+            self.log_message.emit("尝试全页截图作为备选...")
+            full_page_path = os.path.join(screenshot_dir, f"gsc-{page_name}-chart1-full.png")
+            page.screenshot(path=full_page_path, full_page=True)
+            self.log_message.emit(f"整页截图已保存为: {full_page_path}")
+        
+        # 点击并截取第二个图表
+        try:
+            self.log_message.emit("进行额外操作：点击指定元素...")
+            click_selector = "#\\31  > div > c-wiz > div > div > div:nth-child(2) > div:nth-child(2) > div > table > thead > tr > th:nth-child(3) > span > button > span > svg"
+            
+            self.cancel_token.wait(page.wait_for_selector, click_selector, state="visible", timeout=45000)
+            self.log_message.emit(f"点击元素: {click_selector}")
+            page.click(click_selector)
+            
+            self.cancel_token.sleep(random.uniform(0.5, 1.0))
+            
+            second_selector = "#yDmH0d > c-wiz.zQTmif.SSPGKf.eejsDc > c-wiz > div > div.OoO4Vb > div > div > div:nth-child(2) > div"
+            
+            self.log_message.emit(f"定位第二个目标元素: {second_selector}")
+            second_element = self.cancel_token.wait(page.wait_for_selector, second_selector, timeout=45000)
+            
+            if second_element:
+                self.log_message.emit("找到第二个元素，正在截图...")
+                second_element.screenshot(path=second_screenshot_path)
+                self.log_message.emit(f"第二个截图已保存为: {second_screenshot_path}")
+            else:
+                self.log_message.emit("未找到第二个元素")
+        except Exception as e:
+            self.log_message.emit(f"执行额外操作时出错: {str(e)}")
+            self.log_message.emit("尝试全页截图作为备选...")
+            second_full_page_path = os.path.join(screenshot_dir, f"gsc-{page_name}-chart2-full.png")
+            page.screenshot(path=second_full_page_path, full_page=True)
+            self.log_message.emit(f"第二个全页截图已保存为: {second_full_page_path}")
+        
+        # 优先使用捕获的网络响应，失败时再从页面表格提取
+        if capture:
+            capture.detach()
+            if self.update_md_from_capture(capture, page_name):
+                return True
+            self.log_message.emit("未能从网络响应中解析出GSC查询数据，改用页面表格提取")
+        
+        # 提取GSC前10个结果并更新MD文件
+        return self.extract_and_update_md(page, page_name)
+    
+    def update_md_from_capture(self, capture, page_name):
+        """把从GSC数据响应中解析出的查询数据（查询、点击、展示、CTR、排名）写入MD文件"""
+        try:
+            rows = capture.extract_rows(self.log_message.emit)
+        except Exception as capture_error:
+            self.log_message.emit(f"解析GSC网络响应时出错: {str(capture_error)}")
+            return False
+        if not rows:
+            return False
+        
+        # 0表示保留整张表
+        limit = self.setting_int("gsc_query_limit", 0)
+        if limit > 0:
+            rows = rows[:limit]
+        for i, row in enumerate(rows[:10]):
+            self.log_message.emit(f"提取到查询 {i+1}: {row['query']} (点击 {row['clicks']}, 展示 {row['impressions']})")
+        
+        self.update_markdown_file(page_name, [format_gsc_row(row) for row in rows], "GSC热门查询",
+                                  headers=["Query", "Clicks", "Impressions", "CTR", "Position"])
+        return True
+    
+    def extract_and_update_md(self, page, page_name):
+        """提取GSC前10个查询并更新MD文件，返回是否成功"""
+        try:
+            self.log_message.emit("提取GSC前10个结果...")
+            
+            # 使用一个更通用的选择器来获取表体
+            tbody_selector = "#\\31  > div > c-wiz > div > div > div:nth-child(2) > div:nth-child(2) > div > table > tbody"
+            
+            # 直接等待表体加载
+            self.cancel_token.wait(page.wait_for_selector, tbody_selector, timeout=45000)
+            
+            # 获取前10个查询文本
+            gsc_queries = []
+            
+            # 获取所有行，然后提取前10个
+            rows = page.query_selector_all(f"{tbody_selector} > tr")
+            self.log_message.emit(f"找到 {len(rows)} 行数据")
+            
+            # 确保我们最多只处理10行
+            rows = rows[:10] if len(rows) > 10 else rows
+            
+            for i, row in enumerate(rows):
+                try:
+                    # 获取每行的第一个单元格（查询名称）
+                    query_cell = row.query_selector("td.XgRaPc[data-label='QUERIES'] span span")
+                    if query_cell:
+                        query_text = query_cell.inner_text().strip()
+                        gsc_queries.append(query_text)
+                        self.log_message.emit(f"提取到查询 {i+1}: {query_text}")
+                    else:
+                        # 备选方法：尝试其他选择器模式
+                        query_cell = row.query_selector("td:first-child")
+                        if query_cell:
+                            query_text = query_cell.inner_text().strip()
+                            gsc_queries.append(query_text)
+                            self.log_message.emit(f"使用备选选择器提取到查询 {i+1}: {query_text}")
+                        else:
+                            self.log_message.emit(f"无法提取第 {i+1} 行的查询文本")
+                except Exception as row_error:
+                    self.log_message.emit(f"处理第 {i+1} 行时出错: {str(row_error)}")
+            
+            # 如果上述方法失败，尝试使用JavaScript评估来获取文本
+            if not gsc_queries:
+                self.log_message.emit("尝试使用JavaScript评估提取查询...")
+                gsc_queries = page.evaluate("""
+                    () => {
+                        const rows = document.querySelectorAll("table tbody tr");
+                        const queries = [];
+                        for (let i = 0; i < Math.min(10, rows.length); i++) {
+                            const cell = rows[i].querySelector("td:first-child");
+                            if (cell) {
+                                queries.push(cell.textContent.trim());
+                            }
+                        }
+                        return queries;
+                    }
+                """)
+                self.log_message.emit(f"使用JavaScript评估提取到 {len(gsc_queries)} 个查询")
+            
+            if not gsc_queries:
+                # 不写入空的GSC部分，阶段记为失败，稍后重试
+                self.log_message.emit("未能从页面表格中提取到GSC查询")
+                return False
+            
+            # 更新markdown文件
+            self.update_markdown_file(page_name, gsc_queries, "GSC热门查询")
+            return True
+            
+        except Exception as extract_error:
+            self.log_message.emit(f"提取查询时出错: {str(extract_error)}")
+            return False
+    
+    def update_markdown_file(self, page_name, items, section_name, headers=None):
+        """把提取的内容写入结果存储，MD文件在URL处理结束时由flush_markdown统一渲染
+
+        默认以有序列表渲染；提供headers时items为数据行，以表格渲染。
+        """
+        if not items:
+            self.log_message.emit(f"没有{section_name}结果可以更新到MD文件")
+            return
+        
+        source = SOURCE_BY_SECTION.get(section_name, section_name)
+        try:
+            self.result_store.save(page_name, source, items, headers)
+        except Exception as e:
+            self.log_message.emit(f"写入结果存储时出错: {str(e)}")
+            return
+        
+        # MD文件在URL处理结束时统一渲染
+        self.pending_markdown.add(page_name)
+        self.log_message.emit(f"成功将 {len(items)} 个{section_name}结果保存到结果存储")
+    
+    def update_md_from_ga_capture(self, capture, page_name):
+        """把从GA4数据响应中解析出的落地页指标写入MD文件"""
+        try:
+            headers, rows = capture.extract_report(self.log_message.emit)
+        except Exception as capture_error:
+            self.log_message.emit(f"解析GA4网络响应时出错: {str(capture_error)}")
+            return False
+        if not rows:
+            self.log_message.emit("未能从网络响应中解析出GA4报表数据")
+            return False
+        
+        for i, row in enumerate(rows[:10]):
+            self.log_message.emit(f"GA4数据 {i+1}: {' | '.join(row)}")
+        self.update_markdown_file(page_name, rows, "GA落地页数据", headers=headers)
+        return True
+    
+    def query_first_element(self, page, selectors):
+        """按优先级直接查询选择器，返回第一个找到的元素及其选择器"""
+        for selector in selectors:
+            try:
+                element = page.query_selector(selector)
+            except Exception:
+                continue
+            if element:
+                return element, selector
+        return None, None
+    
+    def process_ga(self, page, ga_url, page_name, ga_screenshot_path, screenshot_dir, prepared=None):
+        """处理GA相关的任务
+
+        prepared为start_ga_navigation的返回值时，页面已在GSC处理期间开始加载，不再重新导航。
+
+        Returns:
+            bool: 是否得到了GA数据或截图
+        """
+        try:
+            # 预先加载时如果被重定向到登录页（GSC标签页完成登录之前），需要重新导航
+            if prepared is not None and page.url.startswith("https://accounts.google.com/"):
+                self.log_message.emit("GA标签页预先加载时需要登录，重新加载GA4页面")
+                prepared["watcher"].detach()
+                prepared["capture"].detach()
+                prepared = None
+            if prepared is not None:
+                self.log_message.emit("使用预先加载的GA4分析页面")
+                watcher, capture = prepared["watcher"], prepared["capture"]
+            else:
+                self.log_message.emit(f"导航到GA4分析页面: {ga_url}")
+                # 在导航前开始监听报表数据请求
+                watcher = ResponseWatcher(page, GA_DATA_PATTERNS)
+                capture = GaResponseCapture(page)
+                self.throttle(ga_url)
+                self.cancel_token.goto(page, ga_url, timeout=90000)
+            
+            # 等待报表数据到达且报表卡片渲染稳定，而不是固定等待10秒
+            self.log_message.emit("等待GA4报表数据加载...")
+            try:
+                wait_for_report_ready(self.log_message.emit, page, watcher,
+                                      "ga-card-list.explorer-card-list, .explorer-card-content, report-view",
+                                      self.report_ready_ceiling(), label="GA4报表",
+                                      cancel_token=self.cancel_token)
+            finally:
+                watcher.detach()
+                capture.detach()
+            
+            # 从报表数据响应中提取落地页指标并写入MD文件
+            captured = self.update_md_from_ga_capture(capture, page_name)
+            
+            if self.settings.value("ga_screenshot", "true") != "true":
+                self.log_message.emit("已跳过GA4截图（根据设置）")
+                return captured
+            
+            # 执行额外的页面交互，帮助确保内容加载
+            try:
+                # 尝试滚动页面以确保触发懒加载内容
+                page.evaluate("""
+                    window.scrollTo(0, 100);
+                    setTimeout(() => { window.scrollTo(0, 0); }, 500);
+                """)
+                self.log_message.emit("执行页面滚动以触发内容加载")
+            except Exception as scroll_error:
+                self.log_message.emit(f"页面滚动时出错: {str(scroll_error)}")
+            
+            # 直接尝试定位GA4报表元素，使用新的选择器组合
+            ga_selectors = [
+                # 原始选择器
+                "body > ga-hybrid-app-root > ui-view-wrapper > div > app-root > div > div > ui-view-wrapper > div > ga-report-container > div > div > div > report-view > ui-view-wrapper > div > ui-view > ga-explorer-report > div > div > div > ga-card-list.explorer-card-list.ga-card-list.ng-star-inserted > div",
+                # 新版GA4的可能选择器
+                "report-view ga-explorer-report .explorer-cards-wrap",
+                "ga-report-container .grid-layout-wrap",
+                "ga-card-list.explorer-card-list",
+                ".ga-card-list",
+                "ga-report-container report-view",
+                # 更通用的选择器
+                "report-view .visualize-item-wrap",
+                ".explorer-card-content"
+            ]
+            base_selectors = list(ga_selectors)
+            
+            # 获取GA4页面结构以便找到正确的选择器
+            self.log_message.emit("分析GA4页面结构...")
+            try:
+                # 使用JavaScript来分析页面结构并找到可能的报表元素
+                selectors_info = page.evaluate("""
+                    () => {
+                        // 尝试查找GA4报表的各种可能元素
+                        const possibleElements = [
+                            // 卡片容器
+                            document.querySelectorAll('ga-card-list'),
+                            document.querySelectorAll('.ga-card-list'),
+                            document.querySelectorAll('.grid-layout-wrap'),
+                            document.querySelectorAll('.explorer-cards-wrap'),
+                            // 报表容器
+                            document.querySelectorAll('report-view'),
+                            document.querySelectorAll('ga-explorer-report'),
+                            document.querySelectorAll('.visualize-item-wrap'),
+                            // 图表元素
+                            document.querySelectorAll('.explorer-card'),
+                            document.querySelectorAll('.explorer-card-content')
+                        ];
+                        
+                        // 找到元素数量最多的集合
+                        let maxElements = null;
+                        let maxCount = 0;
+                        let description = '';
+                        
+                        possibleElements.forEach((collection, index) => {
+                            if (collection && collection.length > maxCount) {
+                                maxElements = collection;
+                                maxCount = collection.length;
+                                if (collection.length > 0 && collection[0]) {
+                                    description += `找到 ${collection.length} 个元素，类型: ${collection[0].tagName || 'unknown'}, `;
+                                    description += `类名: ${collection[0].className || 'no-class'}\n`;
+                                }
+                            }
+                        });
+                        
+                        // 尝试获取最大的报表容器元素
+                        let mainReportContainer = null;
+                        try {
+                            const reportContainers = document.querySelectorAll('ga-report-container');
+                            if (reportContainers && reportContainers.length > 0) {
+                                // 找到最大的报表容器
+                                let maxArea = 0;
+                                for (const container of reportContainers) {
+                                    const rect = container.getBoundingClientRect();
+                                    const area = rect.width * rect.height;
+                                    if (area > maxArea) {
+                                        maxArea = area;
+                                        mainReportContainer = container;
+                                    }
+                                }
+                            }
+                        } catch (e) {
+                            description += `查找报表容器错误: ${e.message}\n`;
+                        }
+                        
+                        // 获取页面结构
+                        const pageStructure = [];
+                        try {
+                            // 查找主要内容区域
+                            const reportView = document.querySelector('report-view');
+                            if (reportView) {
+                                // 生成选择器
+                                const getPath = (el) => {
+                                    if (!el) return '';
+                                    if (el === document.body) return 'body';
+                                    
+                                    let path = '';
+                                    
+                                    // 特殊处理组件标签
+                                    if (el.tagName && el.tagName.toLowerCase().includes('-')) {
+                                        path = el.tagName.toLowerCase();
+                                    } else {
+                                        path = el.tagName.toLowerCase();
+                                        if (el.className) {
+                                            const classes = el.className.split(' ')
+                                                .filter(c => c && !c.includes('ng-'))
+                                                .map(c => '.' + c)
+                                                .join('');
+                                            if (classes) path += classes;
+                                        }
+                                    }
+                                    
+                                    return getPath(el.parentElement) + ' > ' + path;
+                                };
+                                
+                                // 获取主要内容元素及其父元素链的选择器
+                                pageStructure.push({
+                                    element: 'reportView',
+                                    selector: getPath(reportView)
+                                });
+                                
+                                // 查找报表卡片
+                                const cards = reportView.querySelectorAll('.explorer-card, .explorer-card-content');
+                                if (cards && cards.length > 0) {
+                                    pageStructure.push({
+                                        element: 'cards',
+                                        count: cards.length,
+                                        selector: getPath(cards[0])
+                                    });
+                                }
+                            }
+                        } catch (e) {
+                            description += `生成选择器错误: ${e.message}\n`;
+                        }
+                        
+                        return {
+                            description: description,
+                            elementCount: maxCount,
+                            pageStructure: pageStructure,
+                            // 提供最可能的新选择器
+                            recommendedSelector: pageStructure.length > 0 ? 
+                                pageStructure[pageStructure.length - 1].selector : null
+                        };
+                    }
+                """)
+                
+                # 记录找到的选择器信息
+                if selectors_info:
+                    self.log_message.emit(f"GA4页面分析结果:\n{selectors_info.get('description', '')}")
+                    if selectors_info.get('recommendedSelector'):
+                        recommended_selector = selectors_info.get('recommendedSelector')
+                        self.log_message.emit(f"推荐的GA4选择器: {recommended_selector}")
+                        # 如果找到了推荐选择器，将其添加到尝试列表的开头
+                        if recommended_selector not in ga_selectors:
+                            ga_selectors.insert(0, recommended_selector)
+                            self.log_message.emit(f"已将推荐选择器添加到尝试列表")
+                    else:
+                        self.log_message.emit("未能生成推荐选择器")
+                
+            except Exception as analyze_error:
+                self.log_message.emit(f"分析GA4页面结构时出错: {str(analyze_error)}")
+            
+            self.log_message.emit("定位GA4报表元素...")
+            
+            # 先直接查询所有选择器（包括推荐选择器），都未找到时再同时等待任一选择器出现，
+            # 最多只等待一次超时，而不是逐个选择器依次等待
+            ga_element, used_selector = self.query_first_element(page, ga_selectors)
+            if not ga_element:
+                self.log_message.emit("等待任一GA4报表元素出现...")
+                try:
+                    self.cancel_token.wait(page.wait_for_selector, ", ".join(base_selectors), timeout=15000)
+                except Exception as wait_error:
+                    self.log_message.emit(f"等待GA4报表元素失败: {str(wait_error)}")
+                ga_element, used_selector = self.query_first_element(page, ga_selectors)
+            
+            found_element = False
+            if ga_element:
+                try:
+                    self.log_message.emit(f"找到GA4元素，使用选择器: {used_selector}")
+                    self.log_message.emit("正在截图...")
+                    ga_element.screenshot(path=ga_screenshot_path)
+                    self.log_message.emit(f"GA4截图已保存为: {ga_screenshot_path}")
+                    found_element = True
+                except Exception as screenshot_error:
+                    self.log_message.emit(f"GA4元素截图失败: {str(screenshot_error)}")
+            
+            # 如果上述所有方法都失败，截取整个页面
+            if not found_element:
+                self.log_message.emit("未找到特定GA4元素，截取整个页面...")
+                ga_full_path = os.path.join(screenshot_dir, f"ga-{page_name}-full.png")
+                page.screenshot(path=ga_full_path, full_page=True)
+                self.log_message.emit(f"GA4整页截图已保存为: {ga_full_path}")
+            return True
+        except Exception as ga_error:
+            self.log_message.emit(f"GA4截图过程中发生错误: {str(ga_error)}")
+            try:
+                # 截取当前页面作为错误记录
+                ga_error_path = os.path.join(screenshot_dir, f"ga-{page_name}-error.png")
+                page.screenshot(path=ga_error_path)
+                self.log_message.emit(f"错误状态截图已保存为: {ga_error_path}")
+            except:
+                self.log_message.emit("无法保存GA4错误截图")
+            return False
+                
+    def launch_incognito_browser(self, playwright):
+        """启动用于Google搜索的无痕浏览器（由浏览器池在批次内共享）"""
+        self.log_message.emit("以无痕模式启动浏览器进行Google搜索...")
+        
+        # 随机选择用户代理
+        user_agents = [
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36 Edg/121.0.0.0"
+        ]
+        user_agent = random.choice(user_agents)
+        
+        # 获取模式设置
+        headless = self.settings.value("headless_mode", "false") == "true"
+        invisible_browser = self.settings.value("invisible_browser", "true") == "true"
+        
+        # 增强无痕模式下的反检测浏览器参数
+        incognito_args = [
+            '--disable-blink-features=AutomationControlled',
+            '--no-sandbox',
+            '--disable-extensions',
+            '--disable-default-apps',
+            '--disable-popup-blocking',
+            '--start-maximized',
+            f'--user-agent={user_agent}',
+            # 增加以下参数提高匿名性和绕过检测
+            '--disable-web-security',
+            '--disable-features=IsolateOrigins,site-per-process',
+            '--disable-site-isolation-trials',
+            '--disable-blink-features',
+            '--disable-device-orientation',
+            '--disable-features=Translate',
+            '--disable-infobars',
+            '--ignore-certifcate-errors',
+            '--ignore-certifcate-errors-spki-list',
+            '--allow-running-insecure-content',
+            '--disable-gpu',
+            # 增强隐私保护
+            '--incognito',
+            '--disable-plugins-discovery',
+            '--disable-notifications',
+            '--disable-permissions-api'
+        ]
+        
+        # 设置隐形浏览器的特定参数
+        if invisible_browser:
+            incognito_args += [
+                '--window-size=1920,1080'
+                # 移除 '--window-position=-32000,-32000' 参数
+            ]
+        
+        # 根据设置选择启动模式
+        if self.display is not None:
+            # 虚拟显示器模式
+            self.log_message.emit(f"在虚拟显示器 {self.display} 上以有头模式进行搜索")
+            browser = playwright.chromium.launch(
+                headless=False,
+                args=incognito_args + ['--window-size=1920,1080'],
+                env=self.browser_env()
+            )
+        elif headless:
+            # 完全无头模式
+            self.log_message.emit("以完全无头模式进行搜索 (可能被检测)")
+            browser = playwright.chromium.launch(
+                headless=True,
+                args=incognito_args
+            )
+        elif invisible_browser:
+            # 隐形浏览器模式 - 兼容性方法
+            self.log_message.emit("以隐形浏览器模式进行搜索 (降低被检测风险)")
+            try:
+                # 尝试使用带is_visible参数的方法（较新版本Playwright）
+                browser = playwright.chromium.launch(
+                    headless=False,
+                    is_visible=False,
+                    args=incognito_args
+                )
+            except TypeError:
+                # 如果is_visible参数不被支持，使用标准方法
+                self.log_message.emit("当前Playwright版本不支持is_visible参数，使用备选方法")
+                browser = playwright.chromium.launch(
+                    headless=False,
+                    args=incognito_args
+                )
+        else:
+            # 标准有头模式
+            self.log_message.emit("以有头模式进行搜索")
+            browser = playwright.chromium.launch(
+                headless=False,
+                args=incognito_args
+            )
+        
+        # 同时返回启动时使用的用户代理，浏览器池创建上下文时保持一致
+        return browser, user_agent
+    
+    def process_google_search_incognito(self, search_query, page_name, screenshot_dir):
+        """在无痕模式下处理Google搜索下拉框、PAA和相关搜索，返回搜索结果页是否处理成功"""
+        # 检查中止标志
+        if self.abort_flag:
+            self.log_message.emit("任务已被中止")
+            return
+            
+        # 虚拟显示器上的窗口本来就不可见，无需移到屏幕外
+        invisible_browser = self.settings.value("invisible_browser", "true") == "true" and self.display is None
+        
+        context = None
+        try:
+            # 从浏览器池的共享无痕浏览器中创建一个新的上下文（相当于一个新的无痕窗口）
+            context = self.browser_pool.new_incognito_context(
+                "SERP",
+                viewport={'width': 1920, 'height': 1080},
+                java_script_enabled=True,
+                ignore_https_errors=True,
+                # 设置地理位置模拟中国
+                geolocation={"latitude": 39.9042, "longitude": 116.4074},
+                locale=SERP_LOCALE,
+                timezone_id='Asia/Shanghai',
+                reduced_motion='reduce',  # 减少动画，可能降低CPU使用率
+                init_script=SERP_STEALTH_JS
+            )
+            
+            # 创建新页面
+            page = context.new_page()
+            
+            # 如果使用隐形模式，确保窗口在屏幕外
+            if invisible_browser:
+                try:
+                    # 直接在页面上执行移动窗口的脚本，使用改进的方法
+                    page.evaluate("""
+                        try {
+                            // 尝试将窗口移到屏幕外，但使用更可靠的值
+                            window.moveTo(-10000, -10000);
+                            // 如果不成功，尝试另一种方法
+                            if (window.screenX > -5000) {
+                                window.moveTo(-2000, -2000);
+                            }
+                            window.resizeTo(1920, 1080);
+                        } catch (e) {
+                            console.error("无法移动窗口", e);
+                        }
+                    """)
+                except Exception as e:
+                    self.log_message.emit(f"设置隐形窗口时出错: {str(e)}")
+            
+            try:
+                if self.settings.value("serp_direct_url", "false") == "true":
+                    # 直接打开搜索结果页，每个关键词只加载一次页面；下拉框建议直接请求建议接口
+                    search_url = self.build_search_url(search_query)
+                    # 建议请求同样发往Google，必须在获取令牌、等待封锁冷却结束之后发出
+                    self.throttle(search_url)
+                    dropdown_suggestions = self.fetch_suggestions_http(search_query)
+                    self.log_message.emit(f"以无痕模式直接打开搜索结果页: {search_url}")
+                    self.cancel_token.goto(page, search_url, wait_until="domcontentloaded", timeout=30000)
+                    self.handle_consent_page(page)
+                else:
+                    # 导航到Google搜索
+                    self.log_message.emit(f"以无痕模式导航到Google搜索页面...")
+                    self.throttle("https://www.google.com/")
+                    self.cancel_token.goto(page, "https://www.google.com/", timeout=30000)
+                    # 被封锁时直接进入 /sorry/ 页，不必等待搜索框超时
+                    self.check_google_block(page)
+                    
+                    # 检查并处理同意条款页面
+                    self.handle_consent_page(page)
+                    
+                    # 等待搜索框加载
+                    search_selector = "textarea[name='q']"
+                    self.log_message.emit("等待搜索框加载...")
+                    self.cancel_token.wait(page.wait_for_selector, search_selector, state="visible", timeout=30000)
+                    
+                    # 检查中止标志
+                    if self.abort_flag:
+                        self.log_message.emit("任务已被中止")
+                        return
+                        
+                    # 输入搜索词并获取搜索下拉框内容
+                    self.log_message.emit(f"输入搜索词: {search_query}")
+                    dropdown_suggestions = self.fetch_dropdown_suggestions(page, search_selector, search_query)
+                    
+                    # 检查中止标志
+                    if self.abort_flag:
+                        self.log_message.emit("任务已被中止")
+                        return
+                        
+                    # 提交搜索
+                    self.log_message.emit("提交搜索...")
+                    page.press(search_selector, "Enter")
+                    self.cancel_token.wait(page.wait_for_load_state, "networkidle", timeout=30000)
+                
+                self.check_google_block(page)
+                self.record_serp_result(False)
+                self.block_guard.record_success()
+                self.log_message.emit("搜索结果页面已加载")
+                
+                if dropdown_suggestions:
+                    self.log_message.emit(f"提取到 {len(dropdown_suggestions)} 个搜索下拉框建议")
+                    for i, suggestion in enumerate(dropdown_suggestions):
+                        self.log_message.emit(f"建议 {i+1}: {suggestion}")
+                    self.update_markdown_file(page_name, dropdown_suggestions, "Google 搜索下拉框")
+                else:
+                    self.log_message.emit("未能提取到搜索下拉框建议")
+                
+                # 检查中止标志
+                if self.abort_flag:
+                    self.log_message.emit("任务已被中止")
+                    return
+                    
+                # 一次性提取PAA、相关搜索和自然排名
+                self.log_message.emit("开始提取SERP数据...")
+                serp = self.extract_serp_page(page)
+                if self.abort_flag:
+                    self.log_message.emit("任务已被中止")
+                    return
+                
+                paa_questions = serp["paa"]
+                if paa_questions:
+                    self.log_message.emit(f"提取到 {len(paa_questions)} 个PAA问题")
+                    for i, question in enumerate(paa_questions):
+                        self.log_message.emit(f"问题 {i+1}: {question}")
+                    self.update_markdown_file(page_name, paa_questions, "相关问题")
+                else:
+                    self.log_message.emit("未能提取到PAA问题")
+                
+                related_searches = serp["related"]
+                if related_searches:
+                    self.log_message.emit(f"提取到 {len(related_searches)} 个相关搜索")
+                    for i, search in enumerate(related_searches):
+                        self.log_message.emit(f"相关搜索 {i+1}: {search}")
+                    self.update_markdown_file(page_name, related_searches, "相关搜索")
+                else:
+                    self.log_message.emit("未能提取到相关搜索")
+                
+                organic = serp["organic"]
+                if organic:
+                    self.log_message.emit(f"提取到 {len(organic)} 个自然排名结果")
+                    rows = [[str(i + 1), result["title"], result["url"]] for i, result in enumerate(organic)]
+                    self.update_markdown_file(page_name, rows, "Google 自然排名前10", ["排名", "标题", "URL"])
+                else:
+                    self.log_message.emit("未能提取到自然排名结果")
+                return True
+            
+            except GoogleBlockedError:
+                raise
+            except Exception as google_error:
+                self.log_message.emit(f"无痕模式Google搜索过程中发生错误: {str(google_error)}")
+                self.log_message.emit(f"错误详情: {google_error}")
+                return False
+            
+            finally:
+                try:
+                    # 关闭页面和上下文，浏览器保留给后续关键词复用
+                    if 'page' in locals() and page:
+                        page.close()
+                    if context:
+                        context.close()
+                except Exception as e:
+                    self.log_message.emit(f"关闭页面时出错: {str(e)}")
+        
+        except GoogleBlockedError:
+            raise
+        except Exception as context_error:
+            self.log_message.emit(f"创建无痕上下文时出错: {str(context_error)}")
+            if context:
+                try:
+                    context.close()
+                except Exception:
+                    pass
+            raise
+            
+    def build_search_url(self, search_query):
+        """构造直接打开的搜索结果页URL，界面语言和地区与SERP缓存键一致"""
+        params = {"q": search_query, "hl": SERP_LOCALE,
+                  "gl": self.settings.value("serp_country", SERP_COUNTRY)}
+        return f"https://www.google.com/search?{urllib.parse.urlencode(params)}"
+    
+    def fetch_suggestions_http(self, search_query):
+        """直接请求建议接口获取下拉框建议，不经过页面（调用前需已通过throttle获取Google令牌）"""
+        start = time.time()
+        try:
+            suggestions = self.suggest_client.fetch(search_query)
+            self.log_message.emit(f"从建议接口获取到 {len(suggestions)} 个建议，耗时 {time.time() - start:.2f} 秒")
+            return suggestions
+        except Exception as suggest_error:
+            self.log_message.emit(f"请求建议接口失败: {str(suggest_error)}")
+            return []
+    
+    def fetch_dropdown_suggestions(self, page, search_selector, search_query):
+        """输入搜索词并获取下拉建议
+
+        优先读取建议接口的JSON响应（页面内拦截或直接请求接口），响应到达即返回；
+        都失败时才回退到从下拉框DOM中提取。
+        """
+        source = self.settings.value("suggest_source", "page")
+        start = time.time()
+        try:
+            if source == "http":
+                page.fill(search_selector, search_query)
+                suggestions = self.suggest_client.fetch(search_query)
+            else:
+                suggestions = fill_and_capture_suggestions(page, search_selector, search_query)
+            self.log_message.emit(f"从建议接口获取到 {len(suggestions)} 个建议，耗时 {time.time() - start:.2f} 秒")
+            if suggestions:
+                return suggestions
+        except Exception as suggest_error:
+            self.log_message.emit(f"读取建议接口响应失败: {str(suggest_error)}")
+        
+        # 确保搜索框中已填入搜索词，后续提交搜索依赖它
+        try:
+            if page.input_value(search_selector) != search_query:
+                page.fill(search_selector, search_query)
+        except Exception as fill_error:
+            self.log_message.emit(f"填写搜索框时出错: {str(fill_error)}")
+        
+        self.log_message.emit("改用从下拉框页面元素提取建议...")
+        return self.extract_dropdown_suggestions(page)
+    
+    def extract_dropdown_suggestions(self, page):
+        """提取Google搜索下拉框建议"""
+        # 检查中止标志
+        if self.abort_flag:
+            self.log_message.emit("任务已被中止")
+            return []
+            
+        try:
+            # 等待下拉框出现 - 使用一个通用的选择器确保下拉框已加载
+            dropdown_container_selector = "div[jsname='aajZCb']"
+            self.cancel_token.wait(page.wait_for_selector, dropdown_container_selector, state="visible", timeout=5000)
+            
+            # 使用更直接的方法提取搜索建议
+            suggestions = page.evaluate("""
+                () => {
+                    // 尝试确定当前Google界面下的下拉框结构
+                    function getAllSuggestions() {
+                        // 不同的可能选择器组合
+                        const possibleSelectors = [
+                            // 针对当前截图所示结构
+                            ".wM6W7d",
+                            ".OBMEnb .wM6W7d",
+                            "ul[role='listbox'] li",
+                            "div[jsname='aajZCb'] .wM6W7d",
+                            // 针对老结构
+                            ".sbct",
+                            ".sbsb_a li",
+                            ".sbpqs_a li",
+                            ".G43f7e li"
+                        ];
+                        
+                        let elements = [];
+                        // 尝试所有可能的选择器
+                        for (const selector of possibleSelectors) {
+                            const found = document.querySelectorAll(selector);
+                            if (found && found.length > 0) {
+                                elements = Array.from(found);
+                                console.log(`找到选择器 ${selector} 匹配的元素: ${found.length} 个`);
+                                break;
+                            }
+                        }
+                        
+                        // 如果没有找到任何元素，返回空数组
+                        if (elements.length === 0) {
+                            console.log("未找到任何匹配的下拉框元素");
+                            return [];
+                        }
+                        
+                        // 处理找到的元素，提取文本
+                        return elements.map(el => {
+                            // 获取纯文本内容
+                            return el.textContent.trim();
+                        }).filter(text => text.length > 0); // 过滤掉空文本
+                    }
+                    
+                    // 调用方法获取所有建议
+                    const results = getAllSuggestions();
+                    console.log(`找到 ${results.length} 个下拉框建议`);
+                    console.log("建议内容:", results);
+                    
+                    return results;
+                }
+            """)
+            
+            self.log_message.emit(f"找到 {len(suggestions)} 个搜索下拉框建议")
+            
+            if len(suggestions) == 0:
+                # 如果无法提取到建议，尝试使用最后的备选方法
+                self.log_message.emit("尝试使用备选方法从页面源码提取下拉建议...")
+                
+                # 将页面源码保存到文件以便分析
+                page_content = page.content()
+                debug_dir = os.path.join(self.settings.value("screenshot_dir", "screenshots"), "debug")
+                if not os.path.exists(debug_dir):
+                    os.makedirs(debug_dir)
+                with open(os.path.join(debug_dir, "page_source.html"), "w", encoding="utf-8") as f:
+                    f.write(page_content)
+                
+                # 使用正则表达式从页面源码中提取可能的搜索建议
+                import re
+                search_query = page.input_value("textarea[name='q']")
+                self.log_message.emit(f"当前搜索词: {search_query}")
+                
+                # 尝试匹配基于当前搜索词的建议
+                pattern = re.compile(f'({re.escape(search_query)}[^<>"]*)', re.IGNORECASE)
+                matches = pattern.findall(page_content)
+                
+                if matches:
+                    # 仅选择有意义的匹配项（长度合适且不包含HTML标签）
+                    valid_matches = [m for m in matches if 
+                                    len(m) > len(search_query) and 
+                                    len(m) < 100 and 
+                                    '<' not in m and 
+                                    '>' not in m]
+                    
+                    # 去重
+                    unique_matches = list(set(valid_matches))
+                    
+                    self.log_message.emit(f"通过页面源码找到 {len(unique_matches)} 个可能的搜索建议")
+                    return unique_matches
+            
+            return suggestions
+            
+        except Exception as dropdown_error:
+            self.log_message.emit(f"提取搜索下拉框建议时出错: {str(dropdown_error)}")
+            # 记录更多调试信息
+            self.log_message.emit(f"错误详情: {dropdown_error}")
+            return []
+    
+    def extract_serp_page(self, page):
+        """等待结果容器、滚动一次，然后一次page.evaluate提取PAA、相关搜索和自然排名前10
+
+        Returns:
+            dict: {"paa": [...], "related": [...], "organic": [{"title", "url"}], "timings": {字段: 毫秒}}
+        """
+        empty = {"paa": [], "related": [], "organic": [], "timings": {}}
+        if self.abort_flag:
+            self.log_message.emit("任务已被中止")
+            return empty
+        
+        start_time = time.time()
+        try:
+            self.cancel_token.wait(page.wait_for_selector, "#search, #rso", state="attached", timeout=10000)
+        except Exception:
+            self.log_message.emit("未找到搜索结果容器，继续尝试提取")
+        wait_ms = (time.time() - start_time) * 1000
+        
+        # 相关搜索位于页面底部，滚动一次后等待其出现，而不是固定等待
+        scroll_start = time.time()
+        try:
+            page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            self.cancel_token.wait(page.wait_for_function, SERP_BOTTOM_READY_JS, timeout=3000)
+        except Exception:
+            pass
+        scroll_ms = (time.time() - scroll_start) * 1000
+        
+        try:
+            eval_start = time.time()
+            data = page.evaluate(SERP_EXTRACT_JS)
+            eval_ms = (time.time() - eval_start) * 1000
+        except Exception as e:
+            self.log_message.emit(f"一次性提取SERP数据时出错: {str(e)}")
+            return empty
+        
+        # 排除Google导航分类
+        excluded_terms = ["全部", "视频", "短视频", "图片", "购物", "新闻", "网页", "图书", "地图", "航班"]
+        data["related"] = [s for s in data.get("related") or [] if s not in excluded_terms]
+        timings = data.get("timings") or {}
+        self.log_message.emit(
+            f"SERP数据一次性提取完成: 等待结果 {wait_ms:.0f}ms，滚动加载 {scroll_ms:.0f}ms，"
+            f"提取 {eval_ms:.0f}ms（PAA {timings.get('paa', 0)}ms，相关搜索 {timings.get('related', 0)}ms，"
+            f"自然排名 {timings.get('organic', 0)}ms）"
+        )
+        return data
+    
+    def handle_consent_page(self, page):
+        """处理Google同意条款页面"""
+        try:
+            # 检查是否在同意条款页面
+            if "consent.google.com" in page.url:
+                self.log_message.emit("检测到Google同意条款页面，尝试点击同意按钮...")
+                
+                # 尝试点击"我同意"按钮（不同地区可能有不同ID）
+                consent_buttons = [
+                    "button#L2AGLb",  # 常见的"我同意"按钮ID
+                    "button[aria-label='同意使用 Cookie']",
+                    "button[jsname='higCR']",  # 另一种可能的ID
+                    "form:nth-child(2) button"  # 基于位置的选择器
+                ]
+                
+                for button_selector in consent_buttons:
+                    try:
+                        if page.query_selector(button_selector):
+                            page.click(button_selector)
+                            self.log_message.emit(f"已点击同意按钮: {button_selector}")
+                            # 等待页面导航完成
+                            page.wait_for_navigation(timeout=10000)
+                            break
+                    except Exception as click_error:
+                        self.log_message.emit(f"点击按钮 {button_selector} 时出错: {str(click_error)}")
+                
+                # 确认是否已离开同意页面
+                if "consent.google.com" not in page.url:
+                    self.log_message.emit("已成功处理同意条款页面")
+                else:
+                    self.log_message.emit("未能自动处理同意条款页面，请在浏览器中手动操作...")
+                    # 等待用户手动操作
+                    self.cancel_token.wait(page.wait_for_url, lambda url: "consent.google.com" not in url, timeout=60000)
+                    self.log_message.emit("检测到已离开同意条款页面")
+        except Exception as consent_error:
+            self.log_message.emit(f"处理同意条款页面时出错: {str(consent_error)}")
+
+    def handle_google_login(self, page, username, password):
+        """处理Google账号登录流程"""
+        try:
+            self.log_message.emit("开始处理Google登录...")
+            
+            # 第一步：输入邮箱
+            self.log_message.emit("查找并填写邮箱输入框...")
+            # 等待邮箱输入框出现
+            email_selector = "input[type='email']"
+            self.cancel_token.wait(page.wait_for_selector, email_selector, state="visible", timeout=30000)
+            
+            # 随机延迟模拟人工输入
+            self.cancel_token.sleep(random.uniform(0.5, 1.5))
+            
+            # 填写邮箱
+            page.fill(email_selector, username)
+            self.log_message.emit("邮箱已输入")
+            
+            # 点击"下一步"按钮
+            next_button_selector = "button:has-text('下一步'), button:has-text('Next')"
+            self.log_message.emit("点击下一步按钮...")
+            page.click(next_button_selector)
+            
+            # 第二步：输入密码
+            self.log_message.emit("等待密码输入框出现...")
+            password_selector = "input[type='password']"
+            self.cancel_token.wait(page.wait_for_selector, password_selector, state="visible", timeout=30000)
+            
+            # 随机延迟
+            self.cancel_token.sleep(random.uniform(1.0, 2.0))
+            
+            # 填写密码
+            page.fill(password_selector, password)
+            self.log_message.emit("密码已输入")
+            
+            # 点击"下一步"按钮登录
+            self.log_message.emit("点击登录按钮...")
+            page.click(next_button_selector)
+            
+            # 等待登录完成，页面跳转
+            self.log_message.emit("等待登录完成并跳转...")
+            self.cancel_token.wait(page.wait_for_url, lambda url: "search-console" in url or "search.google.com" in url, timeout=60000)
+            
+            # 额外检查是否存在二次验证或其他安全检查
+            if "accounts.google.com" in page.url or "signin" in page.url:
+                self.log_message.emit("检测到需要额外验证，可能需要手动操作...")
+                self.cancel_token.wait(page.wait_for_url, lambda url: "search-console" in url or "search.google.com" in url,
+                                       timeout=120000)
+                
+            self.log_message.emit("登录成功完成")
+            return True
+            
+        except Exception as e:
+            self.log_message.emit(f"自动登录过程中出错: {str(e)}")
+            self.log_message.emit("尝试等待手动登录...")
+            # 仍然等待用户可能的手动登录
+            self.cancel_token.wait(page.wait_for_url, lambda url: "search-console" in url or "search.google.com" in url,
+                                   timeout=120000)
+            return False
@@ -1,8 +1,114 @@
 import time
 import os
 import re
+import csv
+import json
+import threading
 
-def process_semrush(log_message_callback, page, page_name, screenshot_dir):
+SEMRUSH_LOGIN_URL = "https://tool.seotools8.com/#/login"
+SEMRUSH_STATE_PATH = "semrush_state.json"
+# Keyword Magic Tool使用的数据库（地区）
+SEMRUSH_DB = "us"
+
+
+def throttled_goto(page, url, rate_limiter=None, cancel_token=None, **kwargs):
+    """导航前先从限速器获取该来源的请求令牌；提供cancel_token时导航可被中止"""
+    if cancel_token is None:
+        if rate_limiter is not None:
+            rate_limiter.acquire(url)
+        return page.goto(url, **kwargs)
+    if rate_limiter is not None:
+        rate_limiter.acquire(url, lambda: cancel_token.cancelled)
+    return cancel_token.goto(page, url, **kwargs)
+
+
+def _sleep(cancel_token, seconds):
+    if cancel_token is not None:
+        cancel_token.sleep(seconds)
+    else:
+        time.sleep(seconds)
+
+
+class SemrushSession:
+    """SEMrush登录会话状态（Playwright storage state）
+
+    首次登录后把cookies和localStorage保存到文件，之后的URL和重试直接用它创建上下文，
+    只有在检测到会话失效（login_expired / redirected_to_login）时才重新登录。
+    多个线程共享同一个实例，重新登录由锁串行化。
+    """
+
+    def __init__(self, state_path=SEMRUSH_STATE_PATH):
+        self.state_path = state_path
+        self.lock = threading.Lock()
+        # 每次重新登录后递增，用于判断其他线程是否已经刷新了会话
+        self.version = 0
+        self.state = None
+        if state_path and os.path.exists(state_path):
+            try:
+                with open(state_path, 'r', encoding='utf-8') as f:
+                    self.state = json.load(f)
+            except (OSError, ValueError):
+                self.state = None
+
+    @property
+    def valid(self):
+        return self.state is not None
+
+    def context_options(self):
+        """创建浏览器上下文时使用的参数，已有会话状态时直接带上"""
+        with self.lock:
+            if self.state is None:
+                return {}
+            return {"storage_state": self.state}
+
+    def apply_state(self, context):
+        """把最新的会话状态加载到已创建的上下文中"""
+        state = self.state or {}
+        if state.get("cookies"):
+            context.add_cookies(state["cookies"])
+        origins = {}
+        for origin in state.get("origins", []):
+            origins[origin.get("origin")] = {item["name"]: item["value"] for item in origin.get("localStorage", [])}
+        if origins:
+            context.add_init_script(
+                "(function(o){var s=o[location.origin];if(s){for(var k in s){try{localStorage.setItem(k,s[k]);}catch(e){}}}})("
+                + json.dumps(origins) + ")"
+            )
+
+    def save(self, context):
+        self.state = context.storage_state()
+        self.version += 1
+        if self.state_path:
+            tmp_path = self.state_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f)
+            os.replace(tmp_path, self.state_path)
+
+    def login(self, log_message_callback, page, seen_version, rate_limiter=None, cancel_token=None):
+        """登录并保存会话状态
+
+        如果在等待锁期间其他线程已经重新登录，直接加载其保存的状态而不再重复登录。
+
+        Returns:
+            int: 当前页面所使用的会话版本
+        """
+        with self.lock:
+            if self.valid and self.version != seen_version:
+                log_message_callback("其他线程已重新登录SEMrush，加载最新的会话状态")
+                self.apply_state(page.context)
+                return self.version
+
+            log_message_callback("导航到SEMrush登录页面...")
+            throttled_goto(page, SEMRUSH_LOGIN_URL, rate_limiter, cancel_token, timeout=30000)
+            if login_semrush(log_message_callback, page, rate_limiter, cancel_token):
+                self.save(page.context)
+                log_message_callback(f"已保存SEMrush会话状态: {self.state_path}")
+            return self.version
+
+
+def process_semrush(log_message_callback, page, page_name, screenshot_dir, session=None,
+                    deep_export=False, export_format="csv", export_max_pages=50, store=None,
+                    rate_limiter=None, cancel_token=None):
     """处理SEMrush关键词数据提取
     
     Args:
@@ -10,32 +116,49 @@ def process_semrush(log_message_callback, page, page_name, screenshot_dir):
         page: Playwright页面对象
         page_name: 页面名称
         screenshot_dir: 截图保存目录
+        session: SemrushSession实例，提供时复用已保存的登录状态，仅在会话失效时重新登录
+        deep_export: 是否翻页导出全部关键词到文件（Markdown中仍只保留前20条摘要）
+        export_format: 深度导出格式，csv或parquet
+        export_max_pages: 深度导出最多翻阅的页数
+        store: ResultStore实例，提供时结果只写入结果存储，由调用方渲染MD文件
+        rate_limiter: RateLimiter实例，提供时每次导航前按来源获取请求令牌；semrush来源每个请求都被令牌间隔开时，代替固定的重试等待
+        cancel_token: CancelToken实例，提供时导航、等待和重试间隔都可被中止
     """
     max_retries = 3
     retry_count = 0
+    # 创建上下文时已带上保存的会话状态则无需登录，直接访问工具页面即可验证会话
+    need_login = session is None or not session.valid
+    seen_version = session.version if session is not None else 0
     
     while retry_count < max_retries:
         try:
-            # 每次重试都重新导航到登录页面
-            log_message_callback(f"导航到SEMrush登录页面...(尝试 {retry_count + 1}/{max_retries})")
-            login_url = "https://tool.seotools8.com/#/login"
-            page.goto(login_url, timeout=30000)
-            
-            # 进行登录
-            login_semrush(log_message_callback, page)
+            if session is None:
+                # 每次重试都重新导航到登录页面
+                log_message_callback(f"导航到SEMrush登录页面...(尝试 {retry_count + 1}/{max_retries})")
+                throttled_goto(page, SEMRUSH_LOGIN_URL, rate_limiter, cancel_token, timeout=30000)
+                
+                # 进行登录
+                login_semrush(log_message_callback, page, rate_limiter, cancel_token)
+            elif need_login:
+                log_message_callback(f"登录SEMrush...(尝试 {retry_count + 1}/{max_retries})")
+                seen_version = session.login(log_message_callback, page, seen_version, rate_limiter, cancel_token)
+                need_login = False
+            else:
+                log_message_callback(f"复用已保存的SEMrush会话状态...(尝试 {retry_count + 1}/{max_retries})")
             
             # 构建Keywords Magic Tool URL
             search_keyword = page_name.replace("-", "+")
-            semrush_url = f"https://tool-sem.seotools8.com/analytics/keywordmagic/?q={search_keyword}&db=us&gsort=volume_desc"
+            semrush_url = f"https://tool-sem.seotools8.com/analytics/keywordmagic/?q={search_keyword}&db={SEMRUSH_DB}&gsort=volume_desc"
             
             log_message_callback(f"导航到SEMrush Keywords Magic Tool页面: {semrush_url}")
-            page.goto(semrush_url, timeout=60000)
+            throttled_goto(page, semrush_url, rate_limiter, cancel_token, timeout=60000)
             
             # 立即检查是否出现任何错误页面
             error_type = check_semrush_error_page(log_message_callback, page)
             if error_type:
                 if error_type == 'login_expired' or error_type == 'redirected_to_login':
                     log_message_callback(f"检测到SEMrush账号在其他地方登录或会话失效，立即重试...")
+                    need_login = True
                     # 截取400错误页面截图以便调试
                     error_screenshot_path = os.path.join(screenshot_dir, f"semrush-400error-{page_name}-{retry_count}.png")
                     try:
@@ -60,7 +183,7 @@ def process_semrush(log_message_callback, page, page_name, screenshot_dir):
                         'totalVolume': '0',
                         'averageKD': 'N/A',
                         'note': 'SEMrush报告没有此关键词的相关数据（数据不可用错误）'
-                    })
+                    }, store=store)
                     return True
                 elif error_type == 'no_data_found':
                     log_message_callback(f"检测到SEMrush无数据错误页面，无法找到相关关键词数据...")
@@ -80,21 +203,25 @@ def process_semrush(log_message_callback, page, page_name, screenshot_dir):
                         'totalVolume': '0',
                         'averageKD': 'N/A',
                         'note': 'SEMrush报告没有此关键词的相关数据'
-                    })
+                    }, store=store)
                     return True
                 
                 # 只有非特殊错误类型才立即重试
                 if error_type and error_type != 'data_unavailable' and error_type != 'no_data_found':
                     retry_count += 1
-                    # 延迟短暂时间后重试
-                    time.sleep(2)
+                    # 限速器不能保证请求间隔时延迟短暂时间后重试，否则由下一次导航前的令牌控制间隔
+                    if rate_limiter is None or not rate_limiter.paces("semrush"):
+                        _sleep(cancel_token, 2)
                     continue
             else:
                 log_message_callback("等待关键词元素出现...")
                 try:
                     # 尝试等待关键词表格行或关键词组元素出现
-                    page.wait_for_selector(".sm-table-layout__row, [role='row'], tr, .sm-group-content", 
-                                         state="visible", timeout=60000)
+                    selector = ".sm-table-layout__row, [role='row'], tr, .sm-group-content"
+                    if cancel_token is not None:
+                        cancel_token.wait(page.wait_for_selector, selector, state="visible", timeout=60000)
+                    else:
+                        page.wait_for_selector(selector, state="visible", timeout=60000)
                     log_message_callback("SEMrush关键词元素已出现，继续处理...")
                 except Exception as wait_error:
                     log_message_callback(f"等待元素超时，将检查页面状态: {str(wait_error)}")
@@ -104,6 +231,7 @@ def process_semrush(log_message_callback, page, page_name, screenshot_dir):
                     if error_type:
                         if error_type == 'login_expired' or error_type == 'redirected_to_login':
                             log_message_callback(f"在等待元素超时后检测到SEMrush账号在其他地方登录或会话失效，立即重试...")
+                            need_login = True
                             # 截取400错误页面截图以便调试
                             error_screenshot_path = os.path.join(screenshot_dir, f"semrush-400error-timeout-{page_name}-{retry_count}.png")
                             try:
@@ -127,7 +255,7 @@ def process_semrush(log_message_callback, page, page_name, screenshot_dir):
                                 'totalVolume': '0',
                                 'averageKD': 'N/A',
                                 'note': 'SEMrush报告没有此关键词的相关数据（数据不可用错误）'
-                            })
+                            }, store=store)
                             return True
                         elif error_type == 'no_data_found':
                             log_message_callback(f"在等待元素超时后检测到SEMrush无数据错误页面，无法找到相关关键词数据...")
@@ -147,7 +275,7 @@ def process_semrush(log_message_callback, page, page_name, screenshot_dir):
                                 'totalVolume': '0',
                                 'averageKD': 'N/A',
                                 'note': 'SEMrush报告没有此关键词的相关数据'
-                            })
+                            }, store=store)
                             return True
                         else:
                             log_message_callback(f"在等待元素超时后检测到SEMrush错误: {error_type}，将进行重试...")
@@ -162,27 +290,28 @@ def process_semrush(log_message_callback, page, page_name, screenshot_dir):
                         # 只有非特殊错误类型才进行重试
                         if not error_type or (error_type != 'data_unavailable' and error_type != 'no_data_found'):
                             retry_count += 1
-                            # 延迟短暂时间后重试
-                            time.sleep(3)  # 超时后多等待一秒
+                            # 限速器不能保证请求间隔时延迟短暂时间后重试（超时后多等待一秒）
+                            if rate_limiter is None or not rate_limiter.paces("semrush"):
+                                _sleep(cancel_token, 3)
                             continue
             
-            # 提取统计信息
-            log_message_callback("提取SEMrush页面统计信息...")
-            stats_data = extract_semrush_stats(log_message_callback, page)
-            
-            # 提取边栏数据
-            log_message_callback("提取SEMrush边栏数据(最多20条)...")
-            sidebar_data = extract_semrush_sidebar_data(log_message_callback, page)
-            
-            # 提取主要关键词数据
-            log_message_callback("提取SEMrush主要关键词数据(最多20条)...")
-            keyword_data = extract_semrush_keyword_data(log_message_callback, page)
+            # 一次性提取统计信息、边栏数据和主要关键词数据(各最多20条)
+            log_message_callback("提取SEMrush页面统计信息、边栏数据和关键词数据...")
+            stats_data, sidebar_data, keyword_data = extract_semrush_page(log_message_callback, page)
             
             # 检验提取的数据
             if (keyword_data and len(keyword_data) > 0) or (sidebar_data and len(sidebar_data) > 0) or stats_data:
+                if deep_export:
+                    export_result = export_semrush_keywords(log_message_callback, page, page_name,
+                                                            export_format, export_max_pages, cancel_token)
+                    if export_result:
+                        stats_data = dict(stats_data or {})
+                        stats_data['exportFile'] = export_result['path']
+                        stats_data['exportRows'] = export_result['rows']
+                
                 # 整合数据并更新markdown文件
                 log_message_callback("整合SEMrush数据并更新markdown文件...")
-                update_semrush_markdown(log_message_callback, page_name, sidebar_data, keyword_data, stats_data)
+                update_semrush_markdown(log_message_callback, page_name, sidebar_data, keyword_data, stats_data, store=store)
                 return True
             else:
                 log_message_callback("未找到有效的SEMrush关键词数据，将尝试重试...")
@@ -209,24 +338,31 @@ def process_semrush(log_message_callback, page, page_name, screenshot_dir):
     # 所有重试都失败
     log_message_callback(f"在 {max_retries} 次尝试后仍未能成功获取SEMrush数据")
     # 创建空数据以避免完全失败
-    update_semrush_markdown(log_message_callback, page_name, [], [], {})
+    update_semrush_markdown(log_message_callback, page_name, [], [], {}, store=store)
     return False
 
-def login_semrush(log_message_callback, page):
+def _wait_for_load_state(page, state, cancel_token=None, timeout=30000):
+    if cancel_token is not None:
+        cancel_token.wait(page.wait_for_load_state, state, timeout=timeout)
+    else:
+        page.wait_for_load_state(state, timeout=timeout)
+
+
+def login_semrush(log_message_callback, page, rate_limiter=None, cancel_token=None):
     """登录SEMrush账号"""
     # 检查是否已经登录
     if "login" not in page.url and "#/login" not in page.url:
         log_message_callback("似乎已经登录SEMrush，检查会话状态...")
         # 尝试访问一个需要登录的页面来验证会话
         try:
-            page.goto("https://tool.seotools8.com/#/dashboard", timeout=30000)
-            page.wait_for_load_state("networkidle", timeout=30000)
+            throttled_goto(page, "https://tool.seotools8.com/#/dashboard", rate_limiter, cancel_token, timeout=30000)
+            _wait_for_load_state(page, "networkidle", cancel_token)
             
             # 如果没有重定向到登录页面，说明已经登录
             if "login" not in page.url and "#/login" not in page.url:
                 log_message_callback("SEMrush会话有效，无需重新登录")
                 return True
-        except:
+        except Exception:
             log_message_callback("会话检查失败，将尝试重新登录")
     
     log_message_callback("需要登录SEMrush...")
@@ -234,8 +370,8 @@ def login_semrush(log_message_callback, page):
     # 确保在登录页面
     if "login" not in page.url and "#/login" not in page.url:
         log_message_callback("重定向到登录页面...")
-        page.goto("https://tool.seotools8.com/#/login", timeout=30000)
-        page.wait_for_load_state("networkidle", timeout=30000)
+        throttled_goto(page, "https://tool.seotools8.com/#/login", rate_limiter, cancel_token, timeout=30000)
+        _wait_for_load_state(page, "networkidle", cancel_token)
     
     # 输入用户名和密码
     username_selector = "input[type='text']"
@@ -251,13 +387,13 @@ def login_semrush(log_message_callback, page):
     page.click(login_button_selector)
     
     # 等待登录完成
-    page.wait_for_load_state("networkidle", timeout=30000)
+    _wait_for_load_state(page, "networkidle", cancel_token)
     
     # 点击选择账号登录按钮 - 如果需要
     if page.query_selector("button.q-btn:has-text('登录')"):
         log_message_callback("点击选择账号登录按钮...")
         page.click("button.q-btn:has-text('登录')")
-        page.wait_for_load_state("networkidle", timeout=30000)
+        _wait_for_load_state(page, "networkidle", cancel_token)
     
     # 验证登录状态
     if "login" in page.url or "#/login" in page.url:
@@ -267,844 +403,892 @@ def login_semrush(log_message_callback, page):
     log_message_callback("SEMrush登录成功")
     return True
 
+# 页面内错误分类脚本：按原有检测顺序依次检查选择器和页面文本，一次往返返回错误类型和匹配依据
+SEMRUSH_ERROR_CLASSIFIER_JS = """
+() => {
+    const textOf = (el) => {
+        try {
+            return el.innerText || '';
+        } catch (e) {
+            return '';
+        }
+    };
+    const result = (type, source, text) => ({type: type, source: source, evidence: (text || '').slice(0, 50)});
+
+    // 指定的400错误页面元素
+    const errorElement = document.querySelector('body > div.main > div > div:nth-child(1)');
+    if (errorElement) {
+        const text = textOf(errorElement);
+        if (text.includes('400')) {
+            return result('login_expired', 'body > div.main > div > div:nth-child(1)', text);
+        }
+    }
+
+    // 没有找到相关数据的错误
+    const noDataSection = document.querySelector("section.sm-global-na, [data-testid='nothing-found-card']");
+    if (noDataSection) {
+        const text = textOf(noDataSection);
+        if (text.includes("couldn't find any data") || text.toLowerCase().includes('no data')) {
+            return result('no_data_found', 'section.sm-global-na', text);
+        }
+    }
+    const titleElement = document.querySelector(".sm-global-na__title, [data-testid='nothing-found-title']");
+    if (titleElement) {
+        const text = textOf(titleElement);
+        if (text.includes("couldn't find any data") || text.toLowerCase().includes('no data')) {
+            return result('no_data_found', '.sm-global-na__title', text);
+        }
+    }
+
+    // 错误图片及其他错误容器
+    if (document.querySelector('img.kwo-global-na__img')) {
+        return result('data_unavailable', 'img.kwo-global-na__img', '');
+    }
+    const additionalSelectors = [
+        '.kwo-global-na',
+        '.kwo-global-na__title',
+        '.kwo-global-na__text',
+        '.sm-kw-error',
+        '.sm-error-container',
+        "[class*='error']",
+        "[class*='na__img']"
+    ];
+    for (const selector of additionalSelectors) {
+        const el = document.querySelector(selector);
+        if (el) {
+            return result('data_unavailable', selector, textOf(el) || '无文本内容');
+        }
+    }
+
+    // 备用选择器检测400错误
+    const backupSelectors = [
+        'div.error-container',
+        '.error-code',
+        '.error-message',
+        'div.main > div > div',
+        'h1.error-title'
+    ];
+    for (const selector of backupSelectors) {
+        const el = document.querySelector(selector);
+        if (el) {
+            const text = textOf(el);
+            if (text.includes('400') || text.includes('错误') || text.includes('Error') || text.includes('登录已失效')) {
+                return result('login_expired', selector, text);
+            }
+        }
+    }
+
+    // 页面URL
+    const href = window.location.href;
+    if (href.includes('error') || href.includes('400') || href.includes('401') || href.includes('403')) {
+        return result('error_in_url', 'url', href);
+    }
+
+    // 页面标题
+    if (document.title.includes('Error') || document.title.includes('错误') || document.title.includes('400')) {
+        return result('error_in_title', 'title', document.title);
+    }
+
+    // 整个页面文本
+    const fullText = document.body ? document.body.innerText : '';
+    if (fullText.includes('400') &&
+        (fullText.includes('登录已失效') ||
+         fullText.includes('失效') ||
+         fullText.includes('已在其他地方登录') ||
+         fullText.includes('请重新登录'))) {
+        return result('login_expired', 'body', fullText);
+    }
+    if (fullText.includes('Something went wrong') ||
+        fullText.includes('went wrong') ||
+        fullText.includes('出错了')) {
+        return result('something_went_wrong', 'body', fullText);
+    }
+    if (fullText.includes('401') ||
+        fullText.includes('403') ||
+        fullText.includes('Unauthorized') ||
+        fullText.includes('Forbidden') ||
+        fullText.includes('未授权')) {
+        return result('unauthorized', 'body', fullText);
+    }
+    if (fullText.includes('登录') &&
+        fullText.includes('密码') &&
+        (fullText.includes('Sign in') || fullText.includes('Log in'))) {
+        return result('redirected_to_login', 'body', fullText);
+    }
+    if (fullText.includes('error') ||
+        fullText.includes('Error') ||
+        fullText.includes('失败') ||
+        fullText.includes('错误')) {
+        return result('general_error', 'body', fullText);
+    }
+
+    // 可见的错误元素
+    const errorElements = document.querySelectorAll('.error, .error-message, .error-container, [class*=error]');
+    for (const el of errorElements) {
+        if (el.offsetWidth > 0 && el.offsetHeight > 0) {
+            return result('error_element_found', 'visible error element', textOf(el));
+        }
+    }
+
+    return null;
+}
+"""
+
+
+def classify_semrush_error(page):
+    """在页面内一次性完成全部错误检测
+
+    Returns:
+        dict: {'type': 错误类型, 'source': 命中的选择器或来源, 'evidence': 匹配到的文本片段}，无错误时为None
+    """
+    return page.evaluate(SEMRUSH_ERROR_CLASSIFIER_JS)
+
+
 def check_semrush_error_page(log_message_callback, page):
-    """检查是否是SEMrush错误页面，加强对400错误和其他错误页面的检测"""
+    """检查是否是SEMrush错误页面，加强对400错误和其他错误页面的检测
+
+    所有选择器和页面文本检查都在一次page.evaluate中完成，避免逐个元素往返。
+    """
     try:
-        # 首先尝试使用提供的选择器快速检测400错误页面
-        try:
-            # 检查是否存在指定的400错误页面元素
-            error_element = page.query_selector("body > div.main > div > div:nth-child(1)")
-            if error_element:
-                error_text = error_element.inner_text()
-                if '400' in error_text:
-                    log_message_callback(f"使用选择器检测到400错误页面: {error_text[:50]}...")
-                    return 'login_expired'  # 返回错误类型而不是布尔值，以提供更多信息
-            
-            # 新增: 检测第三种错误类型 - 没有找到相关数据的错误
-            no_data_found_section = page.query_selector("section.sm-global-na, [data-testid='nothing-found-card']")
-            if no_data_found_section:
-                try:
-                    error_text = no_data_found_section.inner_text()
-                    if "couldn't find any data" in error_text or "no data" in error_text.lower():
-                        log_message_callback(f"检测到SEMrush无数据错误页面: {error_text[:50]}...")
-                        return 'no_data_found'
-                except Exception as text_error:
-                    log_message_callback(f"获取无数据错误文本时出错: {str(text_error)}")
-            
-            # 备用检测第三种错误类型的方法
-            try:
-                title_element = page.query_selector(".sm-global-na__title, [data-testid='nothing-found-title']")
-                if title_element:
-                    title_text = title_element.inner_text()
-                    if "couldn't find any data" in title_text or "no data" in title_text.lower():
-                        log_message_callback(f"通过标题检测到SEMrush无数据错误: {title_text}")
-                        return 'no_data_found'
-            except Exception as title_error:
-                log_message_callback(f"获取错误标题时出错: {str(title_error)}")
-            
-            # 新增: 检测图片错误元素
-            error_img = page.query_selector("img.kwo-global-na__img")
-            if error_img:
-                log_message_callback("检测到SEMrush错误图片 (kwo-global-na__img)，可能是服务不可用或数据加载错误")
-                return 'data_unavailable'
-            
-            # 尝试检测其他可能的错误图片或容器
-            additional_error_selectors = [
-                ".kwo-global-na", # 图片的父容器
-                ".kwo-global-na__title", # 可能存在的错误标题
-                ".kwo-global-na__text", # 可能存在的错误文本
-                ".sm-kw-error", # 其他可能的错误类
-                ".sm-error-container",
-                "[class*='error']", # 任何包含error的类名
-                "[class*='na__img']" # 任何包含na__img的类名
-            ]
-            
-            for selector in additional_error_selectors:
-                error_el = page.query_selector(selector)
-                if error_el:
-                    try:
-                        error_text = error_el.inner_text() or "无文本内容"
-                    except:
-                        error_text = "无法获取文本"
-                    
-                    log_message_callback(f"检测到SEMrush错误元素 ({selector}): {error_text[:50]}...")
-                    return 'data_unavailable'
-            
-            # 备用选择器检测400错误
-            backup_selectors = [
-                "div.error-container", 
-                ".error-code", 
-                ".error-message",
-                "div.main > div > div",  # 更通用的选择器
-                "h1.error-title"
-            ]
-            
-            for selector in backup_selectors:
-                el = page.query_selector(selector)
-                if el:
-                    text = el.inner_text()
-                    if '400' in text or '错误' in text or 'Error' in text or '登录已失效' in text:
-                        log_message_callback(f"使用备用选择器 '{selector}' 检测到错误页面: {text[:50]}...")
-                        return 'login_expired'
-        except Exception as selector_error:
-            log_message_callback(f"使用选择器检测错误时出现异常: {str(selector_error)}")
-        
-        # 使用更全面的JavaScript评估来检查页面内容
-        error_content = page.evaluate("""
-            () => {
-                // 检查页面URL，某些错误会反映在URL中
-                if (window.location.href.includes('error') || 
-                    window.location.href.includes('400') || 
-                    window.location.href.includes('401') || 
-                    window.location.href.includes('403')) {
-                    return 'error_in_url';
-                }
-                
-                // 检查页面标题
-                if (document.title.includes('Error') || 
-                    document.title.includes('错误') || 
-                    document.title.includes('400')) {
-                    return 'error_in_title';
-                }
-                
-                // 检查整个页面文本
-                const fullText = document.body.innerText;
-                
-                // 检查400错误页面 - 最优先检查
-                if (fullText.includes('400') && 
-                    (fullText.includes('登录已失效') || 
-                     fullText.includes('失效') ||
-                     fullText.includes('已在其他地方登录') ||
-                     fullText.includes('请重新登录'))) {
-                    return 'login_expired';
-                }
-                
-                // 检查"Something went wrong"错误
-                if (fullText.includes('Something went wrong') || 
-                    fullText.includes('went wrong') ||
-                    fullText.includes('出错了')) {
-                    return 'something_went_wrong';
-                }
-                
-                // 检查401/403错误
-                if (fullText.includes('401') || 
-                    fullText.includes('403') || 
-                    fullText.includes('Unauthorized') ||
-                    fullText.includes('Forbidden') ||
-                    fullText.includes('未授权')) {
-                    return 'unauthorized';
-                }
-                
-                // 检查登录页面（可能是被重定向了）
-                if (fullText.includes('登录') && 
-                    fullText.includes('密码') && 
-                    (fullText.includes('Sign in') || fullText.includes('Log in'))) {
-                    return 'redirected_to_login';
-                }
-                
-                // 检查其他一般错误消息
-                if (fullText.includes('error') || 
-                    fullText.includes('Error') ||
-                    fullText.includes('失败') ||
-                    fullText.includes('错误')) {
-                    return 'general_error';
-                }
-                
-                // 检查是否有特定的错误元素
-                const errorElements = document.querySelectorAll('.error, .error-message, .error-container, [class*=error]');
-                if (errorElements.length > 0) {
-                    for (const el of errorElements) {
-                        if (el.offsetWidth > 0 && el.offsetHeight > 0) { // 确保元素可见
-                            return 'error_element_found';
-                        }
-                    }
-                }
-                
-                return false;
-            }
-        """)
-        
-        if error_content:
-            log_message_callback(f"检测到SEMrush错误页面: {error_content}")
-            return error_content
-        
+        start_time = time.time()
+        error = classify_semrush_error(page)
+        elapsed_ms = (time.time() - start_time) * 1000
+
+        if error:
+            log_message_callback(
+                f"检测到SEMrush错误页面: {error['type']} (来源: {error['source']}，"
+                f"耗时 {elapsed_ms:.0f}ms): {error['evidence']}..."
+            )
+            return error['type']
+
+        log_message_callback(f"未检测到SEMrush错误页面 (耗时 {elapsed_ms:.0f}ms)")
         return False
     except Exception as e:
         log_message_callback(f"检查错误页面时发生异常: {str(e)}")
         return False
 
-def check_no_data_page(log_message_callback, page):
-    """检查是否是无数据页面"""
-    try:
-        # 检查常见的无数据指示
-        no_data_indicators = page.evaluate("""
-            () => {
-                // 检查是否显示了空结果或更新指示器
-                const hasUpdateMetrics = document.body.innerText.includes('Update metrics');
-                const hasVolume = document.body.innerText.includes('Volume') && 
-                                  document.body.innerText.includes('Keyword Difficulty');
-                
-                // 检查实际数据
-                const volumeElement = document.querySelector('.KWO__metrics-volume, .KWO__volume');
-                const hasActualVolume = volumeElement && volumeElement.innerText.match(/[0-9,.]+[KMB]?/);
-                
-                // 如果有更新指示器和搜索量字段，但没有实际数据
-                if (hasUpdateMetrics && hasVolume && !hasActualVolume) {
-                    return 'no_volume';
+# 页面数据提取脚本，在extract_semrush_page中合并为一次page.evaluate
+SIDEBAR_JS = """
+function extractSidebar() {
+    const result = [];
+
+    // 获取所有关键词组标题和数量
+    const groups = document.querySelectorAll(".sm-group-content");
+    let count = 0;
+
+    for (const group of groups) {
+        // 只提取前20条数据
+        if (count >= 20) break;
+
+        const textElement = group.querySelector(".sm-group-content__text");
+        const valueElement = group.querySelector(".sm-group-content__value");
+
+        if (textElement && valueElement) {
+            const text = textElement.textContent.trim();
+            const value = valueElement.textContent.trim();
+
+            // 只有当两者都存在值时添加，并且跳过"All keywords"和"PPC Keyword Tool"
+            if (text && value && 
+                text !== "All keywords" && 
+                !text.includes("PPC")) {
+                result.push({
+                    text: text,
+                    value: value
+                });
+                count++;
+            }
+        }
+    }
+
+    return result;
+}
+"""
+
+KEYWORD_ROWS_JS = """
+function extractKeywordRows(skipFallbackWhenPrimary, limit) {
+    // 返回的最大行数，深度导出时不限制为20条
+    const maxRows = limit || 20;
+    // 用于存储所有关键词行的数据
+    const rows = [];
+
+    // 找到表格或关键词容器
+    const tableContainer = document.querySelector('.sm-table-layout') || 
+                          document.querySelector('table') || 
+                          document.body;
+
+    // 用于计数已提取的有效关键词数量
+    let keywordCount = 0;
+    const maxKeywords = Math.max(100, maxRows); // 先提取更多，后面再过滤
+
+    // 常见UI元素和导航菜单项列表
+    const uiTerms = [
+        'Features', 'Pricing', 'Help Center', 'What\\'s New', 'Webinars', 
+        'Insights', 'Hire', 'Academy', 'Top Websites', 'Content Marketing', 
+        'Local Marketing', 'About Us', 'Login', 'Sign Up', 'Contact', 
+        'Support', 'Documentation', 'Blog', 'API', 'Tools'
+    ];
+
+    // 关键词有效性检查函数
+    const isValidKeyword = (text) => {
+        if (!text || text.length < 3) return false;
+
+        // 跳过工具名称和UI元素
+        if (text === 'PPC Keyword Tool' ||
+            text.includes('dashboard') ||
+            text.includes('profile') ||
+            text.includes('Domain') ||
+            text.includes('Projects') ||
+            text.includes('Analytics')) {
+            return false;
+        }
+
+        // 跳过过长的文本（可能是描述性文本）
+        if (text.length > 80) return false;
+
+        // 跳过包含HTML标签的文本
+        if (text.includes('<') || text.includes('>')) return false;
+
+        // 检查是否是UI元素
+        for (const term of uiTerms) {
+            if (text === term || text.startsWith(term) || 
+                text.toLowerCase() === term.toLowerCase() || 
+                text.toLowerCase().startsWith(term.toLowerCase())) {
+                return false;
+            }
+        }
+
+        // 跳过可能是URL或路径的文本
+        if (text.includes('/') || text.includes('http')) return false;
+
+        // 跳过首字母大写的单词（可能是导航项）- 注意：这条规则可能会误排除正常关键词
+        // 仅当不是搜索结果中的第一个关键词时才应用此规则
+        // if (/^[A-Z][a-z]+$/.test(text) && keywordCount > 0) return false;
+
+        // 放宽这个规则，允许单个词的关键词存在
+        const symbolCount = (text.match(/[!@#$%^&*()_+=\\[\\]{};':"\\|,.<>\\/?-]/g) || []).length;
+        if (symbolCount > 2) return false;
+
+        // 放宽这个规则，允许单个词的关键词存在
+        // if (text.trim().split(/\\s+/).length < 2 && text.length < 10) return false;
+
+        return true;
+    };
+
+    // 使用新方法尝试提取表头和数据
+    try {
+        // 首先检查是否存在关键词总计信息，这可以帮助我们识别有效数据区域
+        const headerInfo = document.querySelector('.sm-keywords-header-layout__header, .sm-keywords-table-header');
+        if (headerInfo) {
+            console.log("找到关键词头部信息:", headerInfo.innerText);
+        }
+
+        // 尝试直接获取所有关键词行元素
+        // 注意：我们使用多种选择器组合来确保能找到表格行
+        const allRows = Array.from(document.querySelectorAll(
+            '.sm-table-layout__row, [role="row"], tr, .sm-table-layout tbody tr, .sm-table tr, [data-type="keyword-row"]'
+        ));
+
+        console.log(`找到 ${allRows.length} 个可能的行元素`);
+
+        // 尝试识别第一个关键词行 - 它通常有特殊的样式或属性
+        let firstKeywordRow = null;
+
+        // 获取排除表头后的所有行
+        const dataRows = allRows.filter(row => {
+            // 排除明确的表头行
+            const isHeader = 
+                row.getAttribute('role') === 'rowheader' || 
+                row.querySelector('th') !== null || 
+                row.classList.contains('sm-table-layout__header-row') ||
+                row.getAttribute('aria-rowindex') === '1';  // 第一行经常是表头
+
+            return !isHeader;
+        });
+
+        console.log(`找到 ${dataRows.length} 个数据行`);
+
+        // 尝试解析表头以确定每列的作用
+        let volumeColumnIndex = -1;
+        let kdColumnIndex = -1;
+
+        // 查找表头行来识别列
+        const headerRows = allRows.filter(row => 
+            row.getAttribute('role') === 'rowheader' || 
+            row.querySelector('th') !== null || 
+            row.classList.contains('sm-table-layout__header-row') ||
+            row.getAttribute('aria-rowindex') === '1'
+        );
+
+        if (headerRows.length > 0) {
+            const headerCells = Array.from(headerRows[0].querySelectorAll('th, td, [role="columnheader"]'));
+            console.log(`找到 ${headerCells.length} 个表头单元格`);
+
+            headerCells.forEach((cell, index) => {
+                const cellText = cell.textContent.trim().toLowerCase();
+                console.log(`表头单元格 ${index}: ${cellText}`);
+
+                // 查找搜索量列
+                if (cellText.includes('volume') || cellText.includes('vol') || 
+                    cellText.includes('搜索量') || cellText.includes('流量')) {
+                    volumeColumnIndex = index;
+                    console.log(`搜索量列索引: ${volumeColumnIndex}`);
                 }
-                
-                // 检查是否有明确的"没有数据"消息
-                if (document.body.innerText.includes('No data') || 
-                    document.body.innerText.includes('没有数据') || 
-                    document.body.innerText.includes('0 results')) {
-                    return 'no_data_message';
+
+                // 查找KD列
+                if (cellText.includes('kd') || cellText.includes('difficulty') || 
+                    cellText.includes('难度') || cellText.includes('竞争') || 
+                    cellText.includes('kdi')) {
+                    kdColumnIndex = index;
+                    console.log(`KD列索引: ${kdColumnIndex}`);
                 }
-                
-                return false;
+            });
+        }
+
+        // 处理每一行数据
+        for (let i = 0; i < dataRows.length && keywordCount < maxKeywords; i++) {
+            const row = dataRows[i];
+
+            // 获取关键词元素 - 尝试多种选择器
+            const keywordElement = 
+                row.querySelector('.sm-table-layout__cell:first-child a') || 
+                row.querySelector('a span') || 
+                row.querySelector('a') || 
+                row.querySelector('[data-type="keyword"]') ||
+                row.querySelector('[role="cell"]:first-child') ||
+                row.querySelector('td:first-child');
+
+            if (!keywordElement) {
+                console.log("找不到关键词元素，跳过行:", row.innerText.substring(0, 50));
+                continue;
             }
-        """)
-        
-        if no_data_indicators:
-            log_message_callback(f"检测到没有数据的页面: {no_data_indicators}")
-            return True
-        
-        return False
-    except Exception as e:
-        log_message_callback(f"检查无数据页面时发生异常: {str(e)}")
-        return False
 
-def extract_semrush_sidebar_data(log_message_callback, page):
-    """提取SEMrush边栏数据，最多返回20条"""
-    try:
-        # 使用JavaScript评估提取边栏数据
-        sidebar_data = page.evaluate("""
-            () => {
-                const result = [];
-                
-                // 获取所有关键词组标题和数量
-                const groups = document.querySelectorAll(".sm-group-content");
-                let count = 0;
-                
-                for (const group of groups) {
-                    // 只提取前20条数据
-                    if (count >= 20) break;
-                    
-                    const textElement = group.querySelector(".sm-group-content__text");
-                    const valueElement = group.querySelector(".sm-group-content__value");
-                    
-                    if (textElement && valueElement) {
-                        const text = textElement.textContent.trim();
-                        const value = valueElement.textContent.trim();
-                        
-                        // 只有当两者都存在值时添加，并且跳过"All keywords"和"PPC Keyword Tool"
-                        if (text && value && 
-                            text !== "All keywords" && 
-                            !text.includes("PPC")) {
-                            result.push({
-                                text: text,
-                                value: value
-                            });
-                            count++;
-                        }
-                    }
+            const keyword = keywordElement.textContent.trim();
+            console.log(`发现潜在关键词: "${keyword}"`);
+
+            // 特殊处理第一行 - 如果是搜索词本身，确保不被过滤
+            const isFirstRow = i === 0;
+
+            // 检查关键词有效性，但对第一行做特殊处理
+            if (!isFirstRow && !isValidKeyword(keyword)) {
+                console.log(`关键词 "${keyword}" 被过滤规则排除`);
+                continue;
+            }
+
+            // 获取单元格
+            const cells = Array.from(row.querySelectorAll('[role="cell"], td, .sm-table-layout__cell'));
+
+            if (cells.length === 0) {
+                console.log("找不到单元格，尝试获取行中的所有文本节点");
+                continue;
+            }
+
+            // 提取搜索量和KD
+            let volume = "0";
+            let kd = "n/a";
+
+            // 调试输出所有单元格内容
+            if (isFirstRow) {
+                console.log("第一行单元格内容:");
+                cells.forEach((cell, idx) => {
+                    console.log(`单元格 ${idx}: ${cell.textContent.trim()}`);
+                });
+            }
+
+            // 改进的搜索量和KD提取逻辑
+            // 首先使用通过表头识别的列索引（如果可用）
+            if (volumeColumnIndex >= 0 && volumeColumnIndex < cells.length) {
+                const volumeText = cells[volumeColumnIndex].textContent.trim();
+                if (/^[0-9,.]+[KMB]?$/.test(volumeText) || /^[0-9,.]+$/.test(volumeText)) {
+                    volume = volumeText;
+                    console.log(`通过列索引找到搜索量: ${volume}`);
                 }
-                
-                return result;
             }
-        """)
-        
-        log_message_callback(f"提取到 {len(sidebar_data)} 个SEMrush边栏数据项")
-        for i, item in enumerate(sidebar_data):
-            log_message_callback(f"边栏数据 {i+1}: {item['text']} - {item['value']}")
-            
-        return sidebar_data
-        
-    except Exception as e:
-        log_message_callback(f"提取SEMrush边栏数据时出错: {str(e)}")
-        return []
 
-def extract_semrush_keyword_data(log_message_callback, page):
-    """提取SEMrush主要关键词数据和页面顶部统计信息"""
-    try:
-        # 首先尝试提取页面顶部的统计信息
-        stats_info = extract_semrush_stats(log_message_callback, page)
-        
-        # 使用更精确的JavaScript提取每一行的完整数据，确保包含第一行
-        keyword_rows = page.evaluate("""
-            () => {
-                // 用于存储所有关键词行的数据
-                const rows = [];
-                
-                // 找到表格或关键词容器
-                const tableContainer = document.querySelector('.sm-table-layout') || 
-                                      document.querySelector('table') || 
-                                      document.body;
-                
-                // 用于计数已提取的有效关键词数量
-                let keywordCount = 0;
-                const maxKeywords = 100; // 先提取更多，后面再过滤
-                
-                // 常见UI元素和导航菜单项列表
-                const uiTerms = [
-                    'Features', 'Pricing', 'Help Center', 'What\\'s New', 'Webinars', 
-                    'Insights', 'Hire', 'Academy', 'Top Websites', 'Content Marketing', 
-                    'Local Marketing', 'About Us', 'Login', 'Sign Up', 'Contact', 
-                    'Support', 'Documentation', 'Blog', 'API', 'Tools'
-                ];
-                
-                // 关键词有效性检查函数
-                const isValidKeyword = (text) => {
-                    if (!text || text.length < 3) return false;
-                    
-                    // 跳过工具名称和UI元素
-                    if (text === 'PPC Keyword Tool' ||
-                        text.includes('dashboard') ||
-                        text.includes('profile') ||
-                        text.includes('Domain') ||
-                        text.includes('Projects') ||
-                        text.includes('Analytics')) {
-                        return false;
-                    }
-                    
-                    // 跳过过长的文本（可能是描述性文本）
-                    if (text.length > 80) return false;
-                    
-                    // 跳过包含HTML标签的文本
-                    if (text.includes('<') || text.includes('>')) return false;
-                    
-                    // 检查是否是UI元素
-                    for (const term of uiTerms) {
-                        if (text === term || text.startsWith(term) || 
-                            text.toLowerCase() === term.toLowerCase() || 
-                            text.toLowerCase().startsWith(term.toLowerCase())) {
-                            return false;
-                        }
-                    }
-                    
-                    // 跳过可能是URL或路径的文本
-                    if (text.includes('/') || text.includes('http')) return false;
-                    
-                    // 跳过首字母大写的单词（可能是导航项）- 注意：这条规则可能会误排除正常关键词
-                    // 仅当不是搜索结果中的第一个关键词时才应用此规则
-                    // if (/^[A-Z][a-z]+$/.test(text) && keywordCount > 0) return false;
-                    
-                    // 放宽这个规则，允许单个词的关键词存在
-                    const symbolCount = (text.match(/[!@#$%^&*()_+=\\[\\]{};':"\\|,.<>\\/?-]/g) || []).length;
-                    if (symbolCount > 2) return false;
-                    
-                    // 放宽这个规则，允许单个词的关键词存在
-                    // if (text.trim().split(/\\s+/).length < 2 && text.length < 10) return false;
-                    
-                    return true;
-                };
-                
-                // 使用新方法尝试提取表头和数据
-                try {
-                    // 首先检查是否存在关键词总计信息，这可以帮助我们识别有效数据区域
-                    const headerInfo = document.querySelector('.sm-keywords-header-layout__header, .sm-keywords-table-header');
-                    if (headerInfo) {
-                        console.log("找到关键词头部信息:", headerInfo.innerText);
-                    }
-                    
-                    // 尝试直接获取所有关键词行元素
-                    // 注意：我们使用多种选择器组合来确保能找到表格行
-                    const allRows = Array.from(document.querySelectorAll(
-                        '.sm-table-layout__row, [role="row"], tr, .sm-table-layout tbody tr, .sm-table tr, [data-type="keyword-row"]'
-                    ));
-                    
-                    console.log(`找到 ${allRows.length} 个可能的行元素`);
-                    
-                    // 尝试识别第一个关键词行 - 它通常有特殊的样式或属性
-                    let firstKeywordRow = null;
-                    
-                    // 获取排除表头后的所有行
-                    const dataRows = allRows.filter(row => {
-                        // 排除明确的表头行
-                        const isHeader = 
-                            row.getAttribute('role') === 'rowheader' || 
-                            row.querySelector('th') !== null || 
-                            row.classList.contains('sm-table-layout__header-row') ||
-                            row.getAttribute('aria-rowindex') === '1';  // 第一行经常是表头
-                        
-                        return !isHeader;
-                    });
-                    
-                    console.log(`找到 ${dataRows.length} 个数据行`);
-                    
-                    // 尝试解析表头以确定每列的作用
-                    let volumeColumnIndex = -1;
-                    let kdColumnIndex = -1;
-                    
-                    // 查找表头行来识别列
-                    const headerRows = allRows.filter(row => 
-                        row.getAttribute('role') === 'rowheader' || 
-                        row.querySelector('th') !== null || 
-                        row.classList.contains('sm-table-layout__header-row') ||
-                        row.getAttribute('aria-rowindex') === '1'
-                    );
-                    
-                    if (headerRows.length > 0) {
-                        const headerCells = Array.from(headerRows[0].querySelectorAll('th, td, [role="columnheader"]'));
-                        console.log(`找到 ${headerCells.length} 个表头单元格`);
-                        
-                        headerCells.forEach((cell, index) => {
-                            const cellText = cell.textContent.trim().toLowerCase();
-                            console.log(`表头单元格 ${index}: ${cellText}`);
-                            
-                            // 查找搜索量列
-                            if (cellText.includes('volume') || cellText.includes('vol') || 
-                                cellText.includes('搜索量') || cellText.includes('流量')) {
-                                volumeColumnIndex = index;
-                                console.log(`搜索量列索引: ${volumeColumnIndex}`);
-                            }
-                            
-                            // 查找KD列
-                            if (cellText.includes('kd') || cellText.includes('difficulty') || 
-                                cellText.includes('难度') || cellText.includes('竞争') || 
-                                cellText.includes('kdi')) {
-                                kdColumnIndex = index;
-                                console.log(`KD列索引: ${kdColumnIndex}`);
-                            }
-                        });
-                    }
-                    
-                    // 处理每一行数据
-                    for (let i = 0; i < dataRows.length && keywordCount < maxKeywords; i++) {
-                        const row = dataRows[i];
-                        
-                        // 获取关键词元素 - 尝试多种选择器
-                        const keywordElement = 
-                            row.querySelector('.sm-table-layout__cell:first-child a') || 
-                            row.querySelector('a span') || 
-                            row.querySelector('a') || 
-                            row.querySelector('[data-type="keyword"]') ||
-                            row.querySelector('[role="cell"]:first-child') ||
-                            row.querySelector('td:first-child');
-                        
-                        if (!keywordElement) {
-                            console.log("找不到关键词元素，跳过行:", row.innerText.substring(0, 50));
-                            continue;
-                        }
-                        
-                        const keyword = keywordElement.textContent.trim();
-                        console.log(`发现潜在关键词: "${keyword}"`);
-                        
-                        // 特殊处理第一行 - 如果是搜索词本身，确保不被过滤
-                        const isFirstRow = i === 0;
-                        
-                        // 检查关键词有效性，但对第一行做特殊处理
-                        if (!isFirstRow && !isValidKeyword(keyword)) {
-                            console.log(`关键词 "${keyword}" 被过滤规则排除`);
-                            continue;
-                        }
-                        
-                        // 获取单元格
-                        const cells = Array.from(row.querySelectorAll('[role="cell"], td, .sm-table-layout__cell'));
-                        
-                        if (cells.length === 0) {
-                            console.log("找不到单元格，尝试获取行中的所有文本节点");
-                            continue;
-                        }
-                        
-                        // 提取搜索量和KD
-                        let volume = "0";
-                        let kd = "n/a";
-                        
-                        // 调试输出所有单元格内容
-                        if (isFirstRow) {
-                            console.log("第一行单元格内容:");
-                            cells.forEach((cell, idx) => {
-                                console.log(`单元格 ${idx}: ${cell.textContent.trim()}`);
-                            });
-                        }
-                        
-                        // 改进的搜索量和KD提取逻辑
-                        // 首先使用通过表头识别的列索引（如果可用）
-                        if (volumeColumnIndex >= 0 && volumeColumnIndex < cells.length) {
-                            const volumeText = cells[volumeColumnIndex].textContent.trim();
-                            if (/^[0-9,.]+[KMB]?$/.test(volumeText) || /^[0-9,.]+$/.test(volumeText)) {
-                                volume = volumeText;
-                                console.log(`通过列索引找到搜索量: ${volume}`);
-                            }
-                        }
-                        
-                        if (kdColumnIndex >= 0 && kdColumnIndex < cells.length) {
-                            const kdText = cells[kdColumnIndex].textContent.trim();
-                            if (kdText.endsWith('%') || /^[0-9]+$/.test(kdText)) {
-                                kd = kdText.endsWith('%') ? kdText : kdText + '%';
-                                console.log(`通过列索引找到KD: ${kd}`);
-                            }
-                        }
-                        
-                        // 如果通过列索引没有找到搜索量和KD，使用表格结构的基本规律
-                        if (volume === "0" && cells.length >= 2) {
-                            // 搜索量通常是第2列，它是一个数值，可能带有K、M、B等单位
-                            const volumeText = cells[1].textContent.trim();
-                            if (/^[0-9,.]+[KMB]?$/.test(volumeText) || /^[0-9,.]+$/.test(volumeText)) {
-                                volume = volumeText;
-                                console.log(`找到搜索量: ${volume}`);
-                            }
-                        }
-                        
-                        if (cells.length >= 3) {
-                            // KD通常是第3列，它是一个带百分号的数值
-                            const kdText = cells[2].textContent.trim();
-                            if (kdText.endsWith('%') || /^[0-9]+$/.test(kdText)) {
-                                kd = kdText.endsWith('%') ? kdText : kdText + '%';
-                                console.log(`找到KD: ${kd}`);
-                            }
-                        }
-                        
-                        // 如果上面的方法没有找到搜索量和KD，尝试遍历所有单元格
-                        if (volume === "0" || kd === "n/a") {
-                            console.log("使用备选方法查找搜索量和KD");
-                            // 遍历所有单元格，查找可能的搜索量和KD值
-                            for (let j = 0; j < cells.length; j++) {
-                                const text = cells[j].textContent.trim();
-                                
-                                // 识别搜索量 - 通常是带K、M、B的数字
-                                if (volume === "0" && 
-                                    (/^[0-9,.]+[KMB]$/.test(text) || /^[0-9,.]+$/.test(text))) {
-                                    volume = text;
-                                    console.log(`备选方法找到搜索量: ${volume}`);
-                                }
-                                
-                                // 识别KD - 通常是百分比或0-100之间的数字
-                                if (kd === "n/a" && 
-                                    (text.endsWith('%') || 
-                                     (/^[0-9]+$/.test(text) && parseInt(text) >= 0 && parseInt(text) <= 100))) {
-                                    kd = text.endsWith('%') ? text : text + '%';
-                                    console.log(`备选方法找到KD: ${kd}`);
-                                }
-                            }
-                        }
-                        
-                        // 最后的备选方法：直接从HTML元素属性中提取数据
-                        if (volume === "0" || kd === "n/a") {
-                            // 尝试从data-testid或其他属性中提取
-                            console.log("尝试从属性中提取数据");
-                            for (let j = 0; j < cells.length; j++) {
-                                // 检查是否有data-属性存储值
-                                const dataVolume = cells[j].getAttribute('data-testid')?.includes('volume') ? 
-                                    cells[j].textContent.trim() : null;
-                                const dataKd = cells[j].getAttribute('data-testid')?.includes('kd') ? 
-                                    cells[j].textContent.trim() : null;
-                                
-                                if (dataVolume && volume === "0") {
-                                    volume = dataVolume;
-                                    console.log(`从属性中找到搜索量: ${volume}`);
-                                }
-                                
-                                if (dataKd && kd === "n/a") {
-                                    kd = dataKd.endsWith('%') ? dataKd : dataKd + '%';
-                                    console.log(`从属性中找到KD: ${kd}`);
-                                }
-                            }
-                        }
-                        
-                        // 添加到结果
-                        console.log(`添加关键词: ${keyword}, 搜索量: ${volume}, KD: ${kd}`);
-                        rows.push({
-                            keyword: keyword,
-                            volume: volume,
-                            kd: kd
-                        });
-                        keywordCount++;
+            if (kdColumnIndex >= 0 && kdColumnIndex < cells.length) {
+                const kdText = cells[kdColumnIndex].textContent.trim();
+                if (kdText.endsWith('%') || /^[0-9]+$/.test(kdText)) {
+                    kd = kdText.endsWith('%') ? kdText : kdText + '%';
+                    console.log(`通过列索引找到KD: ${kd}`);
+                }
+            }
+
+            // 如果通过列索引没有找到搜索量和KD，使用表格结构的基本规律
+            if (volume === "0" && cells.length >= 2) {
+                // 搜索量通常是第2列，它是一个数值，可能带有K、M、B等单位
+                const volumeText = cells[1].textContent.trim();
+                if (/^[0-9,.]+[KMB]?$/.test(volumeText) || /^[0-9,.]+$/.test(volumeText)) {
+                    volume = volumeText;
+                    console.log(`找到搜索量: ${volume}`);
+                }
+            }
+
+            if (cells.length >= 3) {
+                // KD通常是第3列，它是一个带百分号的数值
+                const kdText = cells[2].textContent.trim();
+                if (kdText.endsWith('%') || /^[0-9]+$/.test(kdText)) {
+                    kd = kdText.endsWith('%') ? kdText : kdText + '%';
+                    console.log(`找到KD: ${kd}`);
+                }
+            }
+
+            // 如果上面的方法没有找到搜索量和KD，尝试遍历所有单元格
+            if (volume === "0" || kd === "n/a") {
+                console.log("使用备选方法查找搜索量和KD");
+                // 遍历所有单元格，查找可能的搜索量和KD值
+                for (let j = 0; j < cells.length; j++) {
+                    const text = cells[j].textContent.trim();
+
+                    // 识别搜索量 - 通常是带K、M、B的数字
+                    if (volume === "0" && 
+                        (/^[0-9,.]+[KMB]$/.test(text) || /^[0-9,.]+$/.test(text))) {
+                        volume = text;
+                        console.log(`备选方法找到搜索量: ${volume}`);
                     }
-                    
-                    // 作为备用，尝试使用旧方法
-                    if (rows.length === 0) {
-                        console.log("新方法没有找到关键词，尝试备用方法");
-                        // 这里可以使用旧的方法作为备用
+
+                    // 识别KD - 通常是百分比或0-100之间的数字
+                    if (kd === "n/a" && 
+                        (text.endsWith('%') || 
+                         (/^[0-9]+$/.test(text) && parseInt(text) >= 0 && parseInt(text) <= 100))) {
+                        kd = text.endsWith('%') ? text : text + '%';
+                        console.log(`备选方法找到KD: ${kd}`);
                     }
-                    
-                } catch (e) {
-                    console.error("提取关键词时出错:", e);
                 }
-                
-                // 最终的过滤和返回
-                const filteredRows = rows.filter(row => 
-                    row.keyword !== 'PPC Keyword Tool' &&
-                    !row.keyword.includes('PPC')
-                );
-                
-                console.log(`最终提取了 ${filteredRows.length} 个关键词`);
-                
-                // 如果没有找到关键词或者数据不完整，尝试使用专门的选择器直接提取
-                if (filteredRows.length === 0 || filteredRows.some(row => row.volume === "0" || row.kd === "n/a")) {
-                    console.log("尝试使用直接选择器方法提取数据");
-                    try {
-                        // 针对截图中看到的SEMrush表格结构
-                        const directRows = [];
-                        const keywordRows = document.querySelectorAll('tr[data-id], .sm-table-layout__row, tr.sm-kw-row, tr.sm-table-row, tr.sm-mt-row');
-                        
-                        // 尝试确定每列的角色
-                        let keywordColumnIndex = 0;
-                        let volumeColumnIndex = 1;
-                        let kdColumnIndex = 2;
-                        
-                        // 先查找表头确定列
-                        const headers = document.querySelectorAll('th, .sm-table-layout__cell--header, .sm-table__th');
-                        headers.forEach((header, index) => {
-                            const headerText = header.textContent.toLowerCase();
-                            if (headerText.includes('keyword') || headerText.includes('关键词')) {
-                                keywordColumnIndex = index;
-                            } else if (headerText.includes('volume') || headerText.includes('vol') || headerText.includes('搜索量')) {
-                                volumeColumnIndex = index;
-                            } else if (headerText.includes('kd') || headerText.includes('difficulty') || headerText.includes('难度')) {
-                                kdColumnIndex = index;
-                            }
-                        });
-                        
-                        for (let i = 0; i < Math.min(20, keywordRows.length); i++) {
-                            const row = keywordRows[i];
-                            const cells = row.querySelectorAll('td, .sm-table-layout__cell');
-                            
-                            if (cells.length <= Math.max(keywordColumnIndex, volumeColumnIndex, kdColumnIndex)) {
-                                continue;
-                            }
-                            
-                            let keyword = cells[keywordColumnIndex].textContent.trim();
-                            let volume = cells[volumeColumnIndex].textContent.trim();
-                            let kd = cells[kdColumnIndex].textContent.trim();
-                            
-                            // 清理搜索量
-                            if (!/^[0-9,.]+[KMB]?$/.test(volume)) {
-                                // 尝试使用数字提取正则
-                                const volumeMatch = volume.match(/([0-9,.]+[KMB]?)/);
-                                if (volumeMatch) {
-                                    volume = volumeMatch[1];
-                                }
-                            }
-                            
-                            // 清理KD
-                            if (!kd.endsWith('%')) {
-                                const kdMatch = kd.match(/([0-9,.]+)%?/);
-                                if (kdMatch) {
-                                    kd = kdMatch[1] + '%';
-                                }
-                            }
-                            
-                            // 如果有有效的关键词，添加到结果
-                            if (keyword) {
-                                directRows.push({
-                                    keyword: keyword,
-                                    volume: volume || "0",
-                                    kd: kd || "n/a"
-                                });
-                            }
-                        }
-                        
-                        console.log(`通过直接选择器找到了 ${directRows.length} 个关键词`);
-                        
-                        // 如果找到了关键词，并且比之前的结果更好，就使用它
-                        if (directRows.length > 0 && (
-                            filteredRows.length === 0 || 
-                            directRows.length > filteredRows.length ||
-                            directRows.some(r => r.volume !== "0" && filteredRows.every(fr => fr.volume === "0"))
-                        )) {
-                            return directRows.slice(0, 20);
-                        }
-                    } catch (e) {
-                        console.error("使用直接选择器时出错:", e);
+            }
+
+            // 最后的备选方法：直接从HTML元素属性中提取数据
+            if (volume === "0" || kd === "n/a") {
+                // 尝试从data-testid或其他属性中提取
+                console.log("尝试从属性中提取数据");
+                for (let j = 0; j < cells.length; j++) {
+                    // 检查是否有data-属性存储值
+                    const dataVolume = cells[j].getAttribute('data-testid')?.includes('volume') ? 
+                        cells[j].textContent.trim() : null;
+                    const dataKd = cells[j].getAttribute('data-testid')?.includes('kd') ? 
+                        cells[j].textContent.trim() : null;
+
+                    if (dataVolume && volume === "0") {
+                        volume = dataVolume;
+                        console.log(`从属性中找到搜索量: ${volume}`);
+                    }
+
+                    if (dataKd && kd === "n/a") {
+                        kd = dataKd.endsWith('%') ? dataKd : dataKd + '%';
+                        console.log(`从属性中找到KD: ${kd}`);
                     }
                 }
-                
-                // 返回最多20条记录
-                return filteredRows.slice(0, 20);
             }
-        """)
-        
-        log_message_callback(f"提取到 {len(keyword_rows)} 个关键词数据行")
-        
-        # 记录所有提取的关键词数据
-        for i, row in enumerate(keyword_rows):
-            log_message_callback(f"关键词数据 {i+1}: {row['keyword']} - Volume:{row['volume']} - KD:{row['kd']}")
-        
-        return keyword_rows
-        
-    except Exception as e:
-        log_message_callback(f"提取SEMrush关键词数据时出错: {str(e)}")
-        log_message_callback(f"错误详情: {e}")
-        return []
 
-def extract_semrush_stats(log_message_callback, page):
-    """提取SEMrush页面顶部的统计信息"""
-    try:
-        # 使用JavaScript评估提取统计信息
-        stats = page.evaluate("""
-            () => {
-                // 查找可能包含统计信息的元素
-                const statsElements = [
-                    // 尝试多种选择器定位统计信息
-                    document.querySelector('.sm-keywords-table-header-animation'),
-                    document.querySelector('.sm-keywords-table-header'),
-                    document.querySelector('.sm-kw-table-header'),
-                    document.querySelector('.sm-mt-table-header'),
-                    document.querySelector('[class*="keywords-table-header"]'),
-                    // 如图片所示的元素位置
-                    document.querySelector('div[class*="table-header-animation"]')
-                ].filter(el => el);
-                
-                // 如果找到了元素
-                if (statsElements.length > 0) {
-                    const statsContainer = statsElements[0];
-                    const statsText = statsContainer.innerText;
-                    
-                    // 尝试从文本中提取统计数据
-                    const allKeywordsMatch = statsText.match(/All keywords[:\\s]*(\\d[\\d,\\.]*[KMB]?)/i) || 
-                                            statsText.match(/(\\d[\\d,\\.]*[KMB]?)\\s*keywords/i);
-                    const totalVolumeMatch = statsText.match(/Total Volume[:\\s]*(\\d[\\d,\\.]*[KMB]?)/i) || 
-                                            statsText.match(/Volume[:\\s]*(\\d[\\d,\\.]*[KMB]?)/i);
-                    const avgKDMatch = statsText.match(/Average KD[:\\s]*(\\d+%)/i) || 
-                                      statsText.match(/Avg[\\s.]*KD[:\\s]*(\\d+%)/i) ||
-                                      statsText.match(/KD[:\\s]*(\\d+%)/i);
-                    
-                    return {
-                        allKeywords: allKeywordsMatch ? allKeywordsMatch[1] : null,
-                        totalVolume: totalVolumeMatch ? totalVolumeMatch[1] : null,
-                        averageKD: avgKDMatch ? avgKDMatch[1] : null,
-                        rawText: statsText
-                    };
+            // 添加到结果
+            console.log(`添加关键词: ${keyword}, 搜索量: ${volume}, KD: ${kd}`);
+            rows.push({
+                keyword: keyword,
+                volume: volume,
+                kd: kd
+            });
+            keywordCount++;
+        }
+
+        // 作为备用，尝试使用旧方法
+        if (rows.length === 0) {
+            console.log("新方法没有找到关键词，尝试备用方法");
+            // 这里可以使用旧的方法作为备用
+        }
+
+    } catch (e) {
+        console.error("提取关键词时出错:", e);
+    }
+
+    // 最终的过滤和返回
+    const filteredRows = rows.filter(row => 
+        row.keyword !== 'PPC Keyword Tool' &&
+        !row.keyword.includes('PPC')
+    );
+
+    console.log(`最终提取了 ${filteredRows.length} 个关键词`);
+
+    // 如果没有找到关键词或者数据不完整，尝试使用专门的选择器直接提取
+    // 一次性提取时，主表格结构已找到关键词则不再扫描整个文档
+    if (filteredRows.length === 0 ||
+        (!skipFallbackWhenPrimary && filteredRows.some(row => row.volume === "0" || row.kd === "n/a"))) {
+        console.log("尝试使用直接选择器方法提取数据");
+        try {
+            // 针对截图中看到的SEMrush表格结构
+            const directRows = [];
+            const keywordRows = document.querySelectorAll('tr[data-id], .sm-table-layout__row, tr.sm-kw-row, tr.sm-table-row, tr.sm-mt-row');
+
+            // 尝试确定每列的角色
+            let keywordColumnIndex = 0;
+            let volumeColumnIndex = 1;
+            let kdColumnIndex = 2;
+
+            // 先查找表头确定列
+            const headers = document.querySelectorAll('th, .sm-table-layout__cell--header, .sm-table__th');
+            headers.forEach((header, index) => {
+                const headerText = header.textContent.toLowerCase();
+                if (headerText.includes('keyword') || headerText.includes('关键词')) {
+                    keywordColumnIndex = index;
+                } else if (headerText.includes('volume') || headerText.includes('vol') || headerText.includes('搜索量')) {
+                    volumeColumnIndex = index;
+                } else if (headerText.includes('kd') || headerText.includes('difficulty') || headerText.includes('难度')) {
+                    kdColumnIndex = index;
                 }
-                
-                // 备选方法：尝试查找具有特定内容的元素
-                const allTexts = [];
-                document.querySelectorAll('div, span, p').forEach(el => {
-                    const text = el.innerText.trim();
-                    if (text && (
-                        text.includes('keywords') || 
-                        text.includes('volume') || 
-                        text.includes('KD')
-                    )) {
-                        allTexts.push({
-                            element: el.tagName,
-                            text: text
-                        });
-                    }
-                });
-                
-                // 从收集的文本中提取统计信息
-                let allKeywords = null, totalVolume = null, averageKD = null;
-                
-                allTexts.forEach(item => {
-                    if (!allKeywords && 
-                        (item.text.match(/All keywords[:\\s]*(\\d[\\d,\\.]*[KMB]?)/i) || 
-                         item.text.match(/(\\d[\\d,\\.]*[KMB]?)\\s*keywords/i))) {
-                        const match = item.text.match(/All keywords[:\\s]*(\\d[\\d,\\.]*[KMB]?)/i) || 
-                                     item.text.match(/(\\d[\\d,\\.]*[KMB]?)\\s*keywords/i);
-                        allKeywords = match ? match[1] : null;
-                    }
-                    
-                    if (!totalVolume && 
-                        (item.text.match(/Total Volume[:\\s]*(\\d[\\d,\\.]*[KMB]?)/i) || 
-                         item.text.match(/Volume[:\\s]*(\\d[\\d,\\.]*[KMB]?)/i))) {
-                        const match = item.text.match(/Total Volume[:\\s]*(\\d[\\d,\\.]*[KMB]?)/i) || 
-                                     item.text.match(/Volume[:\\s]*(\\d[\\d,\\.]*[KMB]?)/i);
-                        totalVolume = match ? match[1] : null;
+            });
+
+            for (let i = 0; i < Math.min(maxRows, keywordRows.length); i++) {
+                const row = keywordRows[i];
+                const cells = row.querySelectorAll('td, .sm-table-layout__cell');
+
+                if (cells.length <= Math.max(keywordColumnIndex, volumeColumnIndex, kdColumnIndex)) {
+                    continue;
+                }
+
+                let keyword = cells[keywordColumnIndex].textContent.trim();
+                let volume = cells[volumeColumnIndex].textContent.trim();
+                let kd = cells[kdColumnIndex].textContent.trim();
+
+                // 清理搜索量
+                if (!/^[0-9,.]+[KMB]?$/.test(volume)) {
+                    // 尝试使用数字提取正则
+                    const volumeMatch = volume.match(/([0-9,.]+[KMB]?)/);
+                    if (volumeMatch) {
+                        volume = volumeMatch[1];
                     }
-                    
-                    if (!averageKD && 
-                        (item.text.match(/Average KD[:\\s]*(\\d+%)/i) || 
-                         item.text.match(/Avg[\\s.]*KD[:\\s]*(\\d+%)/i) ||
-                         item.text.match(/KD[:\\s]*(\\d+%)/i))) {
-                        const match = item.text.match(/Average KD[:\\s]*(\\d+%)/i) || 
-                                     item.text.match(/Avg[\\s.]*KD[:\\s]*(\\d+%)/i) ||
-                                     item.text.match(/KD[:\\s]*(\\d+%)/i);
-                        averageKD = match ? match[1] : null;
+                }
+
+                // 清理KD
+                if (!kd.endsWith('%')) {
+                    const kdMatch = kd.match(/([0-9,.]+)%?/);
+                    if (kdMatch) {
+                        kd = kdMatch[1] + '%';
                     }
-                });
-                
-                if (allKeywords || totalVolume || averageKD) {
-                    return {
-                        allKeywords: allKeywords,
-                        totalVolume: totalVolume,
-                        averageKD: averageKD,
-                        rawText: allTexts.map(item => item.text).join(' | ')
-                    };
                 }
-                
-                return {
-                    allKeywords: null,
-                    totalVolume: null,
-                    averageKD: null,
-                    rawText: "未找到统计信息"
-                };
+
+                // 如果有有效的关键词，添加到结果
+                if (keyword) {
+                    directRows.push({
+                        keyword: keyword,
+                        volume: volume || "0",
+                        kd: kd || "n/a"
+                    });
+                }
             }
-        """)
-        
-        # 记录找到的统计信息
-        if stats:
-            log_message_callback("提取的SEMrush统计信息:")
-            if stats.get('allKeywords'):
-                log_message_callback(f"关键词总数: {stats.get('allKeywords')}")
-            if stats.get('totalVolume'):
-                log_message_callback(f"总搜索量: {stats.get('totalVolume')}")
-            if stats.get('averageKD'):
-                log_message_callback(f"平均关键词难度: {stats.get('averageKD')}")
-            
-            if not (stats.get('allKeywords') or stats.get('totalVolume') or stats.get('averageKD')):
-                log_message_callback(f"未能找到统计信息，原始文本: {stats.get('rawText', '无文本')}")
-        else:
-            log_message_callback("未能提取SEMrush统计信息")
-        
-        return stats
-        
-    except Exception as e:
-        log_message_callback(f"提取SEMrush统计信息时出错: {str(e)}")
+
+            console.log(`通过直接选择器找到了 ${directRows.length} 个关键词`);
+
+            // 如果找到了关键词，并且比之前的结果更好，就使用它
+            if (directRows.length > 0 && (
+                filteredRows.length === 0 || 
+                directRows.length > filteredRows.length ||
+                directRows.some(r => r.volume !== "0" && filteredRows.every(fr => fr.volume === "0"))
+            )) {
+                return directRows.slice(0, maxRows);
+            }
+        } catch (e) {
+            console.error("使用直接选择器时出错:", e);
+        }
+    }
+
+    // 返回最多maxRows条记录
+    return filteredRows.slice(0, maxRows);
+}
+"""
+
+STATS_JS = """
+function extractStats() {
+    // 查找可能包含统计信息的元素
+    const statsElements = [
+        // 尝试多种选择器定位统计信息
+        document.querySelector('.sm-keywords-table-header-animation'),
+        document.querySelector('.sm-keywords-table-header'),
+        document.querySelector('.sm-kw-table-header'),
+        document.querySelector('.sm-mt-table-header'),
+        document.querySelector('[class*="keywords-table-header"]'),
+        // 如图片所示的元素位置
+        document.querySelector('div[class*="table-header-animation"]')
+    ].filter(el => el);
+
+    // 如果找到了元素
+    if (statsElements.length > 0) {
+        const statsContainer = statsElements[0];
+        const statsText = statsContainer.innerText;
+
+        // 尝试从文本中提取统计数据
+        const allKeywordsMatch = statsText.match(/All keywords[:\\s]*(\\d[\\d,\\.]*[KMB]?)/i) || 
+                                statsText.match(/(\\d[\\d,\\.]*[KMB]?)\\s*keywords/i);
+        const totalVolumeMatch = statsText.match(/Total Volume[:\\s]*(\\d[\\d,\\.]*[KMB]?)/i) || 
+                                statsText.match(/Volume[:\\s]*(\\d[\\d,\\.]*[KMB]?)/i);
+        const avgKDMatch = statsText.match(/Average KD[:\\s]*(\\d+%)/i) || 
+                          statsText.match(/Avg[\\s.]*KD[:\\s]*(\\d+%)/i) ||
+                          statsText.match(/KD[:\\s]*(\\d+%)/i);
+
         return {
-            'allKeywords': None,
-            'totalVolume': None,
-            'averageKD': None
+            allKeywords: allKeywordsMatch ? allKeywordsMatch[1] : null,
+            totalVolume: totalVolumeMatch ? totalVolumeMatch[1] : null,
+            averageKD: avgKDMatch ? avgKDMatch[1] : null,
+            rawText: statsText
+        };
+    }
+
+    // 备选方法：尝试查找具有特定内容的元素
+    const allTexts = [];
+    document.querySelectorAll('div, span, p').forEach(el => {
+        const text = el.innerText.trim();
+        if (text && (
+            text.includes('keywords') || 
+            text.includes('volume') || 
+            text.includes('KD')
+        )) {
+            allTexts.push({
+                element: el.tagName,
+                text: text
+            });
         }
+    });
 
-def update_semrush_markdown(log_message_callback, page_name, sidebar_data, keyword_data, stats_data=None):
-    """更新markdown文件中的SEMrush数据 - 使用对齐表格格式，包含统计信息"""
-    if not sidebar_data and not keyword_data and not stats_data:
-        log_message_callback("没有SEMrush数据可以更新到MD文件")
-        return
+    // 从收集的文本中提取统计信息
+    let allKeywords = null, totalVolume = null, averageKD = null;
+
+    allTexts.forEach(item => {
+        if (!allKeywords && 
+            (item.text.match(/All keywords[:\\s]*(\\d[\\d,\\.]*[KMB]?)/i) || 
+             item.text.match(/(\\d[\\d,\\.]*[KMB]?)\\s*keywords/i))) {
+            const match = item.text.match(/All keywords[:\\s]*(\\d[\\d,\\.]*[KMB]?)/i) || 
+                         item.text.match(/(\\d[\\d,\\.]*[KMB]?)\\s*keywords/i);
+            allKeywords = match ? match[1] : null;
+        }
+
+        if (!totalVolume && 
+            (item.text.match(/Total Volume[:\\s]*(\\d[\\d,\\.]*[KMB]?)/i) || 
+             item.text.match(/Volume[:\\s]*(\\d[\\d,\\.]*[KMB]?)/i))) {
+            const match = item.text.match(/Total Volume[:\\s]*(\\d[\\d,\\.]*[KMB]?)/i) || 
+                         item.text.match(/Volume[:\\s]*(\\d[\\d,\\.]*[KMB]?)/i);
+            totalVolume = match ? match[1] : null;
+        }
+
+        if (!averageKD && 
+            (item.text.match(/Average KD[:\\s]*(\\d+%)/i) || 
+             item.text.match(/Avg[\\s.]*KD[:\\s]*(\\d+%)/i) ||
+             item.text.match(/KD[:\\s]*(\\d+%)/i))) {
+            const match = item.text.match(/Average KD[:\\s]*(\\d+%)/i) || 
+                         item.text.match(/Avg[\\s.]*KD[:\\s]*(\\d+%)/i) ||
+                         item.text.match(/KD[:\\s]*(\\d+%)/i);
+            averageKD = match ? match[1] : null;
+        }
+    });
+
+    if (allKeywords || totalVolume || averageKD) {
+        return {
+            allKeywords: allKeywords,
+            totalVolume: totalVolume,
+            averageKD: averageKD,
+            rawText: allTexts.map(item => item.text).join(' | ')
+        };
+    }
+
+    return {
+        allKeywords: null,
+        totalVolume: null,
+        averageKD: null,
+        rawText: "未找到统计信息"
+    };
+}
+"""
+
+
+def log_semrush_stats(log_message_callback, stats):
+    """记录找到的统计信息"""
+    if stats:
+        log_message_callback("提取的SEMrush统计信息:")
+        if stats.get('allKeywords'):
+            log_message_callback(f"关键词总数: {stats.get('allKeywords')}")
+        if stats.get('totalVolume'):
+            log_message_callback(f"总搜索量: {stats.get('totalVolume')}")
+        if stats.get('averageKD'):
+            log_message_callback(f"平均关键词难度: {stats.get('averageKD')}")
         
-    # 创建目标MD文件名
-    md_file_path = f"{page_name}.md"
-    
-    # 检查文件是否存在
-    if not os.path.exists(md_file_path):
-        log_message_callback(f"MD文件 {md_file_path} 不存在，创建新文件")
-        with open(md_file_path, "w", encoding="utf-8") as file:
-            file.write(f"""
-# {page_name}
+        if not (stats.get('allKeywords') or stats.get('totalVolume') or stats.get('averageKD')):
+            log_message_callback(f"未能找到统计信息，原始文本: {stats.get('rawText', '无文本')}")
+    else:
+        log_message_callback("未能提取SEMrush统计信息")
 
-## 关键词来源
 
-### Google 搜索下拉框
+def extract_semrush_page(log_message_callback, page):
+    """一次page.evaluate同时提取统计信息、边栏数据和关键词数据
 
-### 相关搜索
+    主表格结构存在时不再执行全文档的备用扫描。
 
-### GSC热门查询
+    Returns:
+        tuple: (stats_data, sidebar_data, keyword_data)
+    """
+    try:
+        start_time = time.time()
+        data = page.evaluate(
+            f"() => {{ {SIDEBAR_JS} {KEYWORD_ROWS_JS} {STATS_JS} "
+            f"return {{stats: extractStats(), sidebar: extractSidebar(), keywords: extractKeywordRows(true)}}; }}"
+        )
+        log_message_callback(f"SEMrush页面数据一次性提取完成，耗时 {(time.time() - start_time) * 1000:.0f}ms")
+    except Exception as e:
+        log_message_callback(f"一次性提取SEMrush页面数据时出错: {str(e)}")
+        return ({'allKeywords': None, 'totalVolume': None, 'averageKD': None}, [], [])
 
-### 相关问题
+    stats_data = data.get('stats')
+    sidebar_data = data.get('sidebar') or []
+    keyword_data = data.get('keywords') or []
 
-### SEMrush
-""")
-    
-    # 读取现有内容
+    log_semrush_stats(log_message_callback, stats_data)
+    log_message_callback(f"提取到 {len(sidebar_data)} 个SEMrush边栏数据项")
+    for i, item in enumerate(sidebar_data):
+        log_message_callback(f"边栏数据 {i+1}: {item['text']} - {item['value']}")
+    log_message_callback(f"提取到 {len(keyword_data)} 个关键词数据行")
+    for i, row in enumerate(keyword_data):
+        log_message_callback(f"关键词数据 {i+1}: {row['keyword']} - Volume:{row['volume']} - KD:{row['kd']}")
+    return stats_data, sidebar_data, keyword_data
+
+# Keyword Magic结果表的翻页按钮
+SEMRUSH_NEXT_PAGE_SELECTORS = [
+    "[data-at='pagination-next']",
+    "[data-test='pagination-next']",
+    "button[aria-label='Next page']",
+    "a[aria-label='Next page']",
+    ".sm-pagination__next",
+    "[class*='pagination'] [class*='next']"
+]
+EXPORT_FIELDS = ["keyword", "volume", "kd", "page"]
+
+
+class KeywordExportWriter:
+    """把关键词行逐页追加写入CSV或Parquet文件，内存中只保留已写入关键词的去重集合
+
+    选择Parquet但未安装pyarrow时自动退回CSV。
+    """
+
+    def __init__(self, log_message_callback, path_prefix, export_format="csv"):
+        self.log_message_callback = log_message_callback
+        self.export_format = export_format
+        self.seen = set()
+        self.rows_written = 0
+        self._file = None
+        self._csv_writer = None
+        self._parquet_writer = None
+
+        if export_format == "parquet":
+            try:
+                import pyarrow
+                import pyarrow.parquet
+                self._pa = pyarrow
+                self._pq = pyarrow.parquet
+            except ImportError:
+                log_message_callback("未安装pyarrow，SEMrush深度导出改用CSV格式")
+                self.export_format = "csv"
+
+        if self.export_format == "parquet":
+            self.path = f"{path_prefix}.parquet"
+            self._schema = self._pa.schema([(field, self._pa.string()) for field in EXPORT_FIELDS])
+            self._parquet_writer = self._pq.ParquetWriter(self.path, self._schema)
+        else:
+            self.path = f"{path_prefix}.csv"
+            self._file = open(self.path, "w", encoding="utf-8-sig", newline="")
+            self._csv_writer = csv.writer(self._file)
+            self._csv_writer.writerow(EXPORT_FIELDS)
+
+    def write_rows(self, rows, page_number):
+        """写入一页数据，返回其中新增（未重复）的行数"""
+        new_rows = []
+        for row in rows:
+            keyword = row.get('keyword', '').strip()
+            if not keyword or keyword in self.seen:
+                continue
+            self.seen.add(keyword)
+            new_rows.append([keyword, row.get('volume', ''), row.get('kd', ''), str(page_number)])
+        if not new_rows:
+            return 0
+
+        if self._parquet_writer is not None:
+            columns = {field: [row[i] for row in new_rows] for i, field in enumerate(EXPORT_FIELDS)}
+            self._parquet_writer.write_table(self._pa.table(columns, schema=self._schema))
+        else:
+            self._csv_writer.writerows(new_rows)
+            self._file.flush()
+        self.rows_written += len(new_rows)
+        return len(new_rows)
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def click_next_semrush_page(page):
+    """点击结果表的下一页按钮，没有可用的下一页时返回False"""
+    for selector in SEMRUSH_NEXT_PAGE_SELECTORS:
+        button = page.query_selector(selector)
+        if not button:
+            continue
+        if button.get_attribute("aria-disabled") == "true" or button.get_attribute("disabled") is not None:
+            return False
+        button.click()
+        return True
+    return False
+
+
+def export_semrush_keywords(log_message_callback, page, page_name, export_format="csv", max_pages=50,
+                            cancel_token=None):
+    """逐页翻阅Keyword Magic结果，把全部关键词行流式写入磁盘
+
+    每页数据写入后即释放，只在内存中保留关键词去重集合。
+    提供cancel_token时每页开始前检查是否已中止，等待翻页也可被中止（已写入的行保留在文件中）。
+
+    Returns:
+        dict: {'path': 导出文件路径, 'rows': 导出行数, 'pages': 翻阅页数}，导出失败时为None
+    """
     try:
-        with open(md_file_path, "r", encoding="utf-8") as file:
-            md_content = file.read()
+        writer = KeywordExportWriter(log_message_callback, f"{page_name}-semrush-keywords", export_format)
     except Exception as e:
-        log_message_callback(f"读取MD文件时出错: {str(e)}")
-        return
-    
-    # 查找SEMrush部分
-    semrush_header = "### SEMrush"
-    semrush_index = md_content.find(semrush_header)
-    
-    # 如果未找到SEMrush部分，添加它
-    if semrush_index == -1:
-        log_message_callback(f"在文件 {md_file_path} 中未找到'{semrush_header}'部分，添加该部分")
-        md_content += f"\n\n{semrush_header}\n"
-        semrush_index = md_content.find(semrush_header)
-    
+        log_message_callback(f"创建SEMrush导出文件时出错: {str(e)}")
+        return None
+
+    page_number = 0
+    start_time = time.time()
+    try:
+        while page_number < max_pages:
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            page_number += 1
+            rows = page.evaluate(f"() => {{ {KEYWORD_ROWS_JS} return extractKeywordRows(true, 100000); }}")
+            added = writer.write_rows(rows, page_number)
+            log_message_callback(f"SEMrush深度导出: 第 {page_number} 页 {len(rows)} 行，新增 {added} 行，累计 {writer.rows_written} 行")
+            if not rows or added == 0:
+                break
+
+            first_keyword = rows[0]['keyword']
+            if not click_next_semrush_page(page):
+                log_message_callback("没有更多的SEMrush结果页")
+                break
+            # 等待表格第一行变化，确认已加载下一页
+            next_page_ready = (f"prev => {{ {KEYWORD_ROWS_JS} const rows = extractKeywordRows(true, 1); "
+                               f"return rows.length > 0 && rows[0].keyword !== prev; }}")
+            if cancel_token is not None:
+                cancel_token.wait(page.wait_for_function, next_page_ready, arg=first_keyword, polling=250,
+                                  timeout=30000)
+            else:
+                page.wait_for_function(next_page_ready, arg=first_keyword, polling=250, timeout=30000)
+    except Exception as e:
+        log_message_callback(f"SEMrush深度导出在第 {page_number} 页中断: {str(e)}")
+    finally:
+        writer.close()
+
+    log_message_callback(
+        f"SEMrush深度导出完成: {writer.rows_written} 行，{page_number} 页，"
+        f"耗时 {time.time() - start_time:.1f} 秒，文件: {writer.path}"
+    )
+    return {'path': writer.path, 'rows': writer.rows_written, 'pages': page_number}
+
+
+def format_semrush_section(sidebar_data, keyword_data, stats_data=None):
+    """构建SEMrush部分的内容：统计信息加上对齐的边栏/关键词表格"""
     # 添加统计信息（如果存在）
     stats_content = ""
     if stats_data:
@@ -1117,6 +1301,8 @@ def update_semrush_markdown(log_message_callback, page_name, sidebar_data, keywo
             stats_content += f"- Average KD: **{stats_data.get('averageKD')}**\n"
         if stats_data.get('note'):
             stats_content += f"- 说明: *{stats_data.get('note')}*\n"
+        if stats_data.get('exportFile'):
+            stats_content += f"- 完整关键词导出: `{stats_data.get('exportFile')}` ({stats_data.get('exportRows', 0)} 行)\n"
         stats_content += "\n"
     
     # 确定实际有多少行数据
@@ -1185,12 +1371,73 @@ def update_semrush_markdown(log_message_callback, page_name, sidebar_data, keywo
             # 填充表格行
             table_content += f"| {main_word.ljust(main_words_width)} | {main_word_count.ljust(main_word_volume_width)} | {keyword.ljust(key_words_width)} | {volume.ljust(volume_width)} | {kd.ljust(kd_width)} |\n"
     
+    # 将统计信息和表格内容组合
+    return stats_content + table_content
+
+def update_semrush_markdown(log_message_callback, page_name, sidebar_data, keyword_data, stats_data=None, store=None):
+    """更新markdown文件中的SEMrush数据 - 使用对齐表格格式，包含统计信息
+
+    提供store（ResultStore）时，数据只在一个事务中写入结果存储，MD文件由调用方在URL处理结束时统一渲染。
+    """
+    if not sidebar_data and not keyword_data and not stats_data:
+        log_message_callback("没有SEMrush数据可以更新到MD文件")
+        return
+    
+    if store is not None:
+        store.save_many(page_name, {
+            'semrush_sidebar': (sidebar_data or [], None),
+            'semrush_keywords': (keyword_data or [], None),
+            'semrush_stats': ([stats_data] if stats_data else [], None)
+        })
+        log_message_callback("SEMrush数据已写入结果存储")
+        return
+        
+    # 创建目标MD文件名
+    md_file_path = f"{page_name}.md"
+    
+    # 检查文件是否存在
+    if not os.path.exists(md_file_path):
+        log_message_callback(f"MD文件 {md_file_path} 不存在，创建新文件")
+        with open(md_file_path, "w", encoding="utf-8") as file:
+            file.write(f"""
+# {page_name}
+
+## 关键词来源
+
+### Google 搜索下拉框
+
+### 相关搜索
+
+### GSC热门查询
+
+### 相关问题
+
+### SEMrush
+""")
+    
+    # 读取现有内容
+    try:
+        with open(md_file_path, "r", encoding="utf-8") as file:
+            md_content = file.read()
+    except Exception as e:
+        log_message_callback(f"读取MD文件时出错: {str(e)}")
+        return
+    
+    # 查找SEMrush部分
+    semrush_header = "### SEMrush"
+    semrush_index = md_content.find(semrush_header)
+    
+    # 如果未找到SEMrush部分，添加它
+    if semrush_index == -1:
+        log_message_callback(f"在文件 {md_file_path} 中未找到'{semrush_header}'部分，添加该部分")
+        md_content += f"\n\n{semrush_header}\n"
+        semrush_index = md_content.find(semrush_header)
+    
+    combined_content = format_semrush_section(sidebar_data, keyword_data, stats_data)
+    
     # 查找下一部分的开始
     next_section_index = md_content.find("###", semrush_index + len(semrush_header))
     
-    # 将统计信息和表格内容组合
-    combined_content = stats_content + table_content
-    
     # 插入统计信息和表格内容
     if next_section_index != -1:
         updated_content = md_content[:semrush_index + len(semrush_header)] + combined_content + "\n" + md_content[next_section_index:]
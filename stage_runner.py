@@ -0,0 +1,265 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from cancellation import CancelledError
+from job_queue import DONE, FAILED
+
+# 分阶段流水线中的阶段，按任务进入队列的顺序排列
+STAGES = ("gsc_ga", "serp", "semrush")
+STAGE_LABELS = {"gsc_ga": "GSC/GA", "serp": "SERP", "semrush": "SEMrush"}
+
+
+class StageJob:
+    """一个URL/关键词在分阶段流水线中的状态，所有阶段完成后由最后一个阶段收尾"""
+
+    def __init__(self, job_id, position, item, task, stages):
+        self.job_id = job_id
+        self.position = position
+        self.item = item
+        self.task = task
+        self.remaining = set(stages)
+        self.errors = []
+        # 各阶段写入结果存储后等待渲染MD文件的页面
+        self.pending_markdown = set()
+        self.lock = threading.Lock()
+
+
+class StagedRunner:
+    """分阶段流水线：GSC/GA、SERP、SEMrush各有独立的有界队列和工作线程
+
+    分发线程从任务队列领取URL/关键词，放入该任务需要的每个阶段的队列；
+    各阶段互不等待，快的来源可以领先，慢的来源（如SEMrush重试）不再阻塞其他阶段。
+    队列已满时分发暂停，领先的距离不超过队列长度。
+    GSC/GA需要独占浏览器配置文件，未启用配置文件副本时只使用一个工作线程。
+    """
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        queue_size = max(1, pipeline.setting_int("stage_queue_size", 4))
+        self.queues = {stage: queue.Queue(maxsize=queue_size) for stage in STAGES}
+        # GSC/GA需要登录状态，只有启用了配置文件副本时才能多个线程同时运行
+        gsc_ga_workers = 1
+        if pipeline.profile_manager is not None:
+            gsc_ga_workers = min(max(1, pipeline.setting_int("stage_concurrency_gsc_ga", 1)),
+                                 pipeline.profile_manager.size)
+        self.workers = {
+            "gsc_ga": gsc_ga_workers,
+            "serp": max(1, pipeline.setting_int("stage_concurrency_serp", 1)),
+            "semrush": max(1, pipeline.setting_int("stage_concurrency_semrush", 1)),
+        }
+        self.handlers = {
+            "gsc_ga": pipeline.stage_gsc_ga,
+            "serp": pipeline.stage_serp,
+            "semrush": pipeline.stage_semrush,
+        }
+        self.active = {}
+        self.lock = threading.Lock()
+        self.stages = []
+        # 各阶段仍在运行的工作线程数，以及所有工作线程都已失败的阶段 {阶段: 错误信息}
+        self.alive = {}
+        self.failed_stages = {}
+
+    def stages_for_batch(self):
+        """根据设置和模式确定本批次需要运行的阶段"""
+        settings = self.pipeline.settings
+        stages = []
+        if not self.pipeline.is_original_mode and (
+                settings.value("scrape_gsc", "true") == "true" or settings.value("scrape_ga", "true") == "true"):
+            stages.append("gsc_ga")
+        if settings.value("scrape_serp", "true") == "true":
+            stages.append("serp")
+        if settings.value("scrape_semrush", "true") == "true":
+            stages.append("semrush")
+        return stages
+
+    def emit_queue_depth(self):
+        self.pipeline.queue_depth_updated.emit(
+            {STAGE_LABELS[stage]: q.qsize() for stage, q in self.queues.items() if stage in self.stages}
+        )
+
+    def run(self):
+        pipeline = self.pipeline
+        self.stages = self.stages_for_batch()
+        pipeline.log_message.emit(
+            "分阶段流水线: " + "，".join(f"{STAGE_LABELS[stage]} {self.workers[stage]} 个工作线程"
+                                   for stage in self.stages)
+        )
+        worker_count = sum(self.workers[stage] for stage in self.stages)
+        self.alive = {stage: self.workers[stage] for stage in self.stages}
+        with ThreadPoolExecutor(max_workers=max(1, worker_count)) as executor:
+            futures = [executor.submit(self.stage_worker, stage, n + 1)
+                       for stage in self.stages for n in range(self.workers[stage])]
+            try:
+                self.dispatch()
+            finally:
+                # 通知各阶段的工作线程退出
+                for stage in self.stages:
+                    for _ in range(self.workers[stage]):
+                        self.put(stage, None)
+                for future in futures:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        pipeline.log_message.emit(f"阶段工作线程出错: {str(e)}")
+
+        # 中止时仍在队列中的任务放回任务队列，下次恢复批次时继续
+        with self.lock:
+            unfinished = list(self.active.values())
+            self.active.clear()
+        for job in unfinished:
+            pipeline.job_queue.release_job(job.job_id)
+
+    def put(self, stage, job):
+        """放入阶段队列，队列已满时等待；中止时放弃并返回False
+
+        阶段的工作线程已全部失败时不再放入（没有线程消费），由fail_stage记录错误。
+        """
+        while True:
+            if stage in self.failed_stages:
+                return True
+            if self.pipeline.abort_flag and job is not None:
+                return False
+            try:
+                self.queues[stage].put(job, timeout=0.5)
+                return True
+            except queue.Full:
+                if self.pipeline.abort_flag:
+                    return False
+
+    def dispatch(self):
+        """领取任务并分发到各阶段队列；没有待领取的任务但仍有任务在处理时继续等待（失败的任务会重新排队）"""
+        pipeline = self.pipeline
+        total = len(pipeline.urls)
+        while not pipeline.abort_flag:
+            item = pipeline.take_next_item()
+            if item is None:
+                with self.lock:
+                    busy = bool(self.active)
+                if not busy:
+                    break
+                try:
+                    pipeline.cancel_token.sleep(0.5)
+                except CancelledError:
+                    break
+                continue
+
+            job_id, i, value = item
+            if pipeline.is_original_mode:
+                pipeline.log_message.emit(f"分发关键词 {i+1}/{total}: {value}")
+            else:
+                pipeline.log_message.emit(f"分发URL {i+1}/{total}: {value}")
+            job = StageJob(job_id, i, value, pipeline.prepare_item(value), self.stages)
+            if not self.stages:
+                self.finish(job)
+                continue
+            with self.lock:
+                self.active[job_id] = job
+            for stage in self.stages:
+                if stage in self.failed_stages:
+                    self.skip_stage(stage, job, self.failed_stages[stage])
+                elif not self.put(stage, job):
+                    return
+            self.emit_queue_depth()
+
+    def stage_worker(self, stage, worker_id):
+        """阶段工作线程：拥有独立的浏览器池，依次处理该阶段队列中的任务"""
+        pipeline = self.pipeline
+        label = f"{STAGE_LABELS[stage]}-{worker_id}"
+        error = None
+        try:
+            with pipeline.worker_browser_pool():
+                while not pipeline.abort_flag:
+                    try:
+                        job = self.queues[stage].get(timeout=0.5)
+                    except queue.Empty:
+                        continue
+                    if job is None:
+                        break
+                    self.emit_queue_depth()
+                    pipeline.log_message.emit(f"[{label}] 开始处理: {job.item}")
+                    self.run_stage(stage, job)
+        except Exception as e:
+            # 浏览器、配置文件副本或虚拟显示器启动失败等
+            error = str(e)
+            pipeline.log_message.emit(f"[{label}] 工作线程出错: {error}")
+        finally:
+            with self.lock:
+                self.alive[stage] -= 1
+                dead = error is not None and self.alive[stage] == 0
+                if dead:
+                    self.failed_stages[stage] = error
+            if dead:
+                self.fail_stage(stage, error)
+
+    def fail_stage(self, stage, error):
+        """阶段的工作线程已全部失败：清空该阶段队列，仍需要该阶段的任务记录错误，避免分发和队列永远等待"""
+        pipeline = self.pipeline
+        pipeline.log_message.emit(f"{STAGE_LABELS[stage]} 阶段已没有可用的工作线程，需要该阶段的任务将标记为失败")
+        while True:
+            try:
+                self.queues[stage].get_nowait()
+            except queue.Empty:
+                break
+        with self.lock:
+            jobs = list(self.active.values())
+        for job in jobs:
+            self.skip_stage(stage, job, error)
+        self.emit_queue_depth()
+
+    def skip_stage(self, stage, job, error):
+        """任务的某个阶段无法运行：记录错误，该阶段是任务的最后一个阶段时收尾"""
+        with job.lock:
+            if stage not in job.remaining:
+                return
+            job.errors.append(f"{STAGE_LABELS[stage]}: 工作线程不可用（{error}）")
+            job.remaining.discard(stage)
+            last = not job.remaining
+        if last:
+            self.finish(job)
+
+    def run_stage(self, stage, job):
+        pipeline = self.pipeline
+        # run_checkpointed和update_markdown_file使用当前线程的任务ID和待渲染页面
+        pipeline._local.job_id = job.job_id
+        pipeline._local.pending_markdown = job.pending_markdown
+        try:
+            self.handlers[stage](job.task)
+        except CancelledError:
+            # 已中止，任务在finish中放回队列
+            pass
+        except Exception as e:
+            pipeline.log_message.emit(f"[{STAGE_LABELS[stage]}] 处理 {job.item} 时出错: {str(e)}")
+            with job.lock:
+                job.errors.append(f"{STAGE_LABELS[stage]}: {str(e)}")
+        finally:
+            with job.lock:
+                job.remaining.discard(stage)
+                last = not job.remaining
+            if last:
+                self.finish(job)
+            pipeline._local.job_id = None
+            pipeline._local.pending_markdown = None
+
+    def finish(self, job):
+        """任务的所有阶段都已结束：渲染MD文件并记录任务结果"""
+        pipeline = self.pipeline
+        with self.lock:
+            if self.active.pop(job.job_id, None) is None and self.stages:
+                return
+        pipeline._local.pending_markdown = job.pending_markdown
+        pipeline.flush_markdown()
+
+        if pipeline.abort_flag:
+            # 中止的任务放回队列，下次恢复批次时继续
+            pipeline.job_queue.release_job(job.job_id)
+            return
+        if job.errors:
+            pipeline.job_queue.finish_job(job.job_id, False, "; ".join(job.errors))
+            pipeline.task_completed.emit(job.item, False)
+        else:
+            pipeline.job_queue.finish_job(job.job_id, True)
+            pipeline.task_completed.emit(job.item, True)
+        # 按任务队列统计进度，重试的任务不重复计数
+        counts = pipeline.job_queue.summary(pipeline.batch_id)
+        pipeline.progress_updated.emit(counts[DONE] + counts[FAILED], len(pipeline.urls))
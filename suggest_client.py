@@ -0,0 +1,146 @@
+import http.client
+import json
+import re
+import threading
+import urllib.parse
+
+DEFAULT_SUGGEST_ENDPOINT = "https://www.google.com/complete/search"
+# 页面中搜索框发出的建议请求路径
+SUGGEST_PATH = "/complete/search"
+
+TAG_RE = re.compile(r"<[^>]+>")
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
+
+
+def _clean(text):
+    """去掉建议文本中的<b>等高亮标签"""
+    text = TAG_RE.sub("", text)
+    return (text.replace("&amp;", "&").replace("&#39;", "'").replace("&quot;", '"')
+            .replace("&lt;", "<").replace("&gt;", ">").strip())
+
+
+def parse_suggestions(body):
+    """解析建议接口响应，兼容client=chrome的JSON数组和搜索框使用的gws-wiz格式
+
+    - chrome:  ["query", ["建议1", "建议2", ...], ...]
+    - gws-wiz: )]}' 前缀，[[["建议1", 0, [...]], ["建议2", 0, [...]]], {...}]
+    """
+    body = body.strip()
+    if body.startswith(")]}'"):
+        body = body[4:].strip()
+    # 旧版JSONP格式 window.google.ac.h([...])
+    if not body.startswith("["):
+        start, end = body.find("["), body.rfind("]")
+        if start == -1 or end == -1:
+            return []
+        body = body[start:end + 1]
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return []
+    if not isinstance(data, list) or not data:
+        return []
+
+    suggestions = []
+    if len(data) >= 2 and isinstance(data[0], str) and isinstance(data[1], list):
+        candidates = data[1]
+    elif isinstance(data[0], list):
+        candidates = data[0]
+    else:
+        return []
+
+    for candidate in candidates:
+        if isinstance(candidate, list) and candidate:
+            candidate = candidate[0]
+        if isinstance(candidate, str):
+            text = _clean(candidate)
+            if text and text not in suggestions:
+                suggestions.append(text)
+    return suggestions
+
+
+class SuggestClient:
+    """Google搜索建议接口客户端
+
+    每个线程复用一条HTTP长连接，请求失败时自动重连一次。
+    endpoint可以指向本地桩服务器以便离线测试。
+    """
+
+    def __init__(self, endpoint=DEFAULT_SUGGEST_ENDPOINT, hl="zh-CN", gl=None, timeout=10,
+                 user_agent=DEFAULT_USER_AGENT):
+        parsed = urllib.parse.urlparse(endpoint)
+        self.scheme = parsed.scheme or "https"
+        self.host = parsed.netloc
+        self.path = parsed.path or SUGGEST_PATH
+        self.hl = hl
+        self.gl = gl
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.scheme == "http":
+                conn = http.client.HTTPConnection(self.host, timeout=self.timeout)
+            else:
+                conn = http.client.HTTPSConnection(self.host, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _reset(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._local.conn = None
+
+    def build_path(self, query):
+        params = {"client": "chrome", "q": query, "ie": "utf-8", "oe": "utf-8"}
+        if self.hl:
+            params["hl"] = self.hl
+        if self.gl:
+            params["gl"] = self.gl
+        return f"{self.path}?{urllib.parse.urlencode(params)}"
+
+    def fetch(self, query):
+        """获取搜索词的下拉建议列表"""
+        path = self.build_path(query)
+        headers = {"User-Agent": self.user_agent, "Accept": "application/json, text/javascript, */*"}
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request("GET", path, headers=headers)
+                response = conn.getresponse()
+                body = response.read().decode("utf-8", errors="replace")
+            except (http.client.HTTPException, OSError):
+                # 长连接可能已被服务器关闭，重连后重试一次
+                self._reset()
+                if attempt == 1:
+                    raise
+                continue
+            if response.status != 200:
+                raise Exception(f"搜索建议接口返回状态码 {response.status}")
+            return parse_suggestions(body)
+        return []
+
+    def close(self):
+        self._reset()
+
+
+def is_suggest_response(response):
+    return SUGGEST_PATH in response.url
+
+
+def fill_and_capture_suggestions(page, selector, query, timeout=5000):
+    """在搜索框中输入搜索词，并直接读取页面发出的建议请求的响应
+
+    Returns:
+        list: 建议列表，未捕获到响应时抛出异常由调用方回退
+    """
+    with page.expect_response(is_suggest_response, timeout=timeout) as response_info:
+        page.fill(selector, query)
+    return parse_suggestions(response_info.value.text())
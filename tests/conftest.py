@@ -0,0 +1,7 @@
+import os
+import sys
+
+# 模块位于仓库根目录（平铺结构），测试时加入导入路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
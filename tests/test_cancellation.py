@@ -0,0 +1,117 @@
+import threading
+import time
+
+import pytest
+
+import semrush_module
+from cancellation import CancelToken, CancelledError
+from readiness import wait_for_report_ready
+
+# 按下停止到等待中的线程退出，允许的最长时间（秒）
+MAX_STOP_LATENCY = 1.0
+
+
+class TimeoutError(Exception):
+    """与Playwright的TimeoutError同名，CancelToken按类名识别超时"""
+
+
+class FakePage:
+    """模拟一直等不到结果的页面：每次等待都耗尽超时时间"""
+
+    def __init__(self):
+        self.keyword_pages = 0
+
+    def _time_out(self, timeout):
+        time.sleep(timeout / 1000.0)
+        raise TimeoutError(f"Timeout {timeout}ms exceeded.")
+
+    def goto(self, url, timeout=30000, wait_until="load"):
+        return None
+
+    def wait_for_selector(self, selector, timeout=30000, state=None):
+        self._time_out(timeout)
+
+    def wait_for_load_state(self, state, timeout=30000):
+        self._time_out(timeout)
+
+    def wait_for_function(self, expression, arg=None, polling=None, timeout=30000):
+        self._time_out(timeout)
+
+    def wait_for_timeout(self, timeout):
+        time.sleep(timeout / 1000.0)
+
+    def evaluate(self, expression, arg=None):
+        # 深度导出每页返回新的关键词行
+        self.keyword_pages += 1
+        return [{"keyword": f"keyword {self.keyword_pages}-{i}", "volume": "10", "kd": "1"} for i in range(3)]
+
+    def query_selector(self, selector):
+        return FakeButton()
+
+
+class FakeButton:
+    def get_attribute(self, name):
+        return None
+
+    def click(self):
+        pass
+
+
+class FakeWatcher:
+    start_time = time.time()
+    first_response_time = None
+    finished = 0
+    failed = 0
+    pending = ()
+
+    def data_settled(self, quiet_seconds):
+        return False
+
+
+def measure_stop_latency(target, delay=0.3):
+    """在线程中运行target，delay秒后中止，返回从中止到target抛出CancelledError的秒数"""
+    token = CancelToken()
+    result = {}
+
+    def run():
+        try:
+            target(token)
+        except CancelledError:
+            result["stopped_at"] = time.time()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    time.sleep(delay)
+    token.cancel()
+    thread.join(10)
+    assert "stopped_at" in result, "中止后没有抛出CancelledError"
+    return result["stopped_at"] - token.cancelled_at
+
+
+@pytest.mark.parametrize("name, target", [
+    ("sleep", lambda token: token.sleep(60)),
+    ("wait_for_selector", lambda token: token.wait(FakePage().wait_for_selector, "#rso", timeout=60000)),
+    ("goto", lambda token: token.goto(FakePage(), "https://www.google.com/", timeout=60000)),
+    ("report_ready", lambda token: wait_for_report_ready(lambda message: None, FakePage(), FakeWatcher(),
+                                                         "#report", 60, cancel_token=token)),
+])
+def test_stop_latency(name, target):
+    assert measure_stop_latency(target) < MAX_STOP_LATENCY, name
+
+
+def test_semrush_deep_export_stop_latency(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    def export(token):
+        semrush_module.export_semrush_keywords(lambda message: None, FakePage(), "keyword", max_pages=50,
+                                               cancel_token=token)
+
+    assert measure_stop_latency(export) < MAX_STOP_LATENCY
+
+
+def test_wait_still_times_out_without_cancel():
+    token = CancelToken()
+    start = time.time()
+    with pytest.raises(TimeoutError):
+        token.wait(FakePage().wait_for_selector, "#rso", timeout=600)
+    assert 0.5 < time.time() - start < MAX_STOP_LATENCY
@@ -0,0 +1,39 @@
+import os
+
+from conftest import FIXTURE_DIR
+from google_block import BlockGuard, detect_google_block
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_sorry_url_is_blocked():
+    url = "https://www.google.com/sorry/index?continue=https://www.google.com/search%3Fq%3Dspotify"
+    assert detect_google_block(url) == "sorry_url"
+
+
+def test_sorry_page_fixture_is_blocked():
+    html = read_fixture("google_sorry.html")
+    assert detect_google_block("https://www.google.com/search?q=spotify", html) == "captcha"
+
+
+def test_results_page_mentioning_captcha_is_not_blocked():
+    # 结果摘要和脚本中出现 unusual traffic、g-recaptcha、recaptcha/api.js 等字样
+    html = read_fixture("google_results.html")
+    assert detect_google_block("https://www.google.com/search?q=recaptcha", html) is None
+
+
+def test_sorry_path_on_other_site_is_not_blocked():
+    assert detect_google_block("https://example.com/sorry/index") is None
+
+
+def test_block_guard_backs_off_exponentially():
+    guard = BlockGuard(base_cooldown=10, max_cooldown=25)
+    assert guard.record_block("captcha") == 10
+    assert guard.record_block("captcha") == 20
+    assert guard.record_block("captcha") == 25
+    guard.record_success()
+    assert guard.consecutive == 0
+    assert guard.snapshot()[-1][1:] == (4, 3)
@@ -0,0 +1,62 @@
+import json
+
+from gsc_capture import extract_query_rows, format_gsc_row, parse_batchexecute
+
+
+def batchexecute_body(payload):
+    """构造与Search Console相同格式的batchexecute响应"""
+    chunk = json.dumps([["wrb.fr", "nDAfwb", json.dumps(payload), None, None, None, "generic"]])
+    return f")]}}'\n\n{len(chunk)}\n{chunk}\n25\n[[\"e\",4,null,null,100]]\n"
+
+
+def parse_rows(payload):
+    rows = []
+    for decoded in parse_batchexecute(batchexecute_body(payload)):
+        rows = extract_query_rows(decoded) or rows
+    return rows
+
+
+def test_ctr_is_always_a_fraction():
+    rows = parse_rows([[
+        ["spotify premium", 120, 4000, 0.03, 4.2],
+        ["spotify web player", 50, 50, 1.0, 1.0],
+        ["spotify mod", 8, 1000, 0.008, 12.5],
+    ]])
+    assert [(row["query"], row["ctr"]) for row in rows] == [
+        ("spotify premium", 0.03),
+        # CTR 100% 仍为1.0，不会被当作百分数
+        ("spotify web player", 1.0),
+        ("spotify mod", 0.008),
+    ]
+    assert format_gsc_row(rows[1]) == ["spotify web player", "50", "50", "100.0%", "1.0"]
+
+
+def test_percent_like_ctr_is_rejected():
+    rows = parse_rows([[
+        ["spotify premium", 120, 4000, 3.0, 4.2],
+        ["spotify web player", 50, 500, 0.1, 2.0],
+        ["spotify mod", 8, 1000, 0.008, 12.5],
+    ]])
+    assert [row["query"] for row in rows] == ["spotify web player", "spotify mod"]
+
+
+def test_rows_with_missing_metrics_are_kept():
+    rows = parse_rows([[
+        ["spotify premium", 120, 4000, 0.03, 4.2],
+        ["spotify lyrics", 0, 300],
+        ["spotify duo", None, 200, None, 7.5],
+        ["spotify family", 10, 400, 0.025],
+    ]])
+    by_query = {row["query"]: row for row in rows}
+    assert set(by_query) == {"spotify premium", "spotify lyrics", "spotify duo", "spotify family"}
+    assert by_query["spotify lyrics"]["ctr"] == 0.0
+    assert by_query["spotify lyrics"]["position"] is None
+    assert format_gsc_row(by_query["spotify lyrics"])[-1] == "-"
+    assert by_query["spotify duo"]["clicks"] == 0
+    assert by_query["spotify duo"]["position"] == 7.5
+    assert by_query["spotify family"]["position"] is None
+
+
+def test_date_rows_are_not_queries():
+    rows = parse_rows([[["2024-05-01", 10, 100, 0.1, 3.0], ["20240502", 12, 110, 0.11, 3.1]]])
+    assert rows == []
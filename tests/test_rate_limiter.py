@@ -0,0 +1,41 @@
+import threading
+import time
+
+from rate_limiter import RateLimiter, origin_group
+
+
+def test_origin_group():
+    assert origin_group("https://www.google.com/search?q=x") == "google"
+    assert origin_group("https://tool-sem.seotools8.com/analytics/") == "semrush"
+    assert origin_group("https://example.com/") is None
+
+
+def test_snapshot_reports_live_queue_depth():
+    # 每分钟60次（每秒1个令牌），突发1个
+    limiter = RateLimiter({"google": (60, 1), "semrush": (0, 1)})
+    assert limiter.acquire("https://www.google.com/") < 0.1
+
+    threads = [threading.Thread(target=limiter.acquire, args=("https://www.google.com/",)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.2)
+    live = limiter.snapshot()["google"]
+    assert live["waiting"] == 2
+    assert live["requests"] == 1
+
+    for thread in threads:
+        thread.join(5)
+    done = limiter.snapshot()["google"]
+    assert done["waiting"] == 0
+    assert done["requests"] == 3
+    assert done["max_wait"] > 0.5
+    assert "semrush" not in limiter.snapshot()
+
+
+def test_paces_only_without_burst():
+    limiter = RateLimiter({"google": (6, 1), "semrush": (0, 3)})
+    assert limiter.paces("google")
+    # 速率为0时没有令牌桶
+    assert not limiter.paces("semrush")
+    assert not RateLimiter({"semrush": (12, 3)}).paces("semrush")
+    assert not limiter.paces(None)
@@ -0,0 +1,30 @@
+import os
+import stat
+import sys
+
+import pytest
+
+from result_store import _UMASK, write_file_atomic
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="POSIX文件权限")
+
+
+def file_mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_new_file_gets_default_umask_mode(tmp_path):
+    target = tmp_path / "page.md"
+    write_file_atomic(str(target), "# 标题\n")
+    assert target.read_text(encoding="utf-8") == "# 标题\n"
+    assert file_mode(target) == 0o666 & ~_UMASK
+
+
+def test_existing_file_keeps_its_mode(tmp_path):
+    target = tmp_path / "page.md"
+    target.write_text("旧内容\n", encoding="utf-8")
+    os.chmod(target, 0o640)
+    write_file_atomic(str(target), "新内容\n")
+    assert target.read_text(encoding="utf-8") == "新内容\n"
+    assert file_mode(target) == 0o640
+    assert [p.name for p in tmp_path.iterdir()] == ["page.md"]
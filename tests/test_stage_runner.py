@@ -0,0 +1,108 @@
+import threading
+from contextlib import contextmanager
+
+from cancellation import CancelToken
+from job_queue import JobQueue, DONE, FAILED
+from stage_runner import StagedRunner
+
+
+class Signal:
+    def __init__(self):
+        self.calls = []
+
+    def emit(self, *args):
+        self.calls.append(args)
+
+
+class Settings:
+    def __init__(self, values=None):
+        self.values = values or {}
+
+    def value(self, key, default=None):
+        return self.values.get(key, default)
+
+
+class FakePipeline:
+    """只实现StagedRunner用到的接口，各阶段不启动浏览器"""
+
+    def __init__(self, db_path, urls, broken_stage=None):
+        self.urls = urls
+        self.settings = Settings({"stage_queue_size": 1, "stage_concurrency_serp": 2})
+        self.is_original_mode = False
+        self.profile_manager = None
+        self.cancel_token = CancelToken()
+        self._local = threading.local()
+        self.job_queue = JobQueue(db_path)
+        self.batch_id, _ = self.job_queue.open_batch(urls, "url")
+        self.log_message = Signal()
+        self.progress_updated = Signal()
+        self.task_completed = Signal()
+        self.queue_depth_updated = Signal()
+        self.broken_stage = broken_stage
+        self.handled = []
+
+    @property
+    def abort_flag(self):
+        return self.cancel_token.cancelled
+
+    def setting_int(self, key, default):
+        return int(self.settings.value(key, default))
+
+    def take_next_item(self):
+        return self.job_queue.claim_next(self.batch_id)
+
+    def prepare_item(self, value):
+        return {"item": value}
+
+    @contextmanager
+    def worker_browser_pool(self):
+        if threading.current_thread().name.startswith(self.broken_stage or "-"):
+            raise RuntimeError("Chromium启动失败")
+        yield None
+
+    def flush_markdown(self):
+        pass
+
+    def stage_gsc_ga(self, task):
+        self.handled.append(("gsc_ga", task["item"]))
+
+    def stage_serp(self, task):
+        self.handled.append(("serp", task["item"]))
+
+    def stage_semrush(self, task):
+        self.handled.append(("semrush", task["item"]))
+
+
+class NamedRunner(StagedRunner):
+    """工作线程以阶段名开头命名，便于让某个阶段的线程启动失败"""
+
+    def stage_worker(self, stage, worker_id):
+        threading.current_thread().name = f"{stage}-{worker_id}"
+        super().stage_worker(stage, worker_id)
+
+
+def run_with_timeout(runner, seconds=20):
+    thread = threading.Thread(target=runner.run, daemon=True)
+    thread.start()
+    thread.join(seconds)
+    assert not thread.is_alive(), "分阶段流水线被阻塞"
+
+
+def test_all_stages_complete(tmp_path):
+    urls = [f"https://example.com/page-{i}" for i in range(5)]
+    pipeline = FakePipeline(str(tmp_path / "jobs.db"), urls)
+    run_with_timeout(NamedRunner(pipeline))
+    counts = pipeline.job_queue.summary(pipeline.batch_id)
+    assert counts[DONE] == len(urls)
+    assert len(pipeline.handled) == 3 * len(urls)
+
+
+def test_failed_stage_workers_do_not_block_runner(tmp_path):
+    urls = [f"https://example.com/page-{i}" for i in range(5)]
+    pipeline = FakePipeline(str(tmp_path / "jobs.db"), urls, broken_stage="serp")
+    run_with_timeout(NamedRunner(pipeline))
+    counts = pipeline.job_queue.summary(pipeline.batch_id)
+    # 重试后仍然失败，其他阶段照常处理
+    assert counts[FAILED] == len(urls)
+    assert not any(stage == "serp" for stage, _ in pipeline.handled)
+    assert {item for stage, item in pipeline.handled if stage == "semrush"} == set(urls)
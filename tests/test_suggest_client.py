@@ -0,0 +1,113 @@
+import json
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from suggest_client import SuggestClient, parse_suggestions
+
+
+class StubSuggestServer:
+    """本地搜索建议接口桩服务器，记录连接数和请求
+
+    drop_after: 每条连接处理完这么多个请求后直接断开（不发送Connection: close），模拟服务器关闭长连接
+    hang_up: 收到请求后不回复直接断开
+    """
+
+    def __init__(self, drop_after=None, hang_up=False):
+        self.drop_after = drop_after
+        self.hang_up = hang_up
+        self.connections = 0
+        self.queries = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                stub.connections += 1
+                self.handled = 0
+
+            def do_GET(self):
+                params = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+                query = params["q"][0]
+                stub.queries.append(query)
+                if stub.hang_up:
+                    self.close_connection = True
+                    return
+                body = json.dumps([query, [f"{query} 下载", f"<b>{query}</b> premium"], [], {}],
+                                  ensure_ascii=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                self.handled += 1
+                if stub.drop_after and self.handled >= stub.drop_after:
+                    self.close_connection = True
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def endpoint(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/complete/search"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def test_reuses_keep_alive_connection():
+    with StubSuggestServer() as stub:
+        client = SuggestClient(stub.endpoint, timeout=5)
+        try:
+            for query in ("spotify", "audible", "netflix"):
+                assert client.fetch(query) == [f"{query} 下载", f"{query} premium"]
+        finally:
+            client.close()
+    assert stub.queries == ["spotify", "audible", "netflix"]
+    assert stub.connections == 1
+
+
+def test_reconnects_once_after_dropped_connection():
+    with StubSuggestServer(drop_after=1) as stub:
+        client = SuggestClient(stub.endpoint, timeout=5)
+        try:
+            assert client.fetch("spotify") == ["spotify 下载", "spotify premium"]
+            # 服务器已关闭上一条连接，第二次请求需要重连
+            assert client.fetch("audible") == ["audible 下载", "audible premium"]
+        finally:
+            client.close()
+    assert stub.connections == 2
+
+
+def test_gives_up_after_one_reconnect():
+    with StubSuggestServer(hang_up=True) as stub:
+        client = SuggestClient(stub.endpoint, timeout=5)
+        with pytest.raises(Exception):
+            client.fetch("spotify")
+        client.close()
+    assert stub.queries == ["spotify", "spotify"]
+
+
+@pytest.mark.parametrize("body, expected", [
+    ('["spotify", ["spotify premium", "spotify web"], [], {}]', ["spotify premium", "spotify web"]),
+    (")]}'\n[[[\"spotify <b>premium</b>\", 0, [512]], [\"spotify &amp; hulu\", 0, [512]]], {}]",
+     ["spotify premium", "spotify & hulu"]),
+    ('window.google.ac.h(["spotify", ["spotify app"]])', ["spotify app"]),
+    ('["spotify", ["dup", "dup"]]', ["dup"]),
+    ("not json", []),
+    ("", []),
+])
+def test_parse_suggestions(body, expected):
+    assert parse_suggestions(body) == expected
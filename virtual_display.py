@@ -0,0 +1,100 @@
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+DEFAULT_FIRST_DISPLAY = 99
+DEFAULT_SCREEN = "1920x1080x24"
+
+
+def xvfb_available():
+    """当前系统能否使用虚拟显示器（Linux且已安装Xvfb）"""
+    return sys.platform.startswith("linux") and shutil.which("Xvfb") is not None
+
+
+class VirtualDisplayPool:
+    """Xvfb虚拟显示器池（仅Linux）
+
+    每个工作线程租用一个独立的虚拟显示器，在其上运行有头Chromium：
+    保留有头模式不易被检测的优点，不需要真实桌面，也不需要把窗口移到屏幕外。
+    显示器在第一次租用时启动，close时全部关闭。
+    """
+
+    def __init__(self, size=1, first_display=DEFAULT_FIRST_DISPLAY, screen=DEFAULT_SCREEN,
+                 log_message_callback=None):
+        self.size = max(1, int(size))
+        self.first_display = int(first_display)
+        self.screen = screen
+        self.log_message_callback = log_message_callback
+        self.condition = threading.Condition()
+        self.processes = {}
+        self.free = []
+        self.next_display = self.first_display
+
+    def _log(self, message):
+        if self.log_message_callback:
+            self.log_message_callback(message)
+
+    @staticmethod
+    def _in_use(number):
+        return os.path.exists(f"/tmp/.X{number}-lock") or os.path.exists(f"/tmp/.X11-unix/X{number}")
+
+    def _start_display(self):
+        """启动一个新的Xvfb，跳过已被占用的显示器编号，返回 ":编号" """
+        for _ in range(100):
+            number = self.next_display
+            self.next_display += 1
+            if self._in_use(number):
+                continue
+            process = subprocess.Popen(
+                ["Xvfb", f":{number}", "-screen", "0", self.screen, "-nolisten", "tcp"],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            # 等待X服务器创建套接字，说明显示器已可用
+            deadline = time.time() + 10
+            while time.time() < deadline:
+                if process.poll() is not None:
+                    break
+                if os.path.exists(f"/tmp/.X11-unix/X{number}"):
+                    display = f":{number}"
+                    self.processes[display] = process
+                    self._log(f"已启动虚拟显示器 {display} ({self.screen})")
+                    return display
+                time.sleep(0.05)
+            if process.poll() is None:
+                process.terminate()
+            self._log(f"虚拟显示器 :{number} 启动失败，尝试下一个编号")
+        raise RuntimeError("无法启动Xvfb虚拟显示器")
+
+    def acquire(self, should_abort=None):
+        """租用一个虚拟显示器，全部被占用时等待；放弃等待时返回None"""
+        with self.condition:
+            while True:
+                if self.free:
+                    return self.free.pop(0)
+                if len(self.processes) < self.size:
+                    return self._start_display()
+                if should_abort and should_abort():
+                    return None
+                self.condition.wait(0.5)
+
+    def release(self, display):
+        with self.condition:
+            if display in self.processes:
+                self.free.append(display)
+                self.condition.notify()
+
+    def close(self):
+        """关闭所有虚拟显示器"""
+        with self.condition:
+            processes = list(self.processes.items())
+            self.processes.clear()
+            self.free = []
+        for display, process in processes:
+            try:
+                process.terminate()
+                process.wait(timeout=5)
+            except Exception as e:
+                self._log(f"关闭虚拟显示器 {display} 时出错: {str(e)}")